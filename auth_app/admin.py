@@ -1,3 +1,11 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import AuthToken
+
+
+@admin.register(AuthToken)
+class AuthTokenAdmin(admin.ModelAdmin):
+    list_display = ['user', 'created_at', 'last_used_at']
+    search_fields = ['user__username']
+    readonly_fields = ['key', 'created_at', 'last_used_at']
+    raw_id_fields = ['user']
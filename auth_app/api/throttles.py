@@ -0,0 +1,39 @@
+from django.core.cache import caches
+from rest_framework.throttling import AnonRateThrottle, SimpleRateThrottle
+
+
+class IPRateThrottle(AnonRateThrottle):
+    """Limits requests per client IP, counted in the process-local 'throttle' cache."""
+
+    cache = caches['throttle']
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class UsernameRateThrottle(SimpleRateThrottle):
+    """Limits requests per submitted username, whichever IPs they come from."""
+
+    cache = caches['throttle']
+
+    def get_cache_key(self, request, view):
+        username = request.data.get('username') if hasattr(request.data, 'get') else None
+        if not isinstance(username, str) or not username:
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': username.strip().lower()}
+
+
+class LoginIPThrottle(IPRateThrottle):
+    scope = 'login_ip'
+
+
+class LoginUsernameThrottle(UsernameRateThrottle):
+    scope = 'login_username'
+
+
+class RegistrationIPThrottle(IPRateThrottle):
+    scope = 'registration_ip'
+
+
+class RegistrationUsernameThrottle(UsernameRateThrottle):
+    scope = 'registration_username'
@@ -1,9 +1,10 @@
 from django.urls import path
 
-from .views import LoginView, RegistrationView
+from .views import LoginView, LogoutView, RegistrationView
 
 urlpatterns = [
     path('registration/', RegistrationView.as_view(), name='registration'),
     path('login/', LoginView.as_view(), name='login'),
+    path('logout/', LogoutView.as_view(), name='logout'),
 ]
 
@@ -1,23 +1,26 @@
 from django.contrib.auth import authenticate
 from rest_framework import status
-from rest_framework.authtoken.models import Token
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from auth_app.models import AuthToken
 from .serializers import LoginSerializer, RegistrationSerializer
+from .throttles import (LoginIPThrottle, LoginUsernameThrottle, RegistrationIPThrottle,
+                        RegistrationUsernameThrottle)
 
 
 class RegistrationView(APIView):
     """Creates a new user account and returns an auth token."""
 
     permission_classes = [AllowAny]
+    throttle_classes = [RegistrationIPThrottle, RegistrationUsernameThrottle]
 
     def post(self, request):
         serializer = RegistrationSerializer(data=request.data)
         if serializer.is_valid():
             user = serializer.save()
-            token, _ = Token.objects.get_or_create(user=user)
+            token = AuthToken.objects.create(user=user)
             return Response({
                 'token': token.key,
                 'username': user.username,
@@ -28,9 +31,10 @@ class RegistrationView(APIView):
 
 
 class LoginView(APIView):
-    """Authenticates an existing user and returns an auth token."""
+    """Authenticates an existing user and returns a freshly issued auth token."""
 
     permission_classes = [AllowAny]
+    throttle_classes = [LoginIPThrottle, LoginUsernameThrottle]
 
     def post(self, request):
         serializer = LoginSerializer(data=request.data)
@@ -40,7 +44,7 @@ class LoginView(APIView):
                 password=serializer.validated_data['password'],
             )
             if user:
-                token, _ = Token.objects.get_or_create(user=user)
+                token = AuthToken.objects.create(user=user)
                 return Response({
                     'token': token.key,
                     'username': user.username,
@@ -49,3 +53,13 @@ class LoginView(APIView):
                 }, status=status.HTTP_200_OK)
             return Response({'error': 'Invalid credentials.'}, status=status.HTTP_400_BAD_REQUEST)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class LogoutView(APIView):
+    """Deletes the auth token of the current request, which also drops it from the token cache."""
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        AuthToken.objects.filter(key=request.auth.key).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
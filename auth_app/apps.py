@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class AuthAppConfig(AppConfig):
     name = 'auth_app'
     verbose_name = 'Authentication'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,89 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+from auth_app.models import AuthToken
+from profiles_app.models import UserProfile
+
+# The only columns cached per token; never the password hash or personal data.
+# Listed in model field order, as Model.from_db() expects.
+CACHED_USER_FIELDS = ['id', 'is_superuser', 'username', 'is_staff', 'is_active']
+CACHED_PROFILE_FIELDS = ['id', 'user_id', 'type']
+CACHED_TOKEN_FIELDS = ['key', 'user_id', 'created_at', 'last_used_at']
+
+
+def token_cache_key(key):
+    return f'auth-token:{key}'
+
+
+def token_cache_entry(token):
+    """Returns the cached form of a token loaded with its user and profile: column values, no model instances."""
+    profile = getattr(token.user, 'profile', None)
+    return {
+        'user': [getattr(token.user, field) for field in CACHED_USER_FIELDS],
+        'profile': [getattr(profile, field) for field in CACHED_PROFILE_FIELDS] if profile else None,
+        'token': [getattr(token, field) for field in CACHED_TOKEN_FIELDS],
+    }
+
+
+def load_token_cache_entry(entry):
+    """Rebuilds (user, token) from a cache entry.
+
+    The user only holds CACHED_USER_FIELDS; every other field is deferred and loaded by a query
+    on first access, like a queryset's .only(). Its profile is attached, or None without one.
+    """
+    user = User.from_db(DEFAULT_DB_ALIAS, CACHED_USER_FIELDS, entry['user'])
+    profile = entry['profile'] and UserProfile.from_db(DEFAULT_DB_ALIAS, CACHED_PROFILE_FIELDS, entry['profile'])
+    UserProfile._meta.get_field('user').remote_field.set_cached_value(user, profile)
+    token = AuthToken.from_db(DEFAULT_DB_ALIAS, CACHED_TOKEN_FIELDS, entry['token'])
+    AuthToken._meta.get_field('user').set_cached_value(token, user)
+    return user, token
+
+
+def invalidate_token(key):
+    """Drops the cached user of a single token, e.g. after logout."""
+    cache.delete(token_cache_key(key))
+
+
+def invalidate_user_tokens(user_id):
+    """Drops the cached user of every token of a user, e.g. after a password or profile type change."""
+    keys = AuthToken.objects.filter(user_id=user_id).values_list('key', flat=True)
+    cache.delete_many([token_cache_key(key) for key in keys])
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Authenticates AuthTokens and caches token → user (with profile) for AUTH_TOKEN_CACHE_SECONDS.
+
+    A cache hit authenticates the request and answers request.user.profile.type, is_staff and the
+    other CACHED_*_FIELDS without a query; the cache never holds the password hash.
+    Cached entries are dropped on logout, password change and profile changes (see auth_app.signals);
+    with a per-process cache backend other workers keep their copy until the timeout.
+    Expired tokens are rejected, and last_used_at is written at most once per AUTH_TOKEN_TOUCH_SECONDS.
+    """
+
+    model = AuthToken
+
+    def authenticate_credentials(self, key):
+        cache_key = token_cache_key(key)
+        entry = cache.get(cache_key)
+        if entry is None:
+            try:
+                # Always the primary: a token issued a moment ago may not have reached a replica yet.
+                tokens = AuthToken.objects.db_manager(DEFAULT_DB_ALIAS)
+                token = tokens.select_related('user', 'user__profile').get(key=key)
+            except AuthToken.DoesNotExist:
+                raise exceptions.AuthenticationFailed('Invalid token.')
+            entry = token_cache_entry(token)
+            cache.set(cache_key, entry, settings.AUTH_TOKEN_CACHE_SECONDS)
+        user, token = load_token_cache_entry(entry)
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed('User inactive or deleted.')
+        if token.is_expired():
+            invalidate_token(key)
+            raise exceptions.AuthenticationFailed('Token has expired.')
+        if token.touch():
+            cache.set(cache_key, token_cache_entry(token), settings.AUTH_TOKEN_CACHE_SECONDS)
+        return user, token
@@ -0,0 +1,31 @@
+import statistics
+
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from core.benchmark import benchmark_database, summarize, time_call
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks login (authenticate()) throughput on one core for each available password hasher.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20, help='Timed logins per hasher.')
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            for hasher in settings.PASSWORD_HASHERS:
+                name = hasher.rsplit('.', 1)[-1]
+                with override_settings(PASSWORD_HASHERS=[hasher]):
+                    try:
+                        user = User.objects.create_user(username=name, password='Bench1234!')
+                    except ValueError as exc:
+                        self.stdout.write(f'{name:<28} skipped ({exc})')
+                        continue
+                    samples = time_call(lambda: authenticate(username=user.username, password='Bench1234!'),
+                                        repeat=options['repeat'])
+                rate = 1000 / statistics.median(samples)
+                self.stdout.write(f'{name:<28} {rate:>7.1f} logins/s per core  {summarize(samples)} ms')
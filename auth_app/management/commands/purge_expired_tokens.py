@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from auth_app.models import AuthToken
+
+
+class Command(BaseCommand):
+    help = 'Deletes expired auth tokens in batches so the table and its locks stay small.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Number of tokens deleted per statement.')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        deleted = 0
+        while True:
+            keys = list(AuthToken.objects.expired(now).values_list('key', flat=True)[:options['batch_size']])
+            if not keys:
+                break
+            deleted += AuthToken.objects.filter(key__in=keys).delete()[0]
+        self.stdout.write(self.style.SUCCESS(f'{deleted} expired tokens deleted.'))
@@ -0,0 +1,50 @@
+# Generated by Django 6.0.2 on 2026-10-18 16:20
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def copy_legacy_tokens(apps, schema_editor):
+    """Carries tokens from rest_framework.authtoken over so existing sessions stay logged in.
+
+    Legacy tokens have no usage history, so both timestamps start at the migration; stamping them
+    with the legacy creation time would expire every token older than AUTH_TOKEN_MAX_AGE_HOURS at once.
+    """
+    connection = schema_editor.connection
+    if 'authtoken_token' not in connection.introspection.table_names():
+        return
+    key = connection.ops.quote_name('key')
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO auth_app_authtoken ({key}, user_id, created_at, last_used_at) '
+            f'SELECT {key}, user_id, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP FROM authtoken_token'
+        )
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthToken',
+            fields=[
+                ('key', models.CharField(max_length=40, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_used_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='auth_tokens', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Auth Token',
+                'verbose_name_plural': 'Auth Tokens',
+                'indexes': [models.Index(fields=['last_used_at'], name='authtoken_last_used_idx'), models.Index(fields=['created_at'], name='authtoken_created_idx')],
+            },
+        ),
+        migrations.RunPython(copy_legacy_tokens, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,64 @@
+import binascii
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
 from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class AuthTokenQuerySet(models.QuerySet):
+
+    def expired(self, now=None):
+        """Tokens idle for longer than AUTH_TOKEN_IDLE_HOURS or older than AUTH_TOKEN_MAX_AGE_HOURS."""
+        now = now or timezone.now()
+        idle_since, created_before = AuthToken.expiry_bounds(now)
+        return self.filter(Q(last_used_at__lt=idle_since) | Q(created_at__lt=created_before))
+
+
+class AuthToken(models.Model):
+    """API token of a user session; every login issues another one, and each expires when idle or too old."""
+
+    key = models.CharField(max_length=40, primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='auth_tokens')
+    created_at = models.DateTimeField(default=timezone.now)
+    last_used_at = models.DateTimeField(default=timezone.now)
+
+    objects = AuthTokenQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'Auth Token'
+        verbose_name_plural = 'Auth Tokens'
+        indexes = [
+            models.Index(fields=['last_used_at'], name='authtoken_last_used_idx'),
+            models.Index(fields=['created_at'], name='authtoken_created_idx'),
+        ]
+
+    def __str__(self):
+        return f'Token of {self.user_id} (last used {self.last_used_at:%Y-%m-%d %H:%M})'
+
+    def save(self, *args, **kwargs):
+        if not self.key:
+            self.key = binascii.hexlify(os.urandom(20)).decode()
+        super().save(*args, **kwargs)
+
+    @staticmethod
+    def expiry_bounds(now):
+        """Returns (idle_since, created_before): tokens last used before or created before these are expired."""
+        return (now - timedelta(hours=settings.AUTH_TOKEN_IDLE_HOURS),
+                now - timedelta(hours=settings.AUTH_TOKEN_MAX_AGE_HOURS))
+
+    def is_expired(self, now=None):
+        idle_since, created_before = self.expiry_bounds(now or timezone.now())
+        return self.last_used_at < idle_since or self.created_at < created_before
 
-# Create your models here.
+    def touch(self, now=None):
+        """Records a use, writing at most once per AUTH_TOKEN_TOUCH_SECONDS; returns whether it wrote."""
+        now = now or timezone.now()
+        if now - self.last_used_at < timedelta(seconds=settings.AUTH_TOKEN_TOUCH_SECONDS):
+            return False
+        AuthToken.objects.filter(pk=self.pk).update(last_used_at=now)
+        self.last_used_at = now
+        return True
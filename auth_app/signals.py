@@ -0,0 +1,27 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from auth_app.models import AuthToken
+from profiles_app.models import UserProfile
+from .authentication import invalidate_token, invalidate_user_tokens
+
+
+@receiver(post_delete, sender=AuthToken)
+def drop_deleted_token(sender, instance, **kwargs):
+    invalidate_token(instance.key)
+
+
+@receiver(post_save, sender=User)
+def drop_tokens_of_changed_user(sender, instance, created, update_fields=None, **kwargs):
+    """Covers password changes from any path (API, admin, changepassword) and edits to cached user fields."""
+    if created or update_fields == frozenset({'last_login'}):
+        return
+    invalidate_user_tokens(instance.pk)
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def drop_tokens_of_changed_profile(sender, instance, created=False, **kwargs):
+    if not created:
+        invalidate_user_tokens(instance.user_id)
@@ -1,8 +1,21 @@
+from datetime import timedelta
+from importlib import import_module
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock
+
 from django.contrib.auth.models import User
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.db import connection
 from django.urls import reverse
 from rest_framework import status
+from django.utils import timezone
 from rest_framework.test import APITestCase
 
+from auth_app.api.throttles import LoginIPThrottle, LoginUsernameThrottle
+from auth_app.authentication import CachedTokenAuthentication, token_cache_key
+from auth_app.models import AuthToken
 from profiles_app.models import UserProfile
 
 
@@ -10,6 +23,7 @@ class RegistrationTests(APITestCase):
     """Tests for POST /api/registration/"""
 
     def setUp(self):
+        caches['throttle'].clear()
         self.url = reverse('registration')
         self.valid_data = {
             'username': 'newuser',
@@ -55,6 +69,7 @@ class LoginTests(APITestCase):
     """Tests for POST /api/login/"""
 
     def setUp(self):
+        caches['throttle'].clear()
         self.url = reverse('login')
         self.user = User.objects.create_user(
             username='testuser', password='Test1234!', email='test@test.de'
@@ -68,6 +83,24 @@ class LoginTests(APITestCase):
         self.assertIn('user_id', response.data)
         self.assertEqual(response.data['username'], 'testuser')
 
+    def test_login_issues_a_new_token_each_time(self):
+        first = self.client.post(self.url, {'username': 'testuser', 'password': 'Test1234!'}, format='json')
+        second = self.client.post(self.url, {'username': 'testuser', 'password': 'Test1234!'}, format='json')
+        self.assertNotEqual(first.data['token'], second.data['token'])
+        self.assertEqual(AuthToken.objects.filter(user=self.user).count(), 2)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + first.data['token'])
+        self.assertEqual(self.client.post(reverse('logout')).status_code, status.HTTP_204_NO_CONTENT)
+
+    def test_login_upgrades_hash_to_preferred_hasher(self):
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$'))
+        hashers = ['django.contrib.auth.hashers.ScryptPasswordHasher', 'django.contrib.auth.hashers.PBKDF2PasswordHasher']
+        with self.settings(PASSWORD_HASHERS=hashers):
+            response = self.client.post(self.url, {'username': 'testuser', 'password': 'Test1234!'}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.user.refresh_from_db()
+            self.assertTrue(self.user.password.startswith('scrypt$'))
+            self.assertTrue(self.user.check_password('Test1234!'))
+
     def test_login_wrong_password(self):
         response = self.client.post(self.url, {'username': 'testuser', 'password': 'wrongpass'}, format='json')
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -79,3 +112,162 @@ class LoginTests(APITestCase):
     def test_login_missing_fields(self):
         response = self.client.post(self.url, {'username': 'testuser'}, format='json')
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class LoginThrottleTests(APITestCase):
+    """Tests for the per-IP and per-username throttles of POST /api/login/"""
+
+    def setUp(self):
+        caches['throttle'].clear()
+        self.url = reverse('login')
+
+    def login(self, username):
+        return self.client.post(self.url, {'username': username, 'password': 'wrongpass'}, format='json')
+
+    @mock.patch.object(LoginUsernameThrottle, 'THROTTLE_RATES', {'login_username': '2/min'})
+    def test_username_limit_applies_across_ips(self):
+        self.login('victim')
+        self.client.post(self.url, {'username': 'Victim', 'password': 'x'}, format='json', REMOTE_ADDR='10.0.0.2')
+        response = self.client.post(self.url, {'username': 'victim', 'password': 'x'}, format='json', REMOTE_ADDR='10.0.0.3')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(self.login('someone-else').status_code, status.HTTP_400_BAD_REQUEST)
+
+    @mock.patch.object(LoginIPThrottle, 'THROTTLE_RATES', {'login_ip': '2/min'})
+    def test_ip_limit_applies_across_usernames(self):
+        self.login('first')
+        self.login('second')
+        response = self.login('third')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', response)
+
+
+class TokenCacheTests(APITestCase):
+    """Tests for the cached token authentication and its invalidation."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='Test1234!')
+        self.profile = UserProfile.objects.create(user=self.user, type='customer')
+        self.token = AuthToken.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.offers_url = reverse('offer-list-create')
+
+    def test_cached_token_skips_auth_and_profile_queries(self):
+        with self.assertNumQueries(1):
+            response = self.client.post(self.offers_url, {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        with self.assertNumQueries(0):
+            response = self.client.post(self.offers_url, {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_cache_holds_no_password_hash(self):
+        self.client.post(self.offers_url, {}, format='json')
+        entry = cache.get(token_cache_key(self.token.key))
+        self.assertNotIn(self.user.password, repr(entry))
+        self.assertEqual(entry['user'][0], self.user.pk)
+
+    def test_cached_user_loads_other_fields_lazily(self):
+        self.client.post(self.offers_url, {}, format='json')
+        user, _ = CachedTokenAuthentication().authenticate_credentials(self.token.key)
+        with self.assertNumQueries(1):
+            self.assertTrue(user.check_password('Test1234!'))
+
+    def test_logout_invalidates_token(self):
+        self.client.post(self.offers_url, {}, format='json')
+        response = self.client.post(reverse('logout'))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        response = self.client.post(self.offers_url, {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_password_change_drops_cached_user(self):
+        self.client.post(self.offers_url, {}, format='json')
+        self.user.set_password('Changed1234!')
+        self.user.save()
+        self.assertIsNone(cache.get(token_cache_key(self.token.key)))
+
+    def test_inactive_user_is_rejected_after_change(self):
+        self.client.post(self.offers_url, {}, format='json')
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.post(self.offers_url, {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_profile_type_change_is_seen_immediately(self):
+        self.client.post(self.offers_url, {}, format='json')
+        response = self.client.patch(reverse('profile-detail', kwargs={'pk': self.user.pk}), {'type': 'business'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.post(self.offers_url, {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TokenExpiryTests(APITestCase):
+    """Tests for token expiry, coalesced last_used_at writes and purge_expired_tokens."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='Test1234!')
+        UserProfile.objects.create(user=self.user, type='customer')
+        self.offers_url = reverse('offer-list-create')
+
+    def make_token(self, created_ago=timedelta(), used_ago=timedelta()):
+        now = timezone.now()
+        return AuthToken.objects.create(user=self.user, created_at=now - created_ago, last_used_at=now - used_ago)
+
+    def post_with(self, token):
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+        return self.client.post(self.offers_url, {}, format='json')
+
+    def test_idle_token_is_rejected(self):
+        with self.settings(AUTH_TOKEN_IDLE_HOURS=24):
+            response = self.post_with(self.make_token(created_ago=timedelta(days=2), used_ago=timedelta(days=2)))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_token_past_max_age_is_rejected(self):
+        with self.settings(AUTH_TOKEN_MAX_AGE_HOURS=24):
+            response = self.post_with(self.make_token(created_ago=timedelta(days=2)))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_last_used_is_written_at_most_once_per_interval(self):
+        token = self.make_token(created_ago=timedelta(hours=1), used_ago=timedelta(minutes=5))
+        with self.assertNumQueries(2):
+            self.post_with(token)
+        with self.assertNumQueries(0):
+            self.post_with(token)
+        token.refresh_from_db()
+        self.assertLess(timezone.now() - token.last_used_at, timedelta(minutes=1))
+
+    def test_purge_deletes_only_expired_tokens_in_batches(self):
+        fresh = self.make_token()
+        for _ in range(3):
+            self.make_token(created_ago=timedelta(days=60), used_ago=timedelta(days=60))
+        out = StringIO()
+        call_command('purge_expired_tokens', batch_size=2, stdout=out)
+        self.assertEqual(list(AuthToken.objects.values_list('key', flat=True)), [fresh.key])
+        self.assertIn('3 expired tokens deleted', out.getvalue())
+
+
+class LegacyTokenMigrationTests(APITestCase):
+    """Tests for copying rest_framework.authtoken tokens in auth_app's initial migration."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='Test1234!')
+        UserProfile.objects.create(user=self.user, type='customer')
+        key = connection.ops.quote_name('key')
+        with connection.cursor() as cursor:
+            cursor.execute(f'CREATE TABLE authtoken_token ({key} varchar(40) PRIMARY KEY, created timestamp, user_id integer)')
+            cursor.execute(
+                f'INSERT INTO authtoken_token ({key}, created, user_id) VALUES (%s, %s, %s)',
+                ['a' * 40, timezone.now() - timedelta(days=365), self.user.pk],
+            )
+
+    def test_old_legacy_token_is_copied_and_still_valid(self):
+        migration = import_module('auth_app.migrations.0001_initial')
+        migration.copy_legacy_tokens(None, SimpleNamespace(connection=connection))
+        token = AuthToken.objects.get(key='a' * 40)
+        self.assertEqual(token.user, self.user)
+        self.assertLess(timezone.now() - token.created_at, timedelta(minutes=1))
+        self.assertFalse(token.is_expired())
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+        response = self.client.post(reverse('offer-list-create'), {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,36 @@
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.utils.functional import classproperty
+from rest_framework.views import APIView
+
+
+class AsyncAPIView(APIView):
+    """APIView served natively on Django's async request path, for views with ``async def`` handlers.
+
+    Authentication, permission and throttle checks (APIView.initial) may hit the database or the
+    cache, so they run in one sync_to_async hop before the handler is awaited. Methods without an
+    async handler (writes, OPTIONS) run the regular sync dispatch in one hop, so an async variant
+    of a view only needs to override its hot read handlers. core.asgi_urls routes ASGI requests to
+    these variants; WSGI keeps serving the sync views.
+    """
+
+    @classproperty
+    def view_is_async(cls):
+        return True
+
+    async def dispatch(self, request, *args, **kwargs):
+        method = request.method.lower()
+        handler = getattr(self, method, None) if method in self.http_method_names else None
+        if not iscoroutinefunction(handler):
+            return await sync_to_async(super().dispatch)(request, *args, **kwargs)
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
@@ -0,0 +1,197 @@
+import hashlib
+from datetime import datetime
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import Count, Max
+from django.db.models.functions import Coalesce, Greatest
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+
+def make_etag(*parts):
+    """Returns a weak ETag hashing the given validator parts."""
+    digest = hashlib.md5('|'.join(str(part) for part in parts).encode(), usedforsecurity=False).hexdigest()
+    return f'W/"{digest}"'
+
+
+def resolve_lookup(obj, lookup):
+    """Follows a 'related__field' lookup on an instance like values_list() does, None for a missing relation."""
+    for attr in lookup.split('__'):
+        try:
+            obj = getattr(obj, attr)
+        except ObjectDoesNotExist:
+            return None
+        if obj is None:
+            return None
+    return obj
+
+
+def http_timestamp(last_modified):
+    """Returns last_modified (a datetime, epoch seconds or None) as whole epoch seconds, the HTTP date precision."""
+    if isinstance(last_modified, datetime):
+        return int(last_modified.timestamp())
+    return last_modified
+
+
+class ConditionalResponseMixin:
+    """Shared ETag/Last-Modified handling for ConditionalListMixin and ConditionalRetrieveMixin."""
+
+    def not_modified_response(self, request, etag, last_modified):
+        """Returns a 304 when the request's If-None-Match/If-Modified-Since match, else None."""
+        response = get_conditional_response(request, etag=etag, last_modified=http_timestamp(last_modified))
+        if response is not None:
+            self.set_validators(response, etag, last_modified)
+        return response
+
+    def set_validators(self, response, etag, last_modified):
+        response['ETag'] = etag
+        timestamp = http_timestamp(last_modified)
+        if timestamp is not None:
+            response['Last-Modified'] = http_date(timestamp)
+        patch_cache_control(response, no_cache=True)
+        return response
+
+    def representation_key(self, request):
+        """The parts of the request that change the body for the same rows (query string and renderer)."""
+        return request.get_full_path(), request.accepted_renderer.format
+
+
+class ConditionalListMixin(ConditionalResponseMixin):
+    """List view whose validators are MAX(updated_at) and COUNT of the filtered rows, fetched in one query.
+
+    Rows embedding related data name its timestamps in embedded_modified_fields; Last-Modified
+    and the ETag then take the latest of the row's and those timestamps.
+    The same aggregate provides the page-number paginator's COUNT, so a 200 costs no extra query,
+    and a matching conditional request returns 304 before any row is fetched or serialized.
+    Keyset (?cursor=) pages run no COUNT; their validators come from the (pk, updated_at) of the
+    fetched page instead, and a 304 still skips serialization.
+    """
+
+    last_modified_field = 'updated_at'
+    embedded_modified_fields = []
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.is_keyset_requested(request):
+            return self.keyset_list(request, queryset)
+        state = queryset.order_by().aggregate(**self.state_aggregates())
+        etag = self.state_etag(request, state)
+        not_modified = self.not_modified_response(request, etag, state['last_modified'])
+        if not_modified is not None:
+            return not_modified
+        return self.rows_response(*self.fetch_rows(queryset, state['count']), etag, state['last_modified'])
+
+    async def alist(self, request, *args, **kwargs):
+        """list() for async views: the aggregate runs on the async ORM, the page in one sync_to_async hop.
+
+        Paginators have no async API, and Django's async ORM methods are sync_to_async wrappers as
+        well, so fetching the page and its prefetches in one hop is what the async ORM would do.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.is_keyset_requested(request):
+            return await sync_to_async(self.keyset_list)(request, queryset)
+        state = await queryset.order_by().aaggregate(**self.state_aggregates())
+        etag = self.state_etag(request, state)
+        not_modified = self.not_modified_response(request, etag, state['last_modified'])
+        if not_modified is not None:
+            return not_modified
+        rows = await sync_to_async(self.fetch_rows)(queryset, state['count'])
+        return self.rows_response(*rows, etag, state['last_modified'])
+
+    def is_keyset_requested(self, request):
+        return getattr(self.paginator, 'is_keyset_requested', lambda request: False)(request)
+
+    def state_aggregates(self):
+        last_modified = Max(self.last_modified_field)
+        if self.embedded_modified_fields:
+            # Greatest() is NULL on SQLite as soon as one argument is, e.g. for rows without the relation.
+            last_modified = Greatest(last_modified, *(
+                Coalesce(Max(field), Max(self.last_modified_field)) for field in self.embedded_modified_fields
+            ))
+        return {'last_modified': last_modified, 'count': Count('pk')}
+
+    def row_last_modified(self, obj):
+        """The latest of the row's own and its embedded_modified_fields timestamps."""
+        timestamps = [resolve_lookup(obj, field) for field in [self.last_modified_field, *self.embedded_modified_fields]]
+        return max(timestamp for timestamp in timestamps if timestamp is not None)
+
+    def state_etag(self, request, state):
+        return make_etag(*self.representation_key(request), state['last_modified'], state['count'])
+
+    def fetch_rows(self, queryset, count):
+        """Returns (rows, paginated): the requested page, or every row when the view is not paginated."""
+        if self.paginator is not None:
+            self.paginator.known_count = count
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return list(page), True
+        return list(queryset), False
+
+    def rows_response(self, rows, paginated, etag, last_modified):
+        data = self.get_serializer(rows, many=True).data
+        response = self.get_paginated_response(data) if paginated else Response(data)
+        return self.set_validators(response, etag, last_modified)
+
+    def keyset_list(self, request, queryset):
+        page = self.paginate_queryset(queryset)
+        rows = [(obj.pk, self.row_last_modified(obj)) for obj in page]
+        last_modified = max((modified for _, modified in rows), default=None)
+        etag = make_etag(*self.representation_key(request), rows)
+        not_modified = self.not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        response = self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return self.set_validators(response, etag, last_modified)
+
+
+class ConditionalRetrieveMixin(ConditionalResponseMixin):
+    """Detail view whose validators are the object's validator_fields (updated_at first).
+
+    Without conditional headers they are read off the fetched object, so a plain GET costs no extra
+    query; with them a single values_list() query decides on a 304 before the object is loaded.
+    """
+
+    validator_fields = ['updated_at']
+
+    def get_validator_queryset(self):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        return self.get_queryset().filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+
+    def retrieve(self, request, *args, **kwargs):
+        if self.is_conditional(request):
+            values = self.validator_values_queryset().first()
+            not_modified = self.validated_response(request, values)
+            if not_modified is not None:
+                return not_modified
+        return self.instance_response(request, self.get_object())
+
+    async def aretrieve(self, request, *args, **kwargs):
+        """retrieve() for async views, loading the validators and the object with aget_object()."""
+        if self.is_conditional(request):
+            values = await self.validator_values_queryset().afirst()
+            not_modified = self.validated_response(request, values)
+            if not_modified is not None:
+                return not_modified
+        return self.instance_response(request, await self.aget_object())
+
+    async def aget_object(self):
+        return await sync_to_async(self.get_object)()
+
+    def is_conditional(self, request):
+        return 'HTTP_IF_NONE_MATCH' in request.META or 'HTTP_IF_MODIFIED_SINCE' in request.META
+
+    def validator_values_queryset(self):
+        return self.get_validator_queryset().order_by().values_list(*self.validator_fields)
+
+    def validated_response(self, request, values):
+        """Returns a 304 when the validator values (None for a missing object) match the request, else None."""
+        if values is None:
+            return None
+        return self.not_modified_response(request, make_etag(*self.representation_key(request), *values), values[0])
+
+    def instance_response(self, request, instance):
+        values = [resolve_lookup(instance, field) for field in self.validator_fields]
+        response = Response(self.get_serializer(instance).data)
+        return self.set_validators(response, make_etag(*self.representation_key(request), *values), values[0])
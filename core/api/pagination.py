@@ -0,0 +1,118 @@
+import base64
+import binascii
+
+from django.core.paginator import Paginator as DjangoPaginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Cursor pagination keyed on (ordering_field, id), newest first.
+
+    Each page is fetched with an index range condition instead of an OFFSET and no
+    COUNT query is run, so deep pages cost the same as the first one.
+    """
+
+    cursor_query_param = 'cursor'
+    ordering_field = 'updated_at'
+    page_size = 6
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    invalid_cursor_message = 'Invalid cursor.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        field = self.ordering_field
+        queryset = queryset.order_by(f'-{field}', '-id')
+        position = self.decode_cursor(request)
+        if position:
+            value, pk = position
+            queryset = queryset.filter(Q(**{f'{field}__lt': value}) | Q(**{field: value, 'id__lt': pk}))
+        results = self.fetch(queryset, self.page_size + 1)
+        self.has_next = len(results) > self.page_size
+        results = results[:self.page_size]
+        self.next_position = (getattr(results[-1], field), results[-1].pk) if self.has_next else None
+        return results
+
+    def fetch(self, queryset, count):
+        """Returns the first count rows of the ordered and cursor-filtered queryset."""
+        return list(queryset[:count])
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.get_next_link(), 'results': data})
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_next_link(self):
+        if not self.next_position:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(*self.next_position))
+
+    def encode_cursor(self, value, pk):
+        raw = f'{value.isoformat()}|{pk}'.encode()
+        return base64.urlsafe_b64encode(raw).decode()
+
+    def decode_cursor(self, request):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+        try:
+            value, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+            position = (parse_datetime(value), int(pk))
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if position[0] is None:
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+
+class CursorOptInPagination(PageNumberPagination):
+    """Page-number pagination that switches to KeysetPagination when ?cursor= is present.
+
+    An empty ?cursor= requests the first keyset page. A view that already counted the
+    filtered rows sets known_count to skip the paginator's COUNT query.
+    """
+
+    keyset_pagination_class = KeysetPagination
+    keyset_ordering_field = 'updated_at'
+    page_paginator_class = DjangoPaginator
+    known_count = None
+
+    def django_paginator_class(self, object_list, per_page):
+        """Builds the page-number paginator, reusing known_count (set by the view) instead of a COUNT query."""
+        paginator = self.page_paginator_class(object_list, per_page)
+        if self.known_count is not None:
+            paginator.count = self.known_count
+        return paginator
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.is_keyset_requested(request):
+            self.keyset = self.keyset_pagination_class()
+            self.keyset.ordering_field = self.keyset_ordering_field
+            self.keyset.page_size = self.page_size
+            self.keyset.page_size_query_param = self.page_size_query_param or self.keyset.page_size_query_param
+            self.keyset.max_page_size = self.max_page_size or self.keyset.max_page_size
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def is_keyset_requested(self, request):
+        return self.keyset_pagination_class.cursor_query_param in request.query_params
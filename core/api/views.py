@@ -1,26 +1,61 @@
-from django.db.models import Avg
-from rest_framework.permissions import AllowAny
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.cache import patch_cache_control
+from django.utils.crypto import constant_time_compare
+from rest_framework.permissions import AllowAny, BasePermission
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from offers_app.models import Offer
-from profiles_app.models import UserProfile
-from reviews_app.models import Review
+from core.api.async_views import AsyncAPIView
+from core.metrics import render_metrics
+from core.stats import aget_platform_stats, get_platform_stats
 
 
 class BaseInfoView(APIView):
-    """Returns aggregated platform statistics."""
+    """Returns aggregated platform statistics, served from a short-lived cache."""
 
     permission_classes = [AllowAny]
 
     def get(self, request):
-        review_count = Review.objects.count()
-        average_rating = Review.objects.aggregate(avg=Avg('rating'))['avg'] or 0
-        business_profile_count = UserProfile.objects.filter(type=UserProfile.BUSINESS).count()
-        offer_count = Offer.objects.count()
-        return Response({
-            'review_count': review_count,
-            'average_rating': round(average_rating, 1),
-            'business_profile_count': business_profile_count,
-            'offer_count': offer_count,
+        return self.stats_response(*get_platform_stats())
+
+    def stats_response(self, stats, computed_at):
+        response = Response({
+            **stats,
+            'generated_at': datetime.fromtimestamp(computed_at, tz=timezone.utc).isoformat(),
         })
+        age = int(time.time() - computed_at)
+        response['Age'] = str(age)
+        patch_cache_control(response, public=True, max_age=max(settings.BASE_INFO_CACHE_SECONDS - age, 0))
+        return response
+
+
+class AsyncBaseInfoView(AsyncAPIView, BaseInfoView):
+    """BaseInfoView for ASGI; a recomputation runs the four aggregates concurrently."""
+
+    async def get(self, request):
+        return self.stats_response(*await aget_platform_stats())
+
+
+class HasMetricsToken(BasePermission):
+    """Allows scrapes sending "Authorization: Bearer <METRICS_TOKEN>", or everyone when no token is set."""
+
+    def has_permission(self, request, view):
+        if not settings.METRICS_TOKEN:
+            return True
+        return constant_time_compare(request.META.get('HTTP_AUTHORIZATION', ''), f'Bearer {settings.METRICS_TOKEN}')
+
+
+class MetricsView(APIView):
+    """Serves the request histograms in the Prometheus text exposition format; 404 unless METRICS_ENABLED."""
+
+    authentication_classes = []
+    permission_classes = [HasMetricsToken]
+
+    def get(self, request):
+        if not settings.METRICS_ENABLED:
+            raise Http404
+        return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
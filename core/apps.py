@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+
+
+class CoreConfig(AppConfig):
+    name = 'core'
+    verbose_name = 'Core'
+
+    def ready(self):
+        from . import checks  # noqa: F401
+        from .benchmark import install_contextual_wrapper
+        connection_created.connect(install_contextual_wrapper, dispatch_uid='core.contextual_execute_wrapper')
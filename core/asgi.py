@@ -2,6 +2,8 @@
 ASGI config for core project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+With ASGI_ASYNC_VIEWS, ASGI requests resolve against core.asgi_urls, which serves
+the hot read endpoints with async views; otherwise they get the sync views of core.urls.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
@@ -9,8 +11,25 @@ https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler, ASGIRequest
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
-application = get_asgi_application()
+
+class AsyncViewsRequest(ASGIRequest):
+    urlconf = 'core.asgi_urls'
+
+
+class AsyncViewsASGIHandler(ASGIHandler):
+    request_class = AsyncViewsRequest
+
+
+def get_application():
+    """get_asgi_application(), with the async views of core.asgi_urls when ASGI_ASYNC_VIEWS is set."""
+    django.setup(set_prefix=False)
+    return AsyncViewsASGIHandler() if settings.ASGI_ASYNC_VIEWS else ASGIHandler()
+
+
+application = get_application()
@@ -0,0 +1,40 @@
+"""URLconf of ASGI requests: core.urls with the hot read views replaced by their async variants.
+
+core.asgi sets it on every ASGI request; WSGI requests keep resolving against ROOT_URLCONF.
+"""
+
+from django.urls import URLPattern, URLResolver
+
+from core.api.views import AsyncBaseInfoView, BaseInfoView
+from core.urls import urlpatterns as sync_urlpatterns
+from offers_app.api.views import AsyncOfferListCreateView, OfferListCreateView
+from orders_app.api.views import (AsyncCompletedOrderCountView, AsyncOrderCountView, AsyncOrderStatsView,
+                                  CompletedOrderCountView, OrderCountView, OrderStatsView)
+from profiles_app.api.views import AsyncProfileDetailView, ProfileDetailView
+
+ASYNC_VIEWS = {
+    BaseInfoView: AsyncBaseInfoView,
+    OrderCountView: AsyncOrderCountView,
+    CompletedOrderCountView: AsyncCompletedOrderCountView,
+    OrderStatsView: AsyncOrderStatsView,
+    OfferListCreateView: AsyncOfferListCreateView,
+    ProfileDetailView: AsyncProfileDetailView,
+}
+
+
+def with_async_views(patterns):
+    """Returns a copy of patterns in which every view listed in ASYNC_VIEWS is served by its variant."""
+    result = []
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            pattern = URLResolver(pattern.pattern, with_async_views(pattern.url_patterns), pattern.default_kwargs,
+                                  pattern.app_name, pattern.namespace)
+        elif getattr(pattern.callback, 'view_class', None) in ASYNC_VIEWS:
+            variant = ASYNC_VIEWS[pattern.callback.view_class]
+            pattern = URLPattern(pattern.pattern, variant.as_view(**pattern.callback.view_initkwargs),
+                                 pattern.default_args, pattern.name)
+        result.append(pattern)
+    return result
+
+
+urlpatterns = with_async_views(sync_urlpatterns)
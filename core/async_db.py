@@ -0,0 +1,57 @@
+"""Concurrent queries for async views.
+
+Django's async ORM runs every query through sync_to_async(thread_sensitive=True), i.e. one
+after another on the request's single sync thread, so asyncio.gather() over a few acount()
+calls does not overlap them. run_concurrently() instead gives each query a thread of its own
+from a bounded pool (ASYNC_QUERY_WORKERS), and with it a database connection of its own.
+Those connections follow the request lifecycle rules: after each query they are closed when
+CONN_MAX_AGE is exceeded or they are unusable, just like request_finished does for requests.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connections
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def query_executor():
+    """Returns the thread pool for the current ASYNC_QUERY_WORKERS setting, None when it is 0."""
+    workers = settings.ASYNC_QUERY_WORKERS
+    if not workers:
+        return None
+    with _executors_lock:
+        if workers not in _executors:
+            _executors[workers] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='async-query')
+        return _executors[workers]
+
+
+def in_transaction():
+    return any(connections[alias].in_atomic_block for alias in connections)
+
+
+def run_on_own_connection(query):
+    try:
+        return query()
+    finally:
+        close_old_connections()
+
+
+async def run_concurrently(*queries):
+    """Runs the sync callables concurrently on pooled threads and returns their results in order.
+
+    Without a pool, or inside a transaction, they run one after another in a single hop on the
+    request's connection instead; other connections cannot see a transaction's uncommitted rows.
+    """
+    executor = query_executor()
+    if executor is None or await sync_to_async(in_transaction)():
+        return await sync_to_async(lambda: [query() for query in queries])()
+    return await asyncio.gather(*(
+        sync_to_async(run_on_own_connection, thread_sensitive=False, executor=executor)(query)
+        for query in queries
+    ))
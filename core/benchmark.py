@@ -0,0 +1,131 @@
+import statistics
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+from pathlib import Path
+
+from django.db import connection
+
+
+@contextmanager
+def benchmark_database(verbosity=0):
+    """Runs the block against a throwaway test database so benchmarks never touch real data.
+
+    On SQLite it is a file in a temporary directory rather than the in-memory test database,
+    which would time neither WAL nor concurrent writers the way production runs them.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        test_settings = connection.settings_dict['TEST']
+        old_test_name = test_settings.get('NAME')
+        if connection.vendor == 'sqlite':
+            test_settings['NAME'] = str(Path(directory) / 'benchmark.sqlite3')
+        old_name = connection.creation.create_test_db(verbosity=verbosity, autoclobber=True, serialize=False)
+        try:
+            yield
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity)
+            test_settings['NAME'] = old_test_name
+
+
+def time_call(func, repeat=5, warmup=1):
+    """Calls func warmup + repeat times and returns the measured durations in milliseconds."""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def percentile(samples, pct):
+    """Returns the pct-th percentile of samples using nearest-rank."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples):
+    """Returns min/median/p95/max of a list of durations in milliseconds."""
+    return {
+        'min': round(min(samples), 2),
+        'median': round(statistics.median(samples), 2),
+        'p95': round(percentile(samples, 95), 2),
+        'max': round(max(samples), 2),
+    }
+
+
+active_recorders = ContextVar('active_recorders', default=())
+
+
+class QueryRecorder:
+    """Database execute wrapper counting queries and their time; install with connection.execute_wrapper()
+    to measure one connection, or with record_queries() to measure a whole request.
+
+    A request's queries may run on several threads at once (core.async_db), so updates take a lock.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            with self.lock:
+                self.count += 1
+                self.seconds += time.perf_counter() - start
+
+
+@contextmanager
+def record_queries(recorder):
+    """Passes every query run in the current context through recorder, whatever connection runs it.
+
+    connection.execute_wrapper() only sees the calling thread's connection. Async views query from
+    sync_to_async() threads with connections of their own; those threads inherit this context, so
+    their queries are recorded too (see contextual_execute_wrapper).
+    """
+    token = active_recorders.set((*active_recorders.get(), recorder))
+    try:
+        yield recorder
+    finally:
+        active_recorders.reset(token)
+
+
+def contextual_execute_wrapper(execute, sql, params, many, context):
+    """Execute wrapper of every connection that applies the recorders of the current record_queries() blocks."""
+    for recorder in reversed(active_recorders.get()):
+        execute = partial(recorder, execute)
+    return execute(sql, params, many, context)
+
+
+def install_contextual_wrapper(sender, connection, **kwargs):
+    """connection_created receiver; a reconnecting connection keeps its wrappers, so it is added once."""
+    if contextual_execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(contextual_execute_wrapper)
+
+
+def compare_reports(current, baseline, threshold, metric='p95', min_delta_ms=1.0):
+    """Returns the regressions of an endpoint report against a baseline report as readable lines.
+
+    Latency regresses when metric grew by more than threshold percent and at least min_delta_ms
+    (below that, timer noise dominates); query counts are deterministic and regress on any increase.
+    """
+    regressions = []
+    for label, result in current['endpoints'].items():
+        before = baseline['endpoints'].get(label)
+        if before is None:
+            continue
+        limit = before[metric] * (1 + threshold / 100)
+        if result[metric] > limit and result[metric] - before[metric] >= min_delta_ms:
+            regressions.append(f'{label}: {metric} {before[metric]} ms -> {result[metric]} ms (+{threshold}% allowed)')
+        if result['queries'] > before['queries']:
+            regressions.append(f'{label}: queries {before["queries"]} -> {result["queries"]}')
+    return regressions
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, register
+from django.utils.module_loading import import_string
+
+
+@register()
+def check_replica_pin_cache(app_configs, **kwargs):
+    """ReplicaRoutingMiddleware pins a client to the primary after a write through the default cache.
+
+    A process-local cache only pins the worker that handled the write; the client's next read
+    may land on another worker, hit a lagging replica and miss its own write.
+    """
+    if not settings.REPLICA_DATABASES:
+        return []
+    backend = import_string(settings.CACHES['default']['BACKEND'])
+    if not issubclass(backend, (LocMemCache, DummyCache)):
+        return []
+    return [Error(
+        'DB_REPLICAS needs a default cache shared by all workers; '
+        f'{backend.__name__} keeps read-your-writes pins per process.',
+        hint='Set CACHE_BACKEND to Redis or Memcached, or add core.E001 to SILENCED_SYSTEM_CHECKS for a single process.',
+        id='core.E001',
+    )]
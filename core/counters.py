@@ -0,0 +1,24 @@
+"""Upkeep of per-user counter tables such as orders_app.OrderStats and reviews_app.RatingSummary.
+
+Each table has one row per user, keyed by a ``user`` primary key. Writes move its counters with
+F() expressions in the transaction that writes the counted row, and the whole table can be
+rebuilt from the counted rows. The data migrations that create the tables aggregate on their
+own, with historical models only.
+"""
+
+from django.db import transaction
+
+
+def update_counters(model, user_id, updates):
+    """Applies the F() updates to the user's row, creating the row first if it is missing."""
+    model.objects.get_or_create(user_id=user_id)
+    model.objects.filter(pk=user_id).update(**updates)
+
+
+def replace_counter_rows(model, rows):
+    """Replaces every row of model with rows (unsaved instances) in one transaction; returns their number."""
+    rows = list(rows)
+    with transaction.atomic():
+        model.objects.all().delete()
+        model.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
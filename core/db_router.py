@@ -0,0 +1,44 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+
+# Set per request by ReplicaRoutingMiddleware; outside requests (commands, shell) everything uses the primary.
+read_replica = ContextVar('read_replica', default=None)
+pinned_to_primary = ContextVar('pinned_to_primary', default=False)
+
+
+@contextmanager
+def primary_reads():
+    """Sends the reads inside the block to the primary, e.g. to fill a cache shared beyond this request."""
+    token = pinned_to_primary.set(True)
+    try:
+        yield
+    finally:
+        pinned_to_primary.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """Sends reads of safe-method requests to the replica picked for the request, everything else to the primary.
+
+    All reads of a request use the same replica, so e.g. a page's COUNT and its rows agree. Once a request asks for the primary to write, its remaining reads stay on the primary too,
+    so a response never misses the row it just wrote.
+    """
+
+    def db_for_read(self, model, **hints):
+        replica = read_replica.get()
+        if replica and not pinned_to_primary.get():
+            return replica
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        pinned_to_primary.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.REPLICA_DATABASES}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
@@ -0,0 +1,254 @@
+import asyncio
+import json
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO, StringIO
+from itertools import count
+from pathlib import Path
+from urllib.parse import urlencode
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.cache import caches
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from auth_app.models import AuthToken
+from core.asgi import AsyncViewsASGIHandler
+from core.benchmark import benchmark_database, percentile, time_call
+from core.management.commands.bench_endpoints import Command as BenchEndpointsCommand
+from core.stats import acompute_platform_stats, compute_platform_stats
+
+
+def target(label, name, kwargs=None, data=None, role='customer'):
+    """One endpoint under load; kwargs may be a callable taking the fixtures, role is 'customer' or 'anonymous'."""
+    return {'label': label, 'name': name, 'kwargs': kwargs or {}, 'data': data or {}, 'role': role}
+
+
+def business_id(fixtures):
+    return {'business_user_id': fixtures['business'].pk}
+
+
+# The endpoints that have async variants (see core.asgi_urls).
+TARGETS = [
+    target('base-info', 'base-info', role='anonymous'),
+    target('order-count', 'order-count', kwargs=business_id),
+    target('completed-order-count', 'completed-order-count', kwargs=business_id),
+    target('order-stats', 'order-stats', kwargs=business_id),
+    target('offers list', 'offer-list-create'),
+    target('offers list (anonymous, cached)', 'offer-list-create', role='anonymous'),
+    target('offers list ?ordering=min_price&min_price=50', 'offer-list-create',
+           data={'ordering': 'min_price', 'min_price': 50}),
+    target('profile detail (business)', 'profile-detail', kwargs=lambda fixtures: {'pk': fixtures['business'].pk}),
+]
+
+
+def wsgi_environ(path, query, headers):
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'SCRIPT_NAME': '',
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'SERVER_NAME': 'testserver',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'REMOTE_ADDR': '127.0.0.1',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': BytesIO(),
+        'wsgi.errors': StringIO(),
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    environ.update({'HTTP_' + name.upper().replace('-', '_'): value for name, value in headers.items()})
+    return environ
+
+
+def wsgi_get(application, path, query, headers):
+    """Sends one GET through a WSGI application and returns the status code."""
+    statuses = []
+    body = application(wsgi_environ(path, query, headers), lambda status, headers, exc_info=None: statuses.append(status))
+    try:
+        b''.join(body)
+    finally:
+        body.close()
+    return int(statuses[0].split()[0])
+
+
+async def asgi_get(application, path, query, headers):
+    """Sends one GET through an ASGI application like an ASGI server would and returns the status code."""
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query.encode(),
+        'root_path': '',
+        'headers': [(b'host', b'testserver'), *((name.lower().encode(), value.encode()) for name, value in headers.items())],
+        'client': ('127.0.0.1', 50000),
+        'server': ('testserver', 80),
+    }
+    messages = []
+    finished = asyncio.Event()
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await finished.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        messages.append(message)
+        if message['type'] == 'http.response.body' and not message.get('more_body'):
+            finished.set()
+
+    await application(scope, receive, send)
+    return messages[0]['status']
+
+
+def run_wsgi(application, request, concurrency, total):
+    """Sends total requests from concurrency threads, like a threaded WSGI server; returns (latencies, statuses, seconds)."""
+    latencies, statuses, counter = [], set(), count()
+
+    def worker():
+        while next(counter) < total:
+            start = time.perf_counter()
+            statuses.add(wsgi_get(application, *request))
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        for future in [pool.submit(worker) for _ in range(concurrency)]:
+            future.result()
+    return latencies, statuses, time.perf_counter() - start
+
+
+def run_asgi(application, request, concurrency, total):
+    """Sends total requests from concurrency tasks on one event loop, like an ASGI server; same result as run_wsgi()."""
+    latencies, statuses, counter = [], set(), count()
+
+    async def worker():
+        while next(counter) < total:
+            start = time.perf_counter()
+            statuses.add(await asgi_get(application, *request))
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    async def main():
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    start = time.perf_counter()
+    asyncio.run(main())
+    return latencies, statuses, time.perf_counter() - start
+
+
+class Command(BaseCommand):
+    help = ('Loads the endpoints with async variants with concurrent requests through the WSGI handler '
+            '(sync views, thread pool) and the ASGI handler (one event loop) with the sync and with the async '
+            'views, and reports throughput and latency of each as JSON.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--business-users', type=int, default=500)
+        parser.add_argument('--customers', type=int, default=5000)
+        parser.add_argument('--offers', type=int, default=50_000)
+        parser.add_argument('--orders', type=int, default=200_000)
+        parser.add_argument('--reviews', type=int, default=50_000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--concurrency', type=int, default=32,
+                            help='Requests in flight: WSGI threads, or tasks on the ASGI event loop.')
+        parser.add_argument('--requests', type=int, default=1000, help='Requests per endpoint and server.')
+        parser.add_argument('--warmup', type=int, default=20, help='Untimed requests per endpoint and server.')
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout.')
+
+    def handle(self, *args, **options):
+        dataset = {key: options[key] for key in ['business_users', 'customers', 'offers', 'orders', 'reviews', 'seed']}
+        with benchmark_database(), override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            call_command('generate_load_data', prefix='bench', stdout=StringIO(), **dataset)
+            report = self.run_suite(options['concurrency'], options['requests'], options['warmup'])
+        report['dataset'] = dataset
+        content = json.dumps(report, indent=2, ensure_ascii=False)
+        if options['output']:
+            Path(options['output']).write_text(content + '\n')
+            self.stderr.write(f'Report written to {options["output"]}')
+        else:
+            self.stdout.write(content)
+
+    def run_suite(self, concurrency, requests, warmup):
+        """Runs TARGETS through WSGI, ASGI with the sync views and ASGI with the async views; returns the report.
+
+        'speedup' compares each ASGI variant's throughput to WSGI's.
+        """
+        fixtures = BenchEndpointsCommand()._fixtures()
+        token = AuthToken.objects.create(user=fixtures['customer']).key
+        headers = {'customer': {'Authorization': f'Token {token}'}, 'anonymous': {}}
+        servers = {
+            'wsgi': (run_wsgi, WSGIHandler()),
+            'asgi_sync_views': (run_asgi, ASGIHandler()),
+            'asgi_async_views': (run_asgi, AsyncViewsASGIHandler()),
+        }
+        report = {
+            'generated_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'concurrency': concurrency,
+            'requests': requests,
+            'endpoints': {},
+            'aggregates': self._measure_aggregates(),
+        }
+        aggregates = report['aggregates']
+        self.stderr.write(f'base-info aggregates: sequential {aggregates["sequential_ms"]} ms, '
+                          f'concurrent ({aggregates["workers"]} workers) {aggregates["concurrent_ms"]} ms')
+        for item in TARGETS:
+            kwargs = item['kwargs'](fixtures) if callable(item['kwargs']) else item['kwargs']
+            request = (reverse(item['name'], kwargs=kwargs), urlencode(item['data']), headers[item['role']])
+            result = {}
+            for server, (run, application) in servers.items():
+                caches['throttle'].clear()
+                run(application, request, concurrency, warmup)
+                result[server] = self._summarize(*run(application, request, concurrency, requests))
+            result['speedup'] = {
+                server: round(result[server]['requests_per_second'] / result['wsgi']['requests_per_second'], 2)
+                for server in servers if server != 'wsgi'
+            }
+            report['endpoints'][item['label']] = result
+            self.stderr.write(self._format(item['label'], result))
+        return report
+
+    def _measure_aggregates(self):
+        """Median time of the base-info aggregates run in sequence and on the query pool (at least 4 workers)."""
+        workers = max(settings.ASYNC_QUERY_WORKERS, 4)
+        sequential = time_call(compute_platform_stats, repeat=10)
+        with override_settings(ASYNC_QUERY_WORKERS=workers):
+            concurrent = time_call(async_to_sync(acompute_platform_stats), repeat=10)
+        return {'sequential_ms': round(statistics.median(sequential), 2),
+                'concurrent_ms': round(statistics.median(concurrent), 2), 'workers': workers}
+
+    def _summarize(self, latencies, statuses, seconds):
+        return {
+            'requests_per_second': round(len(latencies) / seconds, 1),
+            'p50': round(percentile(latencies, 50), 2),
+            'p95': round(percentile(latencies, 95), 2),
+            'p99': round(percentile(latencies, 99), 2),
+            'status': sorted(statuses),
+        }
+
+    def _format(self, label, result):
+        return '  '.join(
+            [f'{label:<46}'] + [
+                f'{server} {result[server]["requests_per_second"]:>8} req/s p95 {result[server]["p95"]:>8} ms'
+                + (f' x{result["speedup"][server]}' if server in result['speedup'] else '')
+                for server in ['wsgi', 'asgi_sync_views', 'asgi_async_views']
+            ]
+        )
@@ -0,0 +1,63 @@
+import threading
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, transaction
+
+from core.benchmark import benchmark_database
+from orders_app.models import Order, OrderStats
+
+
+class Command(BaseCommand):
+    help = 'Runs concurrent order writers and readers against the configured database engine and reports throughput.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=8, help='Threads creating orders.')
+        parser.add_argument('--readers', type=int, default=8, help='Threads listing orders.')
+        parser.add_argument('--seconds', type=float, default=10.0, help='Duration of the run.')
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            customer = User.objects.create_user(username='bench-customer')
+            business = User.objects.create_user(username='bench-business')
+            counts = {'writes': 0, 'reads': 0, 'errors': 0}
+            lock = threading.Lock()
+            deadline = time.perf_counter() + options['seconds']
+
+            def run(operation, counter):
+                try:
+                    while time.perf_counter() < deadline:
+                        try:
+                            operation()
+                            outcome = counter
+                        except OperationalError:
+                            outcome = 'errors'
+                        with lock:
+                            counts[outcome] += 1
+                finally:
+                    connection.close()
+
+            def write():
+                with transaction.atomic():
+                    Order.objects.create(
+                        customer_user=customer, business_user=business, title='Bench order', revisions=1,
+                        delivery_time_in_days=3, price=50, features=[], offer_type='basic',
+                    )
+                    OrderStats.record_status_change(business.pk, new_status=Order.IN_PROGRESS)
+
+            def read():
+                list(Order.objects.filter(business_user=business).order_by('-created_at')[:20])
+
+            threads = [threading.Thread(target=run, args=(write, 'writes')) for _ in range(options['writers'])]
+            threads += [threading.Thread(target=run, args=(read, 'reads')) for _ in range(options['readers'])]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            seconds = options['seconds']
+            self.stdout.write(
+                f"{connection.vendor} {connection.settings_dict['OPTIONS'] or '(no options)'}\n"
+                f"  writes/s {counts['writes'] / seconds:8.1f}   reads/s {counts['reads'] / seconds:8.1f}   "
+                f"errors {counts['errors']}"
+            )
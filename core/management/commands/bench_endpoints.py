@@ -0,0 +1,244 @@
+import json
+import statistics
+import time
+from io import StringIO
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import override_settings
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from auth_app.models import AuthToken
+from core.benchmark import QueryRecorder, benchmark_database, compare_reports, percentile
+from offers_app.models import Offer, OfferDetail
+from orders_app.models import Order
+from reviews_app.models import Review
+
+
+def scenario(label, name, method='get', kwargs=None, data=None, role='customer', before=None):
+    """One benchmarked request.
+
+    kwargs and data may be callables taking (fixtures, iteration); role picks the authenticated client
+    ('customer', 'business' or 'anonymous'); before(fixtures) runs untimed ahead of every request and
+    may return extra request headers.
+    """
+    return {'label': label, 'name': name, 'method': method, 'kwargs': kwargs or {}, 'data': data,
+            'role': role, 'before': before}
+
+
+def reset_throttles(fixtures):
+    caches['throttle'].clear()
+
+
+def fresh_token(fixtures):
+    caches['throttle'].clear()
+    return {'HTTP_AUTHORIZATION': 'Token ' + AuthToken.objects.create(user=fixtures['customer']).key}
+
+
+def business_id(fixtures, iteration):
+    return {'business_user_id': fixtures['business'].pk}
+
+
+BULK_DETAILS = [
+    {'title': 'Basic', 'revisions': 1, 'delivery_time_in_days': 3, 'price': '49.99', 'features': [], 'offer_type': 'basic'},
+    {'title': 'Standard', 'revisions': 3, 'delivery_time_in_days': 5, 'price': '99.99', 'features': [], 'offer_type': 'standard'},
+    {'title': 'Premium', 'revisions': 5, 'delivery_time_in_days': 7, 'price': '149.99', 'features': [], 'offer_type': 'premium'},
+]
+
+# Reads run first and writes last so the writes barely change the data the reads see.
+SCENARIOS = [
+    scenario('base-info', 'base-info', role='anonymous'),
+    scenario('metrics', 'metrics', role='anonymous'),
+    scenario('offers list', 'offer-list-create'),
+    scenario('offers list (anonymous, cached)', 'offer-list-create', role='anonymous'),
+    scenario('offers list ?ordering=min_price&min_price=50', 'offer-list-create',
+             data={'ordering': 'min_price', 'min_price': 50}),
+    scenario('offers list ?search=logo', 'offer-list-create', data={'search': 'logo'}),
+    scenario('offers list ?cursor=', 'offer-list-create', data={'cursor': ''}),
+    scenario('offers list ?creator_id=<top business>', 'offer-list-create',
+             data=lambda fixtures, iteration: {'creator_id': fixtures['business'].pk}),
+    scenario('offer detail', 'offer-detail', kwargs=lambda fixtures, iteration: {'pk': fixtures['offer'].pk}),
+    scenario('offerdetail detail', 'offerdetail-detail',
+             kwargs=lambda fixtures, iteration: {'pk': fixtures['offer_detail'].pk}),
+    scenario('orders list (customer)', 'order-list-create'),
+    scenario('orders list (business)', 'order-list-create', role='business'),
+    scenario('order detail', 'order-detail', kwargs=lambda fixtures, iteration: {'pk': fixtures['order'].pk}),
+    scenario('order-count', 'order-count', kwargs=business_id),
+    scenario('completed-order-count', 'completed-order-count', kwargs=business_id),
+    scenario('order-stats', 'order-stats', kwargs=business_id),
+    scenario('profile detail (business)', 'profile-detail',
+             kwargs=lambda fixtures, iteration: {'pk': fixtures['business'].pk}),
+    scenario('business profiles', 'business-profiles'),
+    scenario('customer profiles', 'customer-profiles'),
+    scenario('reviews ?business_user_id=<top business>', 'review-list-create',
+             data=lambda fixtures, iteration: {'business_user_id': fixtures['business'].pk, 'page_size': 20}),
+    scenario('reviews ?cursor=', 'review-list-create', data={'cursor': ''}),
+    scenario('review detail', 'review-detail', kwargs=lambda fixtures, iteration: {'pk': fixtures['review'].pk}),
+    scenario('login', 'login', method='post', role='anonymous', before=reset_throttles,
+             data=lambda fixtures, iteration: {'username': fixtures['customer'].username, 'password': fixtures['password']}),
+    scenario('registration', 'registration', method='post', role='anonymous', before=reset_throttles,
+             data=lambda fixtures, iteration: {
+                 'username': f'bench-new-{iteration}', 'email': f'bench-new-{iteration}@example.com',
+                 'password': 'Bench1234!', 'repeated_password': 'Bench1234!', 'type': 'customer',
+             }),
+    scenario('logout', 'logout', method='post', role='anonymous', before=fresh_token),
+    scenario('order create', 'order-list-create', method='post',
+             data=lambda fixtures, iteration: {'offer_detail_id': fixtures['offer_detail'].pk}),
+    scenario('offers bulk create x10', 'offer-bulk-create', method='post', role='business',
+             data=lambda fixtures, iteration: [
+                 {'title': f'Bench offer {iteration}-{index}', 'description': 'Benchmark', 'details': BULK_DETAILS}
+                 for index in range(10)
+             ]),
+]
+
+
+def url_names(resolver=None, prefix=''):
+    """Returns {name: route} for every named URL of the project, skipping the admin site."""
+    names = {}
+    for pattern in (resolver or get_resolver()).url_patterns:
+        route = prefix + str(pattern.pattern)
+        if isinstance(pattern, URLResolver):
+            if getattr(pattern, 'app_name', None) != 'admin':
+                names.update(url_names(pattern, route))
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            names[pattern.name] = route
+    return names
+
+
+def resolve(value, fixtures, iteration):
+    return value(fixtures, iteration) if callable(value) else value
+
+
+class Command(BaseCommand):
+    help = ('Benchmarks every API endpoint through the test client on a seeded throwaway database and reports '
+            'p50/p95/p99 latency, query count and SQL time as JSON, optionally failing on regressions.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--business-users', type=int, default=500)
+        parser.add_argument('--customers', type=int, default=5000)
+        parser.add_argument('--offers', type=int, default=50_000)
+        parser.add_argument('--orders', type=int, default=200_000)
+        parser.add_argument('--reviews', type=int, default=50_000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--repeat', type=int, default=50, help='Timed requests per endpoint.')
+        parser.add_argument('--warmup', type=int, default=3, help='Untimed requests per endpoint.')
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout.')
+        parser.add_argument('--baseline', help='JSON report to compare against.')
+        parser.add_argument('--threshold', type=float, default=20.0,
+                            help='Allowed latency growth over the baseline in percent.')
+        parser.add_argument('--metric', choices=['p50', 'p95', 'p99'], default='p95',
+                            help='Latency percentile compared against the baseline.')
+
+    def handle(self, *args, **options):
+        baseline = json.loads(Path(options['baseline']).read_text()) if options['baseline'] else None
+        dataset = {key: options[key] for key in ['business_users', 'customers', 'offers', 'orders', 'reviews', 'seed']}
+        # The test client sends Host: testserver, which the test runner would otherwise allow.
+        with benchmark_database(), override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            call_command('generate_load_data', prefix='bench', stdout=StringIO(), **dataset)
+            report = self.run_suite(options['repeat'], options['warmup'])
+        report['dataset'] = dataset
+        self._write_report(report, options['output'])
+        if baseline is not None:
+            if baseline.get('dataset') != dataset:
+                self.stderr.write(self.style.WARNING('Baseline was recorded on a different dataset.'))
+            regressions = compare_reports(report, baseline, options['threshold'], options['metric'])
+            if regressions:
+                raise CommandError('Regressions against the baseline:\n  ' + '\n  '.join(regressions))
+            self.stderr.write(self.style.SUCCESS('No regressions against the baseline.'))
+
+    def run_suite(self, repeat, warmup):
+        """Runs SCENARIOS against the current database and returns the report."""
+        fixtures = self._fixtures()
+        clients = {'anonymous': APIClient()}
+        for role in ['customer', 'business']:
+            clients[role] = APIClient()
+            clients[role].credentials(HTTP_AUTHORIZATION='Token ' + AuthToken.objects.create(user=fixtures[role]).key)
+        names = url_names()
+        covered = {item['name'] for item in SCENARIOS}
+        report = {
+            'generated_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'repeat': repeat,
+            'endpoints': {},
+            'uncovered': sorted(set(names) - covered),
+        }
+        for item in SCENARIOS:
+            report['endpoints'][item['label']] = self._measure(item, clients[item['role']], fixtures, repeat, warmup)
+            result = report['endpoints'][item['label']]
+            self.stderr.write(self._format(item['label'], result))
+            if any(status >= 400 for status in result['status']):
+                self.stderr.write(self.style.WARNING(f'{item["label"]} answered {result["status"]}'))
+        for name in report['uncovered']:
+            self.stderr.write(self.style.WARNING(f'No scenario for {name} ({names[name]})'))
+        return report
+
+    def _measure(self, item, client, fixtures, repeat, warmup):
+        latencies, queries, sql_times, statuses = [], [], [], set()
+        for iteration in range(warmup + repeat):
+            headers = item['before'](fixtures) if item['before'] else None
+            path = reverse(item['name'], kwargs=resolve(item['kwargs'], fixtures, iteration))
+            data = resolve(item['data'], fixtures, iteration)
+            request = getattr(client, item['method'])
+            recorder = QueryRecorder()
+            with connection.execute_wrapper(recorder):
+                start = time.perf_counter()
+                if item['method'] == 'get':
+                    response = request(path, data, **(headers or {}))
+                else:
+                    response = request(path, data, format='json', **(headers or {}))
+                elapsed = (time.perf_counter() - start) * 1000
+            if iteration < warmup:
+                continue
+            latencies.append(elapsed)
+            queries.append(recorder.count)
+            sql_times.append(recorder.seconds * 1000)
+            statuses.add(response.status_code)
+        return {
+            'method': item['method'].upper(),
+            'path': path,
+            'status': sorted(statuses),
+            'p50': round(percentile(latencies, 50), 2),
+            'p95': round(percentile(latencies, 95), 2),
+            'p99': round(percentile(latencies, 99), 2),
+            'mean': round(statistics.mean(latencies), 2),
+            'queries': max(queries),
+            'sql_ms': round(statistics.median(sql_times), 2),
+        }
+
+    def _fixtures(self):
+        """Picks the busiest business and customer so detail endpoints see the heavy tail."""
+        business = User.objects.get(pk=Offer.objects.order_by().values('user').annotate(total=Count('id'))
+                                    .order_by('-total').values_list('user', flat=True).first())
+        customer = User.objects.get(pk=Order.objects.order_by().values('customer_user').annotate(total=Count('id'))
+                                    .order_by('-total').values_list('customer_user', flat=True).first())
+        offer = Offer.objects.filter(user=business).order_by('-updated_at').first()
+        return {
+            'business': business,
+            'customer': customer,
+            'password': 'loadtest',
+            'offer': offer,
+            'offer_detail': OfferDetail.objects.filter(offer=offer).order_by('pk').first(),
+            'order': Order.objects.filter(customer_user=customer).order_by('-created_at').first(),
+            'review': (Review.objects.filter(business_user=business).order_by('-updated_at').first()
+                       or Review.objects.order_by('-updated_at').first()),
+        }
+
+    def _format(self, label, result):
+        return (f'{label:<48} p50 {result["p50"]:>8} ms  p95 {result["p95"]:>8} ms  p99 {result["p99"]:>8} ms  '
+                f'queries {result["queries"]:>3}  sql {result["sql_ms"]:>8} ms  status {result["status"]}')
+
+    def _write_report(self, report, output):
+        content = json.dumps(report, indent=2, ensure_ascii=False)
+        if output:
+            Path(output).write_text(content + '\n')
+            self.stderr.write(f'Report written to {output}')
+        else:
+            self.stdout.write(content)
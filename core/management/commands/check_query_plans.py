@@ -0,0 +1,90 @@
+import re
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import RequestFactory
+
+from offers_app.api.views import OfferListCreateView, OfferRetrieveUpdateDestroyView
+from offers_app.models import Offer
+from orders_app.api.views import OrderListCreateView, business_order_stats_queryset, newest_participant_orders
+from profiles_app.api.views import BusinessProfileListView, ProfileDetailView
+from reviews_app.api.views import ReviewListCreateView
+
+
+FULL_SCAN_PATTERNS = {
+    'sqlite': re.compile(r'\bSCAN (?!.*\bUSING\b)(\w+)'),
+    'postgresql': re.compile(r'\bSeq Scan on (\w+)'),
+}
+
+
+def view_queryset(view_class, params=None, user=None, **kwargs):
+    """Returns view_class.filter_queryset(get_queryset()) for a GET with the given query params, user and URL kwargs."""
+    view = view_class()
+    view.setup(RequestFactory().get('/', params or {}), **kwargs)
+    view.request = view.initialize_request(view.request, **kwargs)
+    view.request.user = user or User(pk=1)
+    view.format_kwarg = None
+    return view.filter_queryset(view.get_queryset())
+
+
+def page(view_class, params=None, user=None):
+    """The first page a list view fetches for the given query params."""
+    queryset = view_queryset(view_class, params, user)
+    return queryset[:view_class.pagination_class.page_size]
+
+
+def order_page(params=None, user=None):
+    """The first page of the order list, read per role the way OrderPagination does."""
+    user = user or User(pk=1)
+    page_size = OrderListCreateView.pagination_class.page_size
+    return newest_participant_orders(view_queryset(OrderListCreateView, params, user), user, page_size)[:page_size]
+
+
+def endpoint_queries():
+    """Returns the main query of each endpoint as (label, queryset) pairs, built by the endpoint's view."""
+    return [
+        ('GET /api/offers/', page(OfferListCreateView)),
+        ('GET /api/offers/?creator_id=', page(OfferListCreateView, {'creator_id': 1})),
+        ('GET /api/offers/?ordering=min_price', page(OfferListCreateView, {'ordering': 'min_price'})),
+        ('GET /api/offers/<pk>/', view_queryset(OfferRetrieveUpdateDestroyView, pk=1).filter(pk=1)),
+        ('PATCH /api/offers/<pk>/ (details)', Offer(pk=1).details.all()),
+        ('GET /api/orders/', order_page()),
+        ('GET /api/orders/?status=', order_page({'status': 'completed'})),
+        ('GET /api/order-count/<id>/', business_order_stats_queryset(1)),
+        ('GET /api/reviews/', page(ReviewListCreateView)),
+        ('GET /api/reviews/?business_user_id=', page(ReviewListCreateView, {'business_user_id': 1})),
+        ('GET /api/reviews/?reviewer_id=', page(ReviewListCreateView, {'reviewer_id': 1})),
+        ('GET /api/reviews/?ordering=-rating', page(ReviewListCreateView, {'ordering': '-rating'})),
+        ('GET /api/reviews/?business_user_id=&ordering=-rating',
+         page(ReviewListCreateView, {'business_user_id': 1, 'ordering': '-rating'})),
+        ('GET /api/reviews/?reviewer_id=&ordering=rating', page(ReviewListCreateView, {'reviewer_id': 1, 'ordering': 'rating'})),
+        ('GET /api/profiles/business/', view_queryset(BusinessProfileListView)),
+        ('GET /api/profile/<pk>/', ProfileDetailView().get_object_queryset().filter(user__pk=1)),
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Runs EXPLAIN for the main query of each endpoint and fails if any of them uses a full table scan.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        vendor = connections[options['database']].vendor
+        pattern = FULL_SCAN_PATTERNS.get(vendor)
+        if pattern is None:
+            raise CommandError(f'Query plan checks are not supported for {vendor}.')
+        failures = []
+        for label, queryset in endpoint_queries():
+            plan = queryset.using(options['database']).explain()
+            scanned = pattern.findall(plan)
+            if scanned:
+                failures.append(label)
+                self.stdout.write(self.style.ERROR(f'  ✘ {label}: full scan of {", ".join(scanned)}'))
+                self.stdout.write(f'    {plan}')
+            else:
+                self.stdout.write(f'  ✔ {label}')
+        if failures:
+            raise CommandError(f'{len(failures)} endpoint queries fall back to a full table scan.')
+        self.stdout.write(self.style.SUCCESS('All endpoint queries use an index.'))
@@ -104,6 +104,7 @@ class Command(BaseCommand):
                 OfferDetail(offer=offer1, title='Standard Logo', offer_type='standard', price=199.00, delivery_time_in_days=3, revisions=5, features=['3 Konzepte', 'PNG, JPG & SVG', '5 Revisionen', 'Quelldatei']),
                 OfferDetail(offer=offer1, title='Premium Logo', offer_type='premium', price=349.00, delivery_time_in_days=2, revisions=-1, features=['5 Konzepte', 'Alle Formate', 'Unbegrenzte Revisionen', 'Quelldatei', 'Branding-Guide']),
             ])
+            offer1.refresh_min_values()
         self._log_created('Angebot "Logo Design"', offer1_created)
 
         offer2, offer2_created = Offer.objects.get_or_create(
@@ -120,6 +121,7 @@ class Command(BaseCommand):
                 OfferDetail(offer=offer2, title='Business Paket', offer_type='standard', price=129.00, delivery_time_in_days=2, revisions=4, features=['15 Posts', '4 Revisionen', 'Story-Format']),
                 OfferDetail(offer=offer2, title='Premium Paket', offer_type='premium', price=229.00, delivery_time_in_days=1, revisions=-1, features=['30 Posts', 'Unbegrenzte Revisionen', 'Story & Reels', 'Branding']),
             ])
+            offer2.refresh_min_values()
         self._log_created('Angebot "Social Media Design"', offer2_created)
 
         offer3, offer3_created = Offer.objects.get_or_create(
@@ -136,6 +138,7 @@ class Command(BaseCommand):
                 OfferDetail(offer=offer3, title='Business Website', offer_type='standard', price=599.00, delivery_time_in_days=14, revisions=5, features=['5 Seiten', 'Responsive', 'Kontaktformular', '5 Revisionen']),
                 OfferDetail(offer=offer3, title='Premium Website', offer_type='premium', price=999.00, delivery_time_in_days=21, revisions=-1, features=['10 Seiten', 'CMS Integration', 'SEO-Optimierung', 'Unbegrenzte Revisionen']),
             ])
+            offer3.refresh_min_values()
         self._log_created('Angebot "Website Entwicklung"', offer3_created)
 
         rev1, rev1_created = Review.objects.get_or_create(
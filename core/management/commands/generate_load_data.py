@@ -0,0 +1,246 @@
+import random
+import time
+from array import array
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+from itertools import accumulate, islice
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from offers_app.cache import invalidate_offer_list
+from offers_app.models import Offer, OfferDetail
+from orders_app.models import Order, OrderStats
+from profiles_app.models import UserProfile
+from reviews_app.models import RatingSummary, Review
+
+
+FIRST_NAMES = ['Anna', 'Ben', 'Clara', 'David', 'Elena', 'Felix', 'Greta', 'Hannes', 'Ida', 'Jonas',
+               'Klara', 'Lukas', 'Mia', 'Noah', 'Olivia', 'Paul', 'Ronja', 'Simon', 'Tara', 'Yusuf']
+LAST_NAMES = ['Müller', 'Schmidt', 'Schneider', 'Fischer', 'Weber', 'Meyer', 'Wagner', 'Becker',
+              'Schulz', 'Hoffmann', 'Koch', 'Richter', 'Klein', 'Wolf', 'Neumann', 'Schwarz']
+CITIES = ['Berlin', 'Hamburg', 'München', 'Köln', 'Frankfurt', 'Stuttgart', 'Leipzig', 'Dresden', 'Wien', 'Zürich']
+CATEGORIES = ['Logo design', 'Website', 'Online shop', 'Mobile app', 'SEO audit', 'Product photos',
+              'Video editing', 'Copywriting', 'Translation', 'Social media kit', 'Illustration', 'Data analysis']
+SENTENCES = [
+    'Tailored to your brand and audience.',
+    'Includes a kickoff call and regular progress updates.',
+    'Delivered in all common formats.',
+    'Experienced in working with startups and agencies.',
+    'Fast turnaround without compromising on quality.',
+    'Revisions until you are happy with the result.',
+]
+
+# (offer_type, price factor, delivery factor, revisions, features); basic is always the cheapest and fastest.
+TIERS = [
+    (OfferDetail.BASIC, Decimal('1.0'), 1.0, 1, ['Source files']),
+    (OfferDetail.STANDARD, Decimal('2.0'), 1.5, 3, ['Source files', 'Commercial use']),
+    (OfferDetail.PREMIUM, Decimal('3.5'), 2.0, 5, ['Source files', 'Commercial use', 'Priority support']),
+]
+TIER_WEIGHTS = [55, 30, 15]
+STATUS_WEIGHTS = {Order.COMPLETED: 70, Order.IN_PROGRESS: 20, Order.CANCELLED: 10}
+RATING_WEIGHTS = {1: 4, 2: 4, 3: 10, 4: 30, 5: 52}
+# Shape of the Pareto weights: lower means a heavier tail (a few businesses get most offers, orders and reviews).
+PARETO_ALPHA = 1.2
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def pareto_cum_weights(rng, count):
+    """Returns cumulative heavy-tailed weights for random.choices() over count items."""
+    return list(accumulate(rng.paretovariate(PARETO_ALPHA) for _ in range(count)))
+
+
+@contextmanager
+def without_auto_timestamps(*models):
+    """Lets bulk_create() keep the generated created_at/updated_at instead of stamping the current time."""
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = 'Generates a large, seeded synthetic dataset with bulk inserts to reproduce production-scale load.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--business-users', type=int, default=50_000)
+        parser.add_argument('--customers', type=int, default=200_000)
+        parser.add_argument('--offers', type=int, default=1_000_000, help='Offers to create, each with 3 details.')
+        parser.add_argument('--orders', type=int, default=5_000_000)
+        parser.add_argument('--reviews', type=int, default=2_000_000,
+                            help='Target review count; capped at one review per customer and business.')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per bulk INSERT.')
+        parser.add_argument('--seed', type=int, default=42, help='Same seed and sizes give the same dataset.')
+        parser.add_argument('--days', type=int, default=730, help='Timestamps are spread over this many past days.')
+        parser.add_argument('--prefix', default='load', help='Username prefix of the generated users.')
+        parser.add_argument('--password', default='loadtest', help='Password of every generated user.')
+
+    def handle(self, *args, **options):
+        if options['business_users'] < 1 or options['customers'] < 1:
+            raise CommandError('At least one business user and one customer are required.')
+        if User.objects.filter(username__startswith=f'{options["prefix"]}-').exists():
+            raise CommandError(f'Users with the prefix "{options["prefix"]}-" already exist; pick another --prefix.')
+        self.verbosity = options['verbosity']
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+        self.span = options['days'] * 86400
+        password = make_password(options['password'])
+        start = time.perf_counter()
+        with without_auto_timestamps(UserProfile, Offer, Order, Review):
+            business_ids = self._create_users(options['business_users'], UserProfile.BUSINESS, options['prefix'], password)
+            customer_ids = self._create_users(options['customers'], UserProfile.CUSTOMER, options['prefix'], password)
+            offers = self._create_offers(options['offers'], business_ids)
+            self._create_orders(options['orders'], offers, customer_ids)
+            self._create_reviews(options['reviews'], business_ids, customer_ids)
+        for label, model in [('Order stats', OrderStats), ('Rating summaries', RatingSummary)]:
+            started = time.perf_counter()
+            self._log(label, model.rebuild(), started)
+        invalidate_offer_list()
+        self.stdout.write(self.style.SUCCESS(f'Load data generated in {time.perf_counter() - start:.1f}s.'))
+
+    def _past(self, after=None):
+        """Returns a past timestamp, skewed towards recent activity, optionally not before after."""
+        if after is None:
+            return self.now - timedelta(seconds=self.rng.random() ** 2 * self.span)
+        return after + timedelta(seconds=self.rng.random() * (self.now - after).total_seconds())
+
+    def _insert(self, model, objects, label, total):
+        """Bulk inserts objects in batches and returns their primary keys."""
+        started = time.perf_counter()
+        ids = array('q')
+        for batch in batched(objects, self.batch_size):
+            ids.extend(obj.pk for obj in model.objects.bulk_create(batch))
+            if self.verbosity > 1:
+                self.stdout.write(f'  {label}: {len(ids)}/{total}')
+        self._log(label, len(ids), started)
+        return ids
+
+    def _log(self, label, count, started):
+        self.stdout.write(f'{label}: {count} rows ({time.perf_counter() - started:.1f}s)')
+
+    def _create_users(self, count, user_type, prefix, password):
+        label = 'Business users' if user_type == UserProfile.BUSINESS else 'Customers'
+        short_type = 'biz' if user_type == UserProfile.BUSINESS else 'cust'
+        joined = [self._past() for _ in range(count)]
+
+        def users():
+            for index in range(count):
+                first_name, last_name = self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+                username = f'{prefix}-{short_type}-{index}'
+                yield User(username=username, password=password, first_name=first_name, last_name=last_name,
+                           email=f'{username}@example.com', date_joined=joined[index])
+
+        user_ids = self._insert(User, users(), label, count)
+        profiles = (
+            UserProfile(user_id=user_id, type=user_type, location=self.rng.choice(CITIES),
+                        created_at=joined[index], updated_at=joined[index])
+            for index, user_id in enumerate(user_ids)
+        )
+        self._insert(UserProfile, profiles, f'{label} profiles', count)
+        return user_ids
+
+    def _create_offers(self, count, business_ids):
+        """Creates offers spread over businesses with heavy-tailed weights; returns owner and base values per offer."""
+        owners = array('q', self.rng.choices(business_ids, cum_weights=pareto_cum_weights(self.rng, len(business_ids)), k=count))
+        base_prices = array('d', (round(self.rng.lognormvariate(4, 0.8) + 5, 2) for _ in range(count)))
+        base_days = array('b', (self.rng.randint(1, 14) for _ in range(count)))
+
+        def offers():
+            for index in range(count):
+                created_at = self._past()
+                yield Offer(
+                    user_id=owners[index],
+                    title=f'{self.rng.choice(CATEGORIES)} #{index}',
+                    description=' '.join(self.rng.sample(SENTENCES, 3)),
+                    min_price=Decimal(str(base_prices[index])),
+                    min_delivery_time=base_days[index],
+                    created_at=created_at,
+                    updated_at=self._past(after=created_at),
+                )
+
+        offer_ids = self._insert(Offer, offers(), 'Offers', count)
+        details = (
+            OfferDetail(offer_id=offer_id, **self._tier(tier, base_prices[index], base_days[index]))
+            for index, offer_id in enumerate(offer_ids) for tier in TIERS
+        )
+        self._insert(OfferDetail, details, 'Offer details', count * len(TIERS))
+        return offer_ids, owners, base_prices, base_days
+
+    def _tier(self, tier, base_price, base_days):
+        offer_type, price_factor, days_factor, revisions, features = tier
+        return {
+            'title': offer_type.capitalize(),
+            'revisions': revisions,
+            'delivery_time_in_days': max(1, round(base_days * days_factor)),
+            'price': (Decimal(str(base_price)) * price_factor).quantize(Decimal('0.01')),
+            'features': features,
+            'offer_type': offer_type,
+        }
+
+    def _create_orders(self, count, offers, customer_ids):
+        """Creates orders with heavy-tailed offer popularity, copying the ordered tier like the API does."""
+        offer_ids, owners, base_prices, base_days = offers
+        if not offer_ids:
+            return
+        popularity = pareto_cum_weights(self.rng, len(offer_ids))
+        statuses, status_weights = list(STATUS_WEIGHTS), list(STATUS_WEIGHTS.values())
+
+        def orders():
+            for _ in range(count):
+                index = self.rng.choices(range(len(offer_ids)), cum_weights=popularity)[0]
+                tier = self.rng.choices(TIERS, weights=TIER_WEIGHTS)[0]
+                created_at = self._past()
+                yield Order(
+                    customer_user_id=self.rng.choice(customer_ids),
+                    business_user_id=owners[index],
+                    status=self.rng.choices(statuses, weights=status_weights)[0],
+                    created_at=created_at,
+                    updated_at=self._past(after=created_at),
+                    **self._tier(tier, base_prices[index], base_days[index]),
+                )
+
+        self._insert(Order, orders(), 'Orders', count)
+
+    def _create_reviews(self, count, business_ids, customer_ids):
+        """Creates reviews with a heavy-tailed count per business and distinct reviewers per business."""
+        per_business = [0] * len(business_ids)
+        weights = pareto_cum_weights(self.rng, len(business_ids))
+        for batch in batched(range(count), self.batch_size):
+            for index in self.rng.choices(range(len(business_ids)), cum_weights=weights, k=len(batch)):
+                per_business[index] += 1
+        ratings, rating_weights = list(RATING_WEIGHTS), list(RATING_WEIGHTS.values())
+        capped = sum(max(0, reviews - len(customer_ids)) for reviews in per_business)
+
+        def reviews():
+            for index, business_id in enumerate(business_ids):
+                for reviewer in self.rng.sample(range(len(customer_ids)), min(per_business[index], len(customer_ids))):
+                    created_at = self._past()
+                    yield Review(
+                        business_user_id=business_id,
+                        reviewer_id=customer_ids[reviewer],
+                        rating=self.rng.choices(ratings, weights=rating_weights)[0],
+                        description=self.rng.choice(SENTENCES),
+                        created_at=created_at,
+                        updated_at=self._past(after=created_at),
+                    )
+
+        self._insert(Review, reviews(), 'Reviews', count - capped)
+        if capped:
+            self.stdout.write(self.style.WARNING(f'{capped} reviews skipped: a customer reviews each business once.'))
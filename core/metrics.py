@@ -0,0 +1,221 @@
+"""Request histograms in the Prometheus text format, served by /api/metrics/.
+
+Samples are float counters addressed by a key holding the sample name and its labels.
+Without METRICS_MULTIPROC_DIR they live in a dict of the current process. With it,
+every process owns one mmap-backed file in that directory (``metrics_<pid>.db``)
+and only ever writes its own file, so no cross-process locking is needed; a scrape
+handled by any worker sums the files of all workers. Histograms store one counter
+per bucket and are made cumulative when rendered, so summing files stays correct.
+Clear the directory when the server (not a single worker) restarts.
+"""
+
+import json
+import math
+import mmap
+import os
+import struct
+import threading
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+
+
+INITIAL_FILE_SIZE = 64 * 1024
+HEADER = struct.Struct('<Q')
+KEY_LENGTH = struct.Struct('<I')
+VALUE = struct.Struct('<d')
+
+
+def sample_key(name, labels):
+    return json.dumps([name, sorted(labels.items())])
+
+
+class InProcessStore:
+    """Samples of the current process only."""
+
+    def __init__(self):
+        self.values = defaultdict(float)
+        self.lock = threading.Lock()
+
+    def inc(self, key, amount):
+        with self.lock:
+            self.values[key] += amount
+
+    def read(self):
+        with self.lock:
+            return dict(self.values)
+
+
+class MmapFile:
+    """Append-only key -> double file: an 8-byte used-size header, then (length, key, padding, value) entries.
+
+    A new entry is written before the header is advanced, so readers in other processes never see a
+    partial entry; values are 8-byte aligned, so their writes are not torn either.
+    """
+
+    def __init__(self, path):
+        self.file = open(path, 'a+b')
+        if os.fstat(self.file.fileno()).st_size == 0:
+            self.file.truncate(INITIAL_FILE_SIZE)
+        self.map = mmap.mmap(self.file.fileno(), 0)
+        self.used = HEADER.unpack_from(self.map, 0)[0] or HEADER.size
+        self.offsets = {key: offset for key, offset, _ in read_entries(self.map, self.used)}
+
+    def inc(self, key, amount):
+        offset = self.offsets.get(key)
+        if offset is None:
+            offset = self._append(key)
+        VALUE.pack_into(self.map, offset, VALUE.unpack_from(self.map, offset)[0] + amount)
+
+    def _append(self, key):
+        encoded = key.encode()
+        padded = math.ceil((KEY_LENGTH.size + len(encoded)) / 8) * 8
+        end = self.used + padded + VALUE.size
+        if end > len(self.map):
+            self._grow(end)
+        KEY_LENGTH.pack_into(self.map, self.used, len(encoded))
+        self.map[self.used + KEY_LENGTH.size:self.used + KEY_LENGTH.size + len(encoded)] = encoded
+        offset = self.used + padded
+        VALUE.pack_into(self.map, offset, 0.0)
+        self.used = end
+        HEADER.pack_into(self.map, 0, self.used)
+        self.offsets[key] = offset
+        return offset
+
+    def _grow(self, needed):
+        size = len(self.map)
+        while size < needed:
+            size *= 2
+        self.map.close()
+        self.file.truncate(size)
+        self.map = mmap.mmap(self.file.fileno(), 0)
+
+
+def read_entries(buffer, used=None):
+    """Yields (key, value offset, value) of an MmapFile buffer."""
+    used = used or HEADER.unpack_from(buffer, 0)[0]
+    position = HEADER.size
+    while position < used:
+        length = KEY_LENGTH.unpack_from(buffer, position)[0]
+        key = bytes(buffer[position + KEY_LENGTH.size:position + KEY_LENGTH.size + length]).decode()
+        offset = position + math.ceil((KEY_LENGTH.size + length) / 8) * 8
+        yield key, offset, VALUE.unpack_from(buffer, offset)[0]
+        position = offset + VALUE.size
+
+
+class FileStore:
+    """Samples of all processes sharing directory; each process writes metrics_<pid>.db."""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.pid = None
+        self.file = None
+
+    def inc(self, key, amount):
+        with self.lock:
+            if self.pid != os.getpid():
+                # Opened lazily and again after a fork, so preloaded workers never share a file.
+                self.pid = os.getpid()
+                self.file = MmapFile(self.directory / f'metrics_{self.pid}.db')
+            self.file.inc(key, amount)
+
+    def read(self):
+        totals = defaultdict(float)
+        for path in self.directory.glob('metrics_*.db'):
+            data = path.read_bytes()
+            if len(data) < HEADER.size:
+                continue
+            for key, _, value in read_entries(data):
+                totals[key] += value
+        return dict(totals)
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store():
+    """Returns the store for the current METRICS_MULTIPROC_DIR setting."""
+    directory = settings.METRICS_MULTIPROC_DIR
+    store = _stores.get(directory)
+    if store is None:
+        with _stores_lock:
+            store = _stores.setdefault(directory, FileStore(directory) if directory else InProcessStore())
+    return store
+
+
+class Histogram:
+    def __init__(self, name, documentation, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = [*buckets, math.inf]
+
+    def observe(self, store, labels, value):
+        bound = next(bound for bound in self.buckets if value <= bound)
+        store.inc(sample_key(f'{self.name}_bucket', {**labels, 'le': format_value(bound)}), 1)
+        store.inc(sample_key(f'{self.name}_sum', labels), value)
+
+    def render(self, values):
+        """Returns the exposition lines of this histogram from a store's read() values."""
+        series = defaultdict(lambda: {'buckets': defaultdict(float), 'sum': 0.0})
+        for key, value in values.items():
+            name, labels = json.loads(key)
+            labels = dict(labels)
+            if name == f'{self.name}_bucket':
+                bound = labels.pop('le')
+                series[tuple(sorted(labels.items()))]['buckets'][bound] += value
+            elif name == f'{self.name}_sum':
+                series[tuple(sorted(labels.items()))]['sum'] += value
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        for labels, data in sorted(series.items()):
+            cumulative = 0.0
+            for bound in self.buckets:
+                cumulative += data['buckets'].get(format_value(bound), 0.0)
+                lines.append(f'{self.name}_bucket{format_labels(labels, le=format_value(bound))} {format_value(cumulative)}')
+            lines.append(f'{self.name}_sum{format_labels(labels)} {format_value(data["sum"])}')
+            lines.append(f'{self.name}_count{format_labels(labels)} {format_value(cumulative)}')
+        return lines
+
+
+def format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if value != int(value) else f'{int(value)}.0'
+
+
+def format_labels(labels, **extra):
+    pairs = [*labels, *extra.items()]
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+REQUEST_DURATION = Histogram(
+    'coderr_request_duration_seconds', 'Time spent handling a request.',
+    [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10],
+)
+RESPONSE_SIZE = Histogram(
+    'coderr_response_size_bytes', 'Size of the response body.',
+    [100, 1000, 10_000, 100_000, 1_000_000, 10_000_000],
+)
+REQUEST_QUERIES = Histogram(
+    'coderr_request_queries', 'Database queries run by a request.',
+    [0, 1, 2, 5, 10, 20, 50, 100, 200, 500],
+)
+HISTOGRAMS = [REQUEST_DURATION, RESPONSE_SIZE, REQUEST_QUERIES]
+
+
+def record_request(view, status, seconds, size, queries):
+    store = get_store()
+    labels = {'view': view, 'status': str(status)}
+    REQUEST_DURATION.observe(store, labels, seconds)
+    if size is not None:
+        RESPONSE_SIZE.observe(store, labels, size)
+    REQUEST_QUERIES.observe(store, labels, queries)
+
+
+def render_metrics():
+    values = get_store().read()
+    return '\n'.join(line for histogram in HISTOGRAMS for line in histogram.render(values)) + '\n'
@@ -0,0 +1,204 @@
+import hashlib
+import json
+import logging
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from rest_framework.permissions import SAFE_METHODS
+
+from core.benchmark import QueryRecorder, record_queries
+from core.db_router import pinned_to_primary, read_replica
+from core.metrics import record_request
+from core.profiling import RequestProfile, current_profile, serializer_timer
+
+profiling_logger = logging.getLogger('core.profiling')
+
+
+class HybridMiddleware:
+    """Base of the project middleware: runs natively in both the sync (WSGI) and async (ASGI) stack.
+
+    Subclasses implement __call__ for sync requests and __acall__ for async ones, like
+    django.utils.deprecation.MiddlewareMixin does; a sync-only middleware would push every
+    async view behind a thread hop.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+
+class ReplicaRoutingMiddleware(HybridMiddleware):
+    """Lets PrimaryReplicaRouter read from one randomly picked replica during GET/HEAD/OPTIONS requests.
+
+    After a client sends a write request, its reads stay on the primary for REPLICA_PIN_SECONDS
+    so it reads its own writes despite replication lag. Clients are told apart by their
+    Authorization header, falling back to the remote address. The pins live in the default cache,
+    which must be shared between workers (see core.checks). Not loaded without replicas.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REPLICA_DATABASES:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        pin_key = self.pin_key(request)
+        safe = request.method in SAFE_METHODS
+        replica_token = read_replica.set(self.pick_replica() if safe and not cache.get(pin_key) else None)
+        pinned_token = pinned_to_primary.set(False)
+        try:
+            response = self.get_response(request)
+        finally:
+            read_replica.reset(replica_token)
+            pinned_to_primary.reset(pinned_token)
+        if not safe:
+            cache.set(pin_key, True, settings.REPLICA_PIN_SECONDS)
+        return response
+
+    async def __acall__(self, request):
+        pin_key = self.pin_key(request)
+        safe = request.method in SAFE_METHODS
+        replica_token = read_replica.set(self.pick_replica() if safe and not await cache.aget(pin_key) else None)
+        pinned_token = pinned_to_primary.set(False)
+        try:
+            response = await self.get_response(request)
+        finally:
+            read_replica.reset(replica_token)
+            pinned_to_primary.reset(pinned_token)
+        if not safe:
+            await cache.aset(pin_key, True, settings.REPLICA_PIN_SECONDS)
+        return response
+
+    def pick_replica(self):
+        return random.choice(settings.REPLICA_DATABASES)
+
+    def pin_key(self, request):
+        client = request.META.get('HTTP_AUTHORIZATION') or request.META.get('REMOTE_ADDR', '')
+        return 'replica-pin:' + hashlib.sha256(client.encode()).hexdigest()
+
+
+class RequestProfilingMiddleware(HybridMiddleware):
+    """Measures queries, SQL time, serializer time and view time of every request (REQUEST_PROFILING).
+
+    Results go into a Server-Timing header and one JSON log line on the core.profiling logger,
+    logged as a warning when a SQL template repeats often enough to be an N+1 (see core.profiling).
+    Not loaded unless REQUEST_PROFILING is set, so it costs nothing when turned off.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_PROFILING:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        profile = RequestProfile(settings.REQUEST_PROFILING_REPEAT_THRESHOLD)
+        token = current_profile.set(profile)
+        start = time.perf_counter()
+        try:
+            with record_queries(profile), serializer_timer():
+                response = self.get_response(request)
+        finally:
+            current_profile.reset(token)
+        return self.finish(request, response, profile, start)
+
+    async def __acall__(self, request):
+        profile = RequestProfile(settings.REQUEST_PROFILING_REPEAT_THRESHOLD)
+        token = current_profile.set(profile)
+        start = time.perf_counter()
+        try:
+            with record_queries(profile), serializer_timer():
+                response = await self.get_response(request)
+        finally:
+            current_profile.reset(token)
+        return self.finish(request, response, profile, start)
+
+    def finish(self, request, response, profile, start):
+        finished = time.perf_counter()
+        timings = {
+            'db': profile.seconds,
+            'serialize': profile.serialize_seconds,
+            'view': profile.view_seconds(finished),
+            'total': finished - start,
+        }
+        response['Server-Timing'] = ', '.join(
+            f'{name};dur={seconds * 1000:.2f}' + (f';desc="{profile.count} queries"' if name == 'db' else '')
+            for name, seconds in timings.items()
+        )
+        self.log(request, response, profile, timings)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        profile = current_profile.get()
+        view = getattr(view_func, 'view_class', view_func)
+        profile.view_name = f'{view.__module__}.{view.__qualname__}'
+        profile.view_started = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered after this hook, so the view time excludes rendering.
+        current_profile.get().view_finished = time.perf_counter()
+        return response
+
+    def log(self, request, response, profile, timings):
+        repeated = profile.repeated_queries()
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'view': profile.view_name,
+            'status': response.status_code,
+            'queries': profile.count,
+            **{f'{name}_ms': round(seconds * 1000, 2) for name, seconds in timings.items()},
+            'repeated_queries': repeated,
+        }
+        profiling_logger.log(logging.WARNING if repeated else logging.INFO, json.dumps(record))
+
+
+class MetricsMiddleware(HybridMiddleware):
+    """Feeds the latency, response size and query count histograms of core.metrics (METRICS_ENABLED).
+
+    Samples are labeled by view class and status code; requests that resolve to no view count as
+    'unresolved'.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with record_queries(recorder):
+            response = self.get_response(request)
+        self.record(request, response, start, recorder)
+        return response
+
+    async def __acall__(self, request):
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with record_queries(recorder):
+            response = await self.get_response(request)
+        self.record(request, response, start, recorder)
+        return response
+
+    def record(self, request, response, start, recorder):
+        # Read off the resolver match rather than in process_view(), which the async stack would
+        # call through a thread hop.
+        match = getattr(request, 'resolver_match', None)
+        view = getattr(match.func, 'view_class', match.func).__name__ if match else 'unresolved'
+        size = None if response.streaming else len(response.content)
+        record_request(view, response.status_code, time.perf_counter() - start, size, recorder.count)
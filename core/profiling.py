@@ -0,0 +1,141 @@
+"""Per-request timing used by core.middleware.RequestProfilingMiddleware.
+
+A RequestProfile is installed as the execute wrapper of every database connection for
+the duration of a request. It adds up queries and their time, and counts each SQL
+template (the statement with its placeholders, IN lists collapsed). A template that
+runs REQUEST_PROFILING_REPEAT_THRESHOLD times or more in one request is the N+1
+signature: its count grows with the page size. Its call site and the serializer being
+rendered are captured the moment the threshold is crossed, so the stack walk is only
+paid for offending queries.
+"""
+
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+import django
+import rest_framework
+from django.conf import settings
+from rest_framework.serializers import BaseSerializer
+
+from core.benchmark import QueryRecorder
+
+
+current_profile = ContextVar('current_profile', default=None)
+
+IN_LIST = re.compile(r'\((?:%s,\s*)+%s\)')
+WHITESPACE = re.compile(r'\s+')
+LIBRARY_DIRS = (str(Path(django.__file__).parent), str(Path(rest_framework.__file__).parent))
+MIDDLEWARE_MODULE = str(Path(__file__).with_name('middleware.py'))
+PROFILING_MODULES = (__file__, str(Path(__file__).with_name('benchmark.py')))
+
+
+def sql_template(sql):
+    """Returns the statement with IN (...) placeholder lists collapsed so repeats of one query compare equal."""
+    return IN_LIST.sub('(%s, ...)', WHITESPACE.sub(' ', sql).strip())
+
+
+def call_site():
+    """Returns 'path:line in function' of the innermost project frame that ran the query.
+
+    Django, DRF, other installed packages and the profiling code are skipped. The walk stops at the
+    project middleware, so a query only library code ran (e.g. a DRF field following a relation)
+    returns None; the serializer reported next to it names the culprit then.
+    """
+    base_dir = str(settings.BASE_DIR)
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename == MIDDLEWARE_MODULE:
+            return None
+        if (filename.startswith(base_dir) and 'site-packages' not in filename
+                and filename not in PROFILING_MODULES and not filename.startswith(LIBRARY_DIRS)):
+            return f'{Path(filename).relative_to(base_dir)}:{frame.f_lineno} in {frame.f_code.co_name}'
+        frame = frame.f_back
+    return None
+
+
+class RequestProfile(QueryRecorder):
+    """Query, SQL, serializer and view timings of one request."""
+
+    def __init__(self, repeat_threshold):
+        super().__init__()
+        self.repeat_threshold = repeat_threshold
+        self.templates = Counter()
+        self.call_sites = {}
+        self.serialize_seconds = 0.0
+        self.serializing = None
+        self.view_name = None
+        self.view_started = None
+        self.view_finished = None
+
+    def __call__(self, execute, sql, params, many, context):
+        try:
+            return super().__call__(execute, sql, params, many, context)
+        finally:
+            template = sql_template(sql)
+            with self.lock:
+                self.templates[template] += 1
+                repeated = self.templates[template] == self.repeat_threshold
+            if repeated:
+                self.call_sites[template] = (call_site(), self.serializing)
+
+    def repeated_queries(self):
+        """Returns the templates that ran at least repeat_threshold times, most frequent first."""
+        return [
+            {'sql': template, 'count': count, 'call_site': site, 'serializer': serializer}
+            for template, count in self.templates.most_common()
+            if count >= self.repeat_threshold
+            for site, serializer in [self.call_sites.get(template, (None, None))]
+        ]
+
+    def view_seconds(self, finished):
+        if self.view_started is None:
+            return 0.0
+        return (self.view_finished or finished) - self.view_started
+
+
+serializer_timer_lock = threading.Lock()
+serializer_timer_users = 0
+original_serializer_data = BaseSerializer.data
+
+
+def timed_serializer_data(self):
+    """BaseSerializer.data timing top-level accesses into the current profile; nested serializers count once."""
+    profile = current_profile.get()
+    if profile is None or profile.serializing:
+        return original_serializer_data.fget(self)
+    serializer = type(getattr(self, 'child', self))
+    profile.serializing = f'{serializer.__module__}.{serializer.__qualname__}'
+    start = time.perf_counter()
+    try:
+        return original_serializer_data.fget(self)
+    finally:
+        profile.serialize_seconds += time.perf_counter() - start
+        profile.serializing = None
+
+
+@contextmanager
+def serializer_timer():
+    """Times serializer .data into the current profile for the duration of the block.
+
+    BaseSerializer.data is patched when the first of any concurrent profiled requests starts and
+    restored when the last one finishes, so code outside profiled requests never runs the wrapper.
+    """
+    global serializer_timer_users
+    with serializer_timer_lock:
+        if serializer_timer_users == 0:
+            BaseSerializer.data = property(timed_serializer_data)
+        serializer_timer_users += 1
+    try:
+        yield
+    finally:
+        with serializer_timer_lock:
+            serializer_timer_users -= 1
+            if serializer_timer_users == 0:
+                BaseSerializer.data = original_serializer_data
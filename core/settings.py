@@ -11,7 +11,8 @@ https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
 from pathlib import Path
-from decouple import config
+from decouple import Csv, config
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -39,7 +40,6 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'rest_framework',
-    'rest_framework.authtoken',
     'corsheaders',
     'core',
     'auth_app',
@@ -51,6 +51,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.RequestProfilingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -59,7 +61,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    
+    'core.middleware.ReplicaRoutingMiddleware',
 ]
 
 ROOT_URLCONF = 'core.urls'
@@ -85,17 +87,138 @@ WSGI_APPLICATION = 'core.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DB_ENGINE=sqlite (default) or postgres; see .env.example for the related options.
+DB_ENGINE = config('DB_ENGINE', default='sqlite')
+
+if DB_ENGINE == 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': config('DB_NAME', default='coderr'),
+            'USER': config('DB_USER', default='coderr'),
+            'PASSWORD': config('DB_PASSWORD', default=''),
+            'HOST': config('DB_HOST', default='localhost'),
+            'PORT': config('DB_PORT', default='5432'),
+            # Keep connections open between requests instead of reconnecting on each one.
+            'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {},
+        }
+    }
+    if config('DB_POOL', default=False, cast=bool):
+        # psycopg's connection pool replaces persistent connections; Django requires CONN_MAX_AGE=0 with it.
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+            'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+            'timeout': config('DB_POOL_TIMEOUT', default=10, cast=int),
+        }
+elif DB_ENGINE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': config('DB_NAME', default=str(BASE_DIR / 'db.sqlite3')),
+            'OPTIONS': {},
+        }
     }
+    # WAL lets readers run alongside the single writer, BEGIN IMMEDIATE takes the write lock up front
+    # so concurrent writers queue on busy_timeout instead of failing with "database is locked".
+    # Turn off (DB_SQLITE_TUNING=False) on file systems without shared-memory support, e.g. NFS.
+    if config('DB_SQLITE_TUNING', default=True, cast=bool):
+        DATABASES['default']['OPTIONS'] = {
+            'transaction_mode': 'IMMEDIATE',
+            'init_command': ';'.join([
+                'PRAGMA journal_mode=WAL',
+                'PRAGMA synchronous=NORMAL',
+                f"PRAGMA mmap_size={config('DB_SQLITE_MMAP_SIZE', default=128 * 1024 * 1024, cast=int)}",
+                f"PRAGMA busy_timeout={config('DB_SQLITE_BUSY_TIMEOUT_MS', default=20000, cast=int)}",
+            ]),
+        }
+else:
+    raise ImproperlyConfigured(f"DB_ENGINE must be 'sqlite' or 'postgres', not {DB_ENGINE!r}.")
+
+# Read replicas: comma-separated SQLite files or Postgres hosts, available as replica1, replica2, ...
+# Safe-method requests read from them; writes and the client's reads right after a write use default.
+REPLICA_DATABASES = []
+for _index, _replica in enumerate(config('DB_REPLICAS', default='', cast=Csv()), start=1):
+    _alias = f'replica{_index}'
+    _location = {'HOST': _replica} if DB_ENGINE == 'postgres' else {'NAME': _replica}
+    DATABASES[_alias] = {**DATABASES['default'], **_location, 'TEST': {'MIRROR': 'default'}}
+    REPLICA_DATABASES.append(_alias)
+if REPLICA_DATABASES:
+    DATABASE_ROUTERS = ['core.db_router.PrimaryReplicaRouter']
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=5, cast=int)
+
+
+# Cache
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+
+OFFER_LIST_CACHE_BACKEND = config('OFFER_LIST_CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache')
+
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='coderr'),
+    },
+    # Login/registration throttle counters; process-local so the checks never leave the worker.
+    'throttle': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'coderr-throttle',
+    },
+    # Rendered anonymous pages of GET /api/offers/ (offers_app.cache). LocMemCache evicts least recently
+    # used entries beyond MAX_ENTRIES; point it at Redis (maxmemory-policy allkeys-lru) or Memcached to
+    # share pages and the invalidation counter across workers.
+    'offer_list': {
+        'BACKEND': OFFER_LIST_CACHE_BACKEND,
+        'LOCATION': config('OFFER_LIST_CACHE_LOCATION', default='coderr-offer-list'),
+        'TIMEOUT': config('OFFER_LIST_CACHE_SECONDS', default=300, cast=int),
+        # Redis and Memcached clients reject MAX_ENTRIES; their own eviction policy bounds them.
+        'OPTIONS': (
+            {'MAX_ENTRIES': config('OFFER_LIST_CACHE_MAX_ENTRIES', default=1000, cast=int)}
+            if OFFER_LIST_CACHE_BACKEND.endswith('LocMemCache') else {}
+        ),
+    },
 }
 
+# Seconds /api/base-info/ serves the same platform statistics before recomputing them.
+BASE_INFO_CACHE_SECONDS = config('BASE_INFO_CACHE_SECONDS', default=60, cast=int)
+
+# Threads (each with its own database connection) that async views use to run independent queries
+# concurrently, see core.async_db. Bounds the extra connections per process; 0 runs them one after
+# another. Off on SQLite, where the queries share one process and new connections cost more than
+# the overlap saves.
+ASYNC_QUERY_WORKERS = config('ASYNC_QUERY_WORKERS', default=0 if DB_ENGINE == 'sqlite' else 8, cast=int)
+
+# Serve the async views of core.asgi_urls to ASGI requests (core.asgi). Off by default: measure with
+# bench_asgi first, the sync views under ASGI are faster for most endpoints on the bench dataset.
+ASGI_ASYNC_VIEWS = config('ASGI_ASYNC_VIEWS', default=False, cast=bool)
+
+# Seconds an auth token's user and profile stay cached. Invalidation only reaches the local process
+# unless CACHE_BACKEND is shared (Redis, Memcached), so keep this short with the default LocMemCache.
+AUTH_TOKEN_CACHE_SECONDS = config('AUTH_TOKEN_CACHE_SECONDS', default=60, cast=int)
+
+# Auth tokens expire after AUTH_TOKEN_IDLE_HOURS without use or AUTH_TOKEN_MAX_AGE_HOURS after login.
+# last_used_at is written at most once per AUTH_TOKEN_TOUCH_SECONDS per token.
+AUTH_TOKEN_IDLE_HOURS = config('AUTH_TOKEN_IDLE_HOURS', default=24 * 14, cast=int)
+AUTH_TOKEN_MAX_AGE_HOURS = config('AUTH_TOKEN_MAX_AGE_HOURS', default=24 * 30, cast=int)
+AUTH_TOKEN_TOUCH_SECONDS = config('AUTH_TOKEN_TOUCH_SECONDS', default=60, cast=int)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
+# Hasher for new and re-hashed passwords: pbkdf2 (default), scrypt or argon2 (needs argon2-cffi).
+# The others stay enabled, so existing hashes still verify and are upgraded on the next login.
+PASSWORD_HASHER = config('PASSWORD_HASHER', default='pbkdf2')
+_PASSWORD_HASHERS = {
+    'pbkdf2': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'scrypt': 'django.contrib.auth.hashers.ScryptPasswordHasher',
+    'argon2': 'django.contrib.auth.hashers.Argon2PasswordHasher',
+}
+PASSWORD_HASHERS = [_PASSWORD_HASHERS[PASSWORD_HASHER]] + [
+    hasher for name, hasher in _PASSWORD_HASHERS.items() if name != PASSWORD_HASHER
+] + ['django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher']
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -145,14 +268,50 @@ CORS_ALLOW_METHODS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'auth_app.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': config('LOGIN_IP_RATE', default='20/min'),
+        'login_username': config('LOGIN_USERNAME_RATE', default='5/min'),
+        'registration_ip': config('REGISTRATION_IP_RATE', default='10/hour'),
+        'registration_username': config('REGISTRATION_USERNAME_RATE', default='5/hour'),
+    },
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
         'rest_framework.filters.SearchFilter',
-        'rest_framework.filters.OrderingFilter',
+        'core.api.filters.StableOrderingFilter',
     ],
 }
+
+
+# Request profiling
+# Opt-in: core.middleware.RequestProfilingMiddleware adds a Server-Timing header and logs one JSON line
+# per request on the core.profiling logger, as a warning when a SQL template runs
+# REQUEST_PROFILING_REPEAT_THRESHOLD times or more in one request (N+1).
+
+REQUEST_PROFILING = config('REQUEST_PROFILING', default=False, cast=bool)
+REQUEST_PROFILING_REPEAT_THRESHOLD = config('REQUEST_PROFILING_REPEAT_THRESHOLD', default=5, cast=int)
+
+# Metrics (off by default)
+# With METRICS_ENABLED, core.middleware.MetricsMiddleware records latency, response size and query count histograms per view
+# and status, served in the Prometheus text format at /api/metrics/. With several worker processes set
+# METRICS_MULTIPROC_DIR to a directory they share (emptied on server start) so every scrape covers all
+# of them. With METRICS_TOKEN set, scrapes must send "Authorization: Bearer <token>".
+
+METRICS_ENABLED = config('METRICS_ENABLED', default=False, cast=bool)
+METRICS_MULTIPROC_DIR = config('METRICS_MULTIPROC_DIR', default='')
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core.profiling': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
@@ -0,0 +1,102 @@
+import asyncio
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg
+
+from core.async_db import run_concurrently
+from offers_app.models import Offer
+from profiles_app.models import UserProfile
+from reviews_app.models import Review
+
+
+PLATFORM_STATS_KEY = 'core:platform-stats'
+PLATFORM_STATS_LOCK_KEY = 'core:platform-stats:lock'
+LOCK_TIMEOUT = 30
+COLD_WAIT_STEPS = 20
+COLD_WAIT_SECONDS = 0.05
+
+
+def platform_stat_queries():
+    """Returns the platform-wide aggregates shown on the landing page as independent callables."""
+    return {
+        'review_count': Review.objects.count,
+        'average_rating': lambda: round(Review.objects.aggregate(avg=Avg('rating'))['avg'] or 0, 1),
+        'business_profile_count': UserProfile.objects.filter(type=UserProfile.BUSINESS).count,
+        'offer_count': Offer.objects.count,
+    }
+
+
+def compute_platform_stats():
+    """Runs the platform-wide aggregates one after another."""
+    return {name: query() for name, query in platform_stat_queries().items()}
+
+
+async def acompute_platform_stats():
+    """Runs the platform-wide aggregates concurrently, each on its own connection."""
+    queries = platform_stat_queries()
+    return dict(zip(queries, await run_concurrently(*queries.values())))
+
+
+def get_platform_stats():
+    """Returns cached platform statistics as (stats, computed_at) with stampede protection.
+
+    An entry is refreshed once it is older than BASE_INFO_CACHE_SECONDS. Only the request
+    that wins the lock recomputes it; everyone else keeps serving the previous numbers, and
+    on a cold cache briefly waits for the winner instead of running the aggregates too.
+    """
+    max_age = settings.BASE_INFO_CACHE_SECONDS
+    entry = cache.get(PLATFORM_STATS_KEY)
+    if entry and time.time() - entry['computed_at'] < max_age:
+        return entry['stats'], entry['computed_at']
+    locked = cache.add(PLATFORM_STATS_LOCK_KEY, True, timeout=LOCK_TIMEOUT)
+    if not locked:
+        entry = entry or _wait_for_entry()
+        if entry:
+            return entry['stats'], entry['computed_at']
+    try:
+        entry = {'stats': compute_platform_stats(), 'computed_at': time.time()}
+        cache.set(PLATFORM_STATS_KEY, entry, timeout=max_age * 10)
+    finally:
+        if locked:
+            cache.delete(PLATFORM_STATS_LOCK_KEY)
+    return entry['stats'], entry['computed_at']
+
+
+def _wait_for_entry():
+    for _ in range(COLD_WAIT_STEPS):
+        time.sleep(COLD_WAIT_SECONDS)
+        entry = cache.get(PLATFORM_STATS_KEY)
+        if entry:
+            return entry
+    return None
+
+
+async def aget_platform_stats():
+    """Async get_platform_stats(): same cache entry and lock, with the aggregates run concurrently."""
+    max_age = settings.BASE_INFO_CACHE_SECONDS
+    entry = await cache.aget(PLATFORM_STATS_KEY)
+    if entry and time.time() - entry['computed_at'] < max_age:
+        return entry['stats'], entry['computed_at']
+    locked = await cache.aadd(PLATFORM_STATS_LOCK_KEY, True, timeout=LOCK_TIMEOUT)
+    if not locked:
+        entry = entry or await _await_entry()
+        if entry:
+            return entry['stats'], entry['computed_at']
+    try:
+        entry = {'stats': await acompute_platform_stats(), 'computed_at': time.time()}
+        await cache.aset(PLATFORM_STATS_KEY, entry, timeout=max_age * 10)
+    finally:
+        if locked:
+            await cache.adelete(PLATFORM_STATS_LOCK_KEY)
+    return entry['stats'], entry['computed_at']
+
+
+async def _await_entry():
+    for _ in range(COLD_WAIT_STEPS):
+        await asyncio.sleep(COLD_WAIT_SECONDS)
+        entry = await cache.aget(PLATFORM_STATS_KEY)
+        if entry:
+            return entry
+    return None
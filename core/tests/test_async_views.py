@@ -0,0 +1,190 @@
+import tempfile
+import threading
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIHandler
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.urls import get_resolver, reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from auth_app.models import AuthToken
+from core.asgi import AsyncViewsASGIHandler, get_application
+from core.benchmark import QueryRecorder, record_queries
+from core.management.commands.bench_endpoints import url_names
+from core.metrics import render_metrics
+from core.stats import acompute_platform_stats, compute_platform_stats
+from offers_app.cache import invalidate_offer_list
+from offers_app.models import Offer, OfferDetail
+from orders_app.models import OrderStats
+from profiles_app.models import UserProfile
+from reviews_app.models import Review
+
+
+def make_user(username, user_type):
+    user = User.objects.create_user(username=username, password='Test1234!')
+    UserProfile.objects.create(user=user, type=user_type)
+    return user, {'Authorization': f'Token {AuthToken.objects.create(user=user).key}'}
+
+
+def create_offer(user, title='Async offer'):
+    offer = Offer.objects.create(user=user, title=title, description='desc')
+    OfferDetail.objects.create(offer=offer, title='Basic', revisions=1, delivery_time_in_days=3,
+                               price='49.99', features=[], offer_type='basic')
+    invalidate_offer_list()
+    return offer
+
+
+class ThreadRecorder:
+    """Execute wrapper noting the thread of every query."""
+
+    def __init__(self):
+        self.threads = set()
+
+    def __call__(self, execute, sql, params, many, context):
+        self.threads.add(threading.current_thread().name)
+        return execute(sql, params, many, context)
+
+
+@override_settings(ROOT_URLCONF='core.asgi_urls')
+class AsyncViewTests(APITestCase):
+    """Tests for the async views served to ASGI requests (core.asgi_urls)."""
+
+    def setUp(self):
+        cache.clear()
+        self.business, self.business_headers = make_user('biz', UserProfile.BUSINESS)
+        self.customer, self.customer_headers = make_user('cust', UserProfile.CUSTOMER)
+        self.offer = create_offer(self.business)
+        Review.objects.create(reviewer=self.customer, business_user=self.business, rating=4, description='Good')
+        OrderStats.objects.create(user=self.business, in_progress_count=2, completed_count=5, cancelled_count=1)
+
+    def test_every_url_is_kept(self):
+        self.assertEqual(url_names(get_resolver('core.asgi_urls')), url_names(get_resolver('core.urls')))
+
+    async def test_base_info(self):
+        response = await self.async_client.get(reverse('base-info'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.resolver_match.func.view_class.__name__, 'AsyncBaseInfoView')
+        self.assertEqual(
+            {key: response.data[key] for key in ['review_count', 'average_rating', 'business_profile_count', 'offer_count']},
+            {'review_count': 1, 'average_rating': 4.0, 'business_profile_count': 1, 'offer_count': 1},
+        )
+        self.assertIn('max-age', response['Cache-Control'])
+
+    async def test_order_counts(self):
+        kwargs = {'business_user_id': self.business.pk}
+        expected = {
+            'order-count': {'order_count': 2},
+            'completed-order-count': {'completed_order_count': 5},
+            'order-stats': {'order_count': 2, 'completed_order_count': 5, 'cancelled_order_count': 1},
+        }
+        for name, body in expected.items():
+            response = await self.async_client.get(reverse(name, kwargs=kwargs), headers=self.customer_headers)
+            self.assertEqual(response.status_code, status.HTTP_200_OK, name)
+            self.assertEqual(response.data, body)
+
+    async def test_order_count_errors(self):
+        url = reverse('order-count', kwargs={'business_user_id': self.customer.pk})
+        response = await self.async_client.get(url, headers=self.customer_headers)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_offer_list_with_conditional_get(self):
+        url = reverse('offer-list-create')
+        response = await self.async_client.get(url, headers=self.customer_headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(response.data['results'][0]['id'], self.offer.pk)
+        headers = {**self.customer_headers, 'If-None-Match': response['ETag']}
+        response = await self.async_client.get(url, headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_anonymous_offer_list_is_cached(self):
+        url = reverse('offer-list-create')
+        first = self.client.get(url, {'cursor': ''})
+        with self.assertNumQueries(0):
+            second = self.client.get(url, {'cursor': ''})
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    async def test_offer_create_falls_back_to_sync_dispatch(self):
+        response = await self.async_client.post(
+            reverse('offer-list-create'),
+            {'title': 'New', 'description': 'desc', 'details': [
+                {'title': tier.capitalize(), 'revisions': 1, 'delivery_time_in_days': 3, 'price': '10.00',
+                 'features': [], 'offer_type': tier} for tier in ['basic', 'standard', 'premium']
+            ]},
+            content_type='application/json', headers=self.business_headers,
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(await Offer.objects.acount(), 2)
+
+    async def test_profile_detail(self):
+        url = reverse('profile-detail', kwargs={'pk': self.business.pk})
+        response = await self.async_client.get(url, headers=self.customer_headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['username'], 'biz')
+        headers = {**self.customer_headers, 'If-None-Match': response['ETag']}
+        response = await self.async_client.get(url, headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        response = await self.async_client.get(reverse('profile-detail', kwargs={'pk': 9999}),
+                                               headers=self.customer_headers)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_metrics_count_queries_of_async_views(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(METRICS_ENABLED=True, METRICS_MULTIPROC_DIR=directory):
+            await self.async_client.get(reverse('order-count', kwargs={'business_user_id': self.business.pk}),
+                                        headers=self.customer_headers)
+            text = render_metrics()
+        self.assertRegex(text, r'coderr_request_queries_sum\{status="200",view="AsyncOrderCountView"\} [1-9]')
+
+
+class ConcurrentAggregatesTests(TransactionTestCase):
+    """Tests for core.stats.acompute_platform_stats() outside a transaction."""
+
+    def setUp(self):
+        business, _ = make_user('biz', UserProfile.BUSINESS)
+        customer, _ = make_user('cust', UserProfile.CUSTOMER)
+        create_offer(business)
+        Review.objects.create(reviewer=customer, business_user=business, rating=5, description='Great')
+
+    def compute_recording_threads(self):
+        recorder = ThreadRecorder()
+        with record_queries(recorder):
+            stats = async_to_sync(acompute_platform_stats)()
+        self.assertEqual(stats, compute_platform_stats())
+        return recorder.threads
+
+    @override_settings(ASYNC_QUERY_WORKERS=4)
+    def test_aggregates_run_on_pooled_connections(self):
+        threads = self.compute_recording_threads()
+        self.assertTrue(threads)
+        self.assertTrue(all(name.startswith('async-query') for name in threads), threads)
+
+    @override_settings(ASYNC_QUERY_WORKERS=0)
+    def test_aggregates_run_in_sequence_without_pool(self):
+        self.assertEqual(self.compute_recording_threads(), {threading.current_thread().name})
+
+    @override_settings(ASYNC_QUERY_WORKERS=4)
+    def test_pooled_queries_are_all_counted(self):
+        sequential, concurrent = QueryRecorder(), QueryRecorder()
+        with record_queries(sequential):
+            compute_platform_stats()
+        with record_queries(concurrent):
+            async_to_sync(acompute_platform_stats)()
+        self.assertEqual(concurrent.count, sequential.count)
+
+
+class AsgiApplicationTests(SimpleTestCase):
+    """Tests for the handler core.asgi builds."""
+
+    @override_settings(ASGI_ASYNC_VIEWS=False)
+    def test_sync_views_by_default(self):
+        self.assertIs(type(get_application()), ASGIHandler)
+
+    @override_settings(ASGI_ASYNC_VIEWS=True)
+    def test_async_views_when_enabled(self):
+        self.assertIs(type(get_application()), AsyncViewsASGIHandler)
@@ -1,11 +1,14 @@
+import time
+
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.urls import reverse
 from rest_framework import status
-from rest_framework.authtoken.models import Token
 from rest_framework.test import APITestCase
 
 from offers_app.models import Offer, OfferDetail
 from profiles_app.models import UserProfile
+from core.stats import PLATFORM_STATS_KEY, PLATFORM_STATS_LOCK_KEY
 from reviews_app.models import Review
 
 
@@ -13,6 +16,7 @@ class BaseInfoTests(APITestCase):
     """Tests for GET /api/base-info/"""
 
     def setUp(self):
+        cache.clear()
         self.url = reverse('base-info')
 
         business_user = User.objects.create_user(username='biz', password='Test1234!')
@@ -56,3 +60,31 @@ class BaseInfoTests(APITestCase):
     def test_get_base_info_accessible_without_token(self):
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_get_base_info_reports_freshness(self):
+        response = self.client.get(self.url)
+        self.assertIn('generated_at', response.data)
+        self.assertIn('max-age', response['Cache-Control'])
+
+    def test_repeated_requests_are_served_from_cache(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data['offer_count'], 1)
+
+    def test_expired_entry_is_recomputed(self):
+        self.client.get(self.url)
+        entry = cache.get(PLATFORM_STATS_KEY)
+        cache.set(PLATFORM_STATS_KEY, {**entry, 'computed_at': time.time() - 3600})
+        Offer.objects.all().delete()
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['offer_count'], 0)
+
+    def test_expired_entry_is_served_while_another_request_refreshes(self):
+        self.client.get(self.url)
+        entry = cache.get(PLATFORM_STATS_KEY)
+        cache.set(PLATFORM_STATS_KEY, {**entry, 'computed_at': time.time() - 3600})
+        cache.add(PLATFORM_STATS_LOCK_KEY, True)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data['offer_count'], 1)
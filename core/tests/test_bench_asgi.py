@@ -0,0 +1,38 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TransactionTestCase, override_settings
+from django.urls import URLResolver, get_resolver
+
+from core.asgi_urls import ASYNC_VIEWS
+from core.management.commands.bench_asgi import TARGETS, Command
+
+
+def async_url_names(patterns):
+    names = set()
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            names |= async_url_names(pattern.url_patterns)
+        elif getattr(pattern.callback, 'view_class', None) in ASYNC_VIEWS:
+            names.add(pattern.name)
+    return names
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'])
+class BenchAsgiTests(TransactionTestCase):
+    """Tests for the bench_asgi management command; the requests run on other connections, so data is committed."""
+
+    def test_every_async_view_has_a_target(self):
+        self.assertEqual(async_url_names(get_resolver().url_patterns) - {item['name'] for item in TARGETS}, set())
+
+    def test_suite_reports_every_server(self):
+        call_command('generate_load_data', prefix='bench', business_users=3, customers=10, offers=12,
+                     orders=30, reviews=15, stdout=StringIO())
+        result = Command(stdout=StringIO(), stderr=StringIO()).run_suite(concurrency=4, requests=8, warmup=2)
+        self.assertEqual(set(result['endpoints']), {item['label'] for item in TARGETS})
+        for label, endpoint in result['endpoints'].items():
+            self.assertEqual(set(endpoint['speedup']), {'asgi_sync_views', 'asgi_async_views'})
+            for server in ['wsgi', 'asgi_sync_views', 'asgi_async_views']:
+                self.assertEqual(endpoint[server]['status'], [200], (label, server))
+                self.assertGreater(endpoint[server]['requests_per_second'], 0)
+        self.assertGreater(result['aggregates']['concurrent_ms'], 0)
@@ -0,0 +1,51 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from core.benchmark import compare_reports
+from core.management.commands.bench_endpoints import SCENARIOS, Command, url_names
+
+
+def report(**endpoints):
+    return {'endpoints': {label: {'p95': p95, 'queries': queries} for label, (p95, queries) in endpoints.items()}}
+
+
+class BenchEndpointsTests(TestCase):
+    """Tests for the bench_endpoints management command."""
+
+    def test_every_project_url_has_a_scenario(self):
+        self.assertEqual(set(url_names()) - {item['name'] for item in SCENARIOS}, set())
+
+    @override_settings(METRICS_ENABLED=True)
+    def test_suite_reports_every_scenario(self):
+        call_command('generate_load_data', prefix='bench', business_users=3, customers=10, offers=12,
+                     orders=30, reviews=15, stdout=StringIO())
+        result = Command(stdout=StringIO(), stderr=StringIO()).run_suite(repeat=3, warmup=1)
+        self.assertEqual(set(result['endpoints']), {item['label'] for item in SCENARIOS})
+        self.assertEqual(result['uncovered'], [])
+        for label, endpoint in result['endpoints'].items():
+            self.assertTrue(all(status < 400 for status in endpoint['status']), (label, endpoint['status']))
+            self.assertLessEqual(endpoint['p50'], endpoint['p99'])
+        self.assertGreater(result['endpoints']['offers list']['queries'], 0)
+        self.assertEqual(result['endpoints']['offers list (anonymous, cached)']['queries'], 0)
+
+
+class CompareReportsTests(TestCase):
+    """Tests for core.benchmark.compare_reports()."""
+
+    def test_latency_above_threshold_regresses(self):
+        regressions = compare_reports(report(offers=(13.0, 3)), report(offers=(10.0, 3)), threshold=20)
+        self.assertEqual(len(regressions), 1)
+        self.assertIn('offers: p95 10.0 ms -> 13.0 ms', regressions[0])
+
+    def test_latency_within_threshold_or_noise_passes(self):
+        self.assertEqual(compare_reports(report(offers=(11.5, 3)), report(offers=(10.0, 3)), threshold=20), [])
+        self.assertEqual(compare_reports(report(fast=(0.9, 1)), report(fast=(0.5, 1)), threshold=20), [])
+
+    def test_extra_query_regresses(self):
+        regressions = compare_reports(report(offers=(10.0, 4)), report(offers=(10.0, 3)), threshold=20)
+        self.assertEqual(regressions, ['offers: queries 3 -> 4'])
+
+    def test_endpoints_missing_from_baseline_are_ignored(self):
+        self.assertEqual(compare_reports(report(new=(50.0, 9)), report(), threshold=20), [])
@@ -0,0 +1,28 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TransactionTestCase
+
+from .utils import sqlite_file_database
+
+
+@skipUnless(connection.vendor == 'sqlite' and connection.settings_dict['OPTIONS'], 'SQLite tuning is off')
+class SQLiteTuningTests(TransactionTestCase):
+    """Tests for the pragmas applied to every SQLite connection, on a database file as in production."""
+
+    def setUp(self):
+        self.enterContext(sqlite_file_database())
+
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_connection_uses_wal_and_busy_timeout(self):
+        self.assertEqual(self.pragma('journal_mode'), 'wal')
+        self.assertEqual(self.pragma('synchronous'), 1)
+        self.assertGreater(self.pragma('busy_timeout'), 0)
+        self.assertGreater(self.pragma('mmap_size'), 0)
+
+    def test_transactions_take_the_write_lock_up_front(self):
+        self.assertEqual(connection.transaction_mode, 'IMMEDIATE')
@@ -0,0 +1,119 @@
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from auth_app.models import AuthToken
+from core.checks import check_replica_pin_cache
+from offers_app.models import Offer
+from profiles_app.models import UserProfile
+
+
+REPLICA = 'replica_test'
+
+VALID_OFFER = {
+    'title': 'Primary Offer', 'description': 'Written to the primary', 'details': [
+        {'title': tier.title(), 'revisions': 1, 'delivery_time_in_days': 3, 'price': '50.00', 'features': [], 'offer_type': tier}
+        for tier in ('basic', 'standard', 'premium')
+    ],
+}
+
+
+@override_settings(REPLICA_DATABASES=[REPLICA], DATABASE_ROUTERS=['core.db_router.PrimaryReplicaRouter'])
+class ReplicaRoutingTests(TransactionTestCase):
+    """Tests for PrimaryReplicaRouter and ReplicaRoutingMiddleware against a second SQLite file.
+
+    The replica is never written to by the primary here, so which rows a response
+    contains shows which database served it.
+    """
+
+    databases = {'default', REPLICA}
+
+    @classmethod
+    def setUpClass(cls):
+        cls.replica_dir = tempfile.TemporaryDirectory()
+        connections.settings[REPLICA] = {
+            **connections['default'].settings_dict, 'NAME': str(Path(cls.replica_dir.name) / 'replica.sqlite3'),
+        }
+        call_command('migrate', database=REPLICA, verbosity=0)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.settings[REPLICA]
+        cls.replica_dir.cleanup()
+
+    def setUp(self):
+        cache.clear()
+        replica_user = User.objects.db_manager(REPLICA).create_user(username='replica-biz')
+        Offer.objects.using(REPLICA).create(user=replica_user, title='Replica Offer', description='Only on the replica')
+        self.business = User.objects.create_user(username='biz')
+        UserProfile.objects.create(user=self.business, type='business')
+        self.token = AuthToken.objects.create(user=self.business)
+        self.url = reverse('offer-list-create')
+
+    def titles(self, response):
+        return [offer['title'] for offer in response.data['results']]
+
+    def authenticated_client(self):
+        """A client with a token of its own, so it has its own read-your-writes pin."""
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION='Token ' + AuthToken.objects.create(user=self.business).key)
+        return client
+
+    def test_safe_requests_read_from_replica(self):
+        response = self.authenticated_client().get(self.url)
+        self.assertEqual(self.titles(response), ['Replica Offer'])
+
+    def test_anonymous_offer_list_cache_is_filled_from_primary(self):
+        self.assertEqual(self.titles(APIClient().get(self.url)), [])
+
+    def test_write_request_and_follow_up_reads_use_primary(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        response = client.post(self.url, VALID_OFFER, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.titles(client.get(self.url)), ['Primary Offer'])
+        self.assertEqual(self.titles(self.authenticated_client().get(self.url)), ['Replica Offer'])
+
+    def test_one_replica_serves_all_reads_of_a_request(self):
+        with mock.patch('core.middleware.random.choice', return_value=REPLICA) as choice:
+            response = self.authenticated_client().get(self.url)
+        self.assertEqual(response.data['count'], 1)
+        choice.assert_called_once_with([REPLICA])
+
+    def test_reads_outside_requests_use_primary(self):
+        self.assertEqual(Offer.objects.all().db, 'default')
+
+
+class ReplicaPinCacheCheckTests(SimpleTestCase):
+    """Tests for the core.E001 system check on the cache that holds read-your-writes pins."""
+
+    def errors(self):
+        return [message.id for message in check_replica_pin_cache(None)]
+
+    @override_settings(REPLICA_DATABASES=[])
+    def test_no_replicas_pass(self):
+        self.assertEqual(self.errors(), [])
+
+    @override_settings(REPLICA_DATABASES=['replica1'])
+    def test_replicas_with_process_local_cache_fail(self):
+        self.assertEqual(self.errors(), ['core.E001'])
+
+    @override_settings(
+        REPLICA_DATABASES=['replica1'],
+        CACHES={'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://localhost'}},
+    )
+    def test_replicas_with_shared_cache_pass(self):
+        self.assertEqual(self.errors(), [])
@@ -0,0 +1,64 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db.models import F, Sum
+from django.test import TestCase
+from django.utils import timezone
+
+from offers_app.models import Offer, OfferDetail
+from orders_app.models import Order, OrderStats
+from profiles_app.models import UserProfile
+from reviews_app.models import RatingSummary, Review
+
+
+def generate(prefix='load', seed=7, **sizes):
+    options = {'business_users': 6, 'customers': 15, 'offers': 40, 'orders': 90, 'reviews': 60, 'batch_size': 16}
+    options.update(sizes)
+    call_command('generate_load_data', prefix=prefix, seed=seed, stdout=StringIO(), **options)
+
+
+class GenerateLoadDataTests(TestCase):
+    """Tests for the generate_load_data management command."""
+
+    def test_creates_requested_volumes(self):
+        generate()
+        self.assertEqual(UserProfile.objects.filter(type=UserProfile.BUSINESS).count(), 6)
+        self.assertEqual(UserProfile.objects.filter(type=UserProfile.CUSTOMER).count(), 15)
+        self.assertEqual(Offer.objects.count(), 40)
+        self.assertEqual(OfferDetail.objects.count(), 120)
+        self.assertEqual(Order.objects.count(), 90)
+        self.assertLessEqual(Review.objects.count(), 60)
+        self.assertGreater(Review.objects.count(), 0)
+
+    def test_derived_values_match_the_rows(self):
+        generate()
+        for offer in Offer.objects.prefetch_related('details'):
+            basic = next(detail for detail in offer.details.all() if detail.offer_type == OfferDetail.BASIC)
+            self.assertEqual(offer.min_price, basic.price)
+            self.assertEqual(offer.min_delivery_time, basic.delivery_time_in_days)
+        self.assertEqual(RatingSummary.objects.aggregate(total=Sum('review_count'))['total'], Review.objects.count())
+        totals = OrderStats.objects.aggregate(*(Sum(field) for field in OrderStats.STATUS_FIELDS.values()))
+        self.assertEqual(sum(totals.values()), Order.objects.count())
+
+    def test_timestamps_are_spread_into_the_past(self):
+        generate(days=365)
+        oldest = Offer.objects.order_by('created_at').first().created_at
+        self.assertLess(oldest, timezone.now() - timedelta(days=1))
+        self.assertFalse(Order.objects.filter(updated_at__lt=F('created_at')).exists())
+
+    def test_same_seed_gives_same_dataset(self):
+        generate(prefix='first')
+        generate(prefix='second')
+
+        def shape(prefix):
+            reviews = Review.objects.filter(business_user__username__startswith=prefix)
+            orders = Order.objects.filter(customer_user__username__startswith=prefix)
+            return (sorted(reviews.values_list('rating', flat=True)),
+                    sorted(orders.values_list('price', 'status')))
+        self.assertEqual(shape('first-'), shape('second-'))
+
+    def test_existing_prefix_is_rejected(self):
+        generate()
+        with self.assertRaises(CommandError):
+            generate()
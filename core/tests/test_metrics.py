@@ -0,0 +1,116 @@
+import multiprocessing
+import re
+import tempfile
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core.metrics import INITIAL_FILE_SIZE, FileStore, InProcessStore, REQUEST_DURATION, record_request, render_metrics
+
+
+def sample(text, name, **labels):
+    """Returns the value of one exposition line, None when it is missing."""
+    wanted = ','.join(f'{key}="{value}"' for key, value in labels.items())
+    match = re.search(rf'^{name}\{{{re.escape(wanted)}\}} (\S+)$', text, re.MULTILINE)
+    return float(match.group(1)) if match else None
+
+
+def record_in_child(directory, count):
+    with override_settings(METRICS_MULTIPROC_DIR=directory):
+        for _ in range(count):
+            record_request('ChildView', 200, 0.02, 500, 3)
+
+
+@override_settings(METRICS_ENABLED=True)
+class MetricsEndpointTests(APITestCase):
+    """Tests for GET /api/metrics/ and core.middleware.MetricsMiddleware."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.enterContext(override_settings(METRICS_MULTIPROC_DIR=directory.name))
+        self.url = reverse('metrics')
+
+    def test_requests_are_labeled_by_view_and_status(self):
+        self.client.get(reverse('base-info'))
+        self.client.get(reverse('base-info'))
+        self.client.get(reverse('order-count', kwargs={'business_user_id': 1}))
+        text = self.client.get(self.url).content.decode()
+        self.assertEqual(sample(text, 'coderr_request_duration_seconds_count', status='200', view='BaseInfoView'), 2)
+        self.assertEqual(sample(text, 'coderr_request_duration_seconds_bucket',
+                                status='401', view='OrderCountView', le='+Inf'), 1)
+        self.assertEqual(sample(text, 'coderr_response_size_bytes_count', status='200', view='BaseInfoView'), 2)
+        self.assertIsNotNone(sample(text, 'coderr_request_queries_sum', status='200', view='BaseInfoView'))
+
+    def test_exposition_format(self):
+        self.client.get(reverse('base-info'))
+        response = self.client.get(self.url)
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        text = response.content.decode()
+        self.assertIn('# TYPE coderr_request_duration_seconds histogram', text)
+        buckets = [float(value) for value in re.findall(
+            r'^coderr_request_duration_seconds_bucket\{status="200",view="BaseInfoView",le="[^"]+"\} (\S+)$',
+            text, re.MULTILINE)]
+        self.assertEqual(buckets, sorted(buckets))
+
+    def test_unknown_urls_count_as_unresolved(self):
+        self.client.get('/api/does-not-exist/')
+        text = self.client.get(self.url).content.decode()
+        self.assertEqual(sample(text, 'coderr_request_duration_seconds_count', status='404', view='unresolved'), 1)
+
+    @override_settings(METRICS_TOKEN='scrape-secret')
+    def test_token_is_required_when_configured(self):
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.get(self.url, HTTP_AUTHORIZATION='Bearer scrape-secret')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_disabled_metrics_are_not_served(self):
+        self.client.get(reverse('base-info'))
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_404_NOT_FOUND)
+
+
+class MetricsStoreTests(TestCase):
+    """Tests for the in-process and file-backed sample stores of core.metrics."""
+
+    def test_histogram_buckets_are_cumulative(self):
+        store = InProcessStore()
+        for seconds in [0.001, 0.02, 0.02, 3]:
+            REQUEST_DURATION.observe(store, {'view': 'V', 'status': '200'}, seconds)
+        text = '\n'.join(REQUEST_DURATION.render(store.read()))
+        self.assertEqual(sample(text, 'coderr_request_duration_seconds_bucket', status='200', view='V', le='0.005'), 1)
+        self.assertEqual(sample(text, 'coderr_request_duration_seconds_bucket', status='200', view='V', le='0.025'), 3)
+        self.assertEqual(sample(text, 'coderr_request_duration_seconds_bucket', status='200', view='V', le='+Inf'), 4)
+        self.assertAlmostEqual(sample(text, 'coderr_request_duration_seconds_sum', status='200', view='V'), 3.041)
+
+    def test_worker_processes_are_summed(self):
+        with tempfile.TemporaryDirectory() as directory:
+            context = multiprocessing.get_context('fork')
+            workers = [context.Process(target=record_in_child, args=(directory, 250)) for _ in range(4)]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            self.assertTrue(all(worker.exitcode == 0 for worker in workers))
+            with override_settings(METRICS_MULTIPROC_DIR=directory):
+                record_request('ChildView', 200, 0.02, 500, 3)
+                text = render_metrics()
+        self.assertEqual(sample(text, 'coderr_request_duration_seconds_count', status='200', view='ChildView'), 1001)
+        self.assertEqual(sample(text, 'coderr_request_queries_sum', status='200', view='ChildView'), 3003)
+
+    def test_file_grows_and_reopens_with_its_values(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = FileStore(directory)
+            keys = [f'sample_{index}_{"x" * 100}' for index in range(2 * INITIAL_FILE_SIZE // 100)]
+            for key in keys:
+                store.inc(key, 2)
+            store.inc(keys[0], 1)
+            reopened = FileStore(directory)
+            reopened.inc(keys[1], 1)
+            values = reopened.read()
+        self.assertEqual(len(values), len(keys))
+        self.assertEqual(values[keys[0]], 3)
+        self.assertEqual(values[keys[1]], 3)
+        self.assertEqual(values[keys[-1]], 2)
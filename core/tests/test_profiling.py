@@ -0,0 +1,123 @@
+import json
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.serializers import BaseSerializer
+from rest_framework.test import APITestCase
+
+from auth_app.models import AuthToken
+from core.profiling import RequestProfile, original_serializer_data, sql_template
+from offers_app.api.views import OfferListCreateView
+from offers_app.cache import offer_list_cache
+from offers_app.models import Offer, OfferDetail
+from profiles_app.api.views import CustomerProfileListView
+from profiles_app.models import UserProfile
+
+
+def server_timing(response):
+    """Parses a Server-Timing header into {metric: {param: value}}."""
+    metrics = {}
+    for entry in response['Server-Timing'].split(', '):
+        name, *params = entry.split(';')
+        metrics[name] = dict(param.split('=', 1) for param in params)
+    return metrics
+
+
+@override_settings(REQUEST_PROFILING=True)
+class RequestProfilingMiddlewareTests(APITestCase):
+    """Tests for core.middleware.RequestProfilingMiddleware."""
+
+    def setUp(self):
+        offer_list_cache().clear()
+        self.user = User.objects.create_user(username='biz', password='Test1234!')
+        UserProfile.objects.create(user=self.user, type='business')
+        offer = Offer.objects.create(user=self.user, title='Logo', description='A logo')
+        OfferDetail.objects.create(offer=offer, title='Basic', revisions=1, delivery_time_in_days=3,
+                                   price='49.99', features=[], offer_type='basic')
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + AuthToken.objects.create(user=self.user).key)
+
+    def test_server_timing_reports_queries_and_phases(self):
+        with self.assertLogs('core.profiling', level='INFO'):
+            response = self.client.get(reverse('offer-list-create'))
+        metrics = server_timing(response)
+        self.assertEqual(set(metrics), {'db', 'serialize', 'view', 'total'})
+        self.assertRegex(metrics['db']['desc'], r'^"\d+ queries"$')
+        self.assertGreater(float(metrics['serialize']['dur']), 0)
+        self.assertGreaterEqual(float(metrics['total']['dur']), float(metrics['view']['dur']))
+
+    def test_logs_one_json_line_per_request(self):
+        with self.assertLogs('core.profiling', level='INFO') as logs:
+            self.client.get(reverse('offer-list-create'))
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['view'], 'offers_app.api.views.OfferListCreateView')
+        self.assertEqual(record['status'], 200)
+        self.assertGreater(record['queries'], 0)
+        self.assertEqual(record['repeated_queries'], [])
+
+    @override_settings(REQUEST_PROFILING_REPEAT_THRESHOLD=3)
+    def test_repeated_sql_is_logged_as_warning_with_serializer(self):
+        for index in range(3):
+            customer = User.objects.create_user(username=f'customer{index}')
+            UserProfile.objects.create(user=customer, type='customer')
+        # Without select_related('user') every row loads its user separately.
+        without_join = mock.patch.object(CustomerProfileListView, 'get_queryset',
+                                         lambda view: UserProfile.objects.filter(type='customer'))
+        with without_join, self.assertLogs('core.profiling', level='WARNING') as logs:
+            self.client.get(reverse('customer-profiles'))
+        repeated = json.loads(logs.records[0].getMessage())['repeated_queries']
+        self.assertIn('auth_user', repeated[0]['sql'])
+        self.assertEqual(repeated[0]['serializer'], 'profiles_app.api.serializers.CustomerProfileSerializer')
+        # Only DRF followed the relation; no project frame ran the query.
+        self.assertIsNone(repeated[0]['call_site'])
+
+    @override_settings(REQUEST_PROFILING_REPEAT_THRESHOLD=3)
+    def test_repeated_sql_call_site_is_the_project_code_running_it(self):
+        for index in range(2):
+            Offer.objects.create(user=self.user, title=f'Offer {index}', description='More')
+        # Without select_related('user') get_user_details loads every owner separately.
+        without_join = mock.patch.object(OfferListCreateView, 'get_queryset', lambda view: Offer.objects.all())
+        with without_join, self.assertLogs('core.profiling', level='WARNING') as logs:
+            self.client.get(reverse('offer-list-create'))
+        repeated = json.loads(logs.records[0].getMessage())['repeated_queries']
+        user_query = next(query for query in repeated if 'FROM "auth_user"' in query['sql'])
+        self.assertRegex(user_query['call_site'], r'^offers_app/api/serializers\.py:\d+ in get_user_details$')
+
+    def test_serializer_timer_is_removed_after_the_request(self):
+        with self.assertLogs('core.profiling', level='INFO'):
+            self.client.get(reverse('offer-list-create'))
+        self.assertIs(BaseSerializer.__dict__['data'], original_serializer_data)
+
+    @override_settings(REQUEST_PROFILING=False)
+    def test_disabled_middleware_is_not_loaded(self):
+        response = self.client.get(reverse('offer-list-create'))
+        self.assertNotIn('Server-Timing', response)
+
+
+class RequestProfileTests(TestCase):
+    """Tests for the N+1 detection of core.profiling.RequestProfile."""
+
+    def test_repeated_template_reports_count_and_call_site(self):
+        users = [User.objects.create_user(username=f'user{index}') for index in range(6)]
+        profile = RequestProfile(repeat_threshold=5)
+        with connection.execute_wrapper(profile):
+            for user in users:
+                UserProfile.objects.filter(user=user).first()
+        repeated = profile.repeated_queries()
+        self.assertEqual(len(repeated), 1)
+        self.assertEqual(repeated[0]['count'], 6)
+        self.assertIn('profiles_app_userprofile', repeated[0]['sql'])
+        self.assertRegex(repeated[0]['call_site'], r'^core/tests/test_profiling\.py:\d+ in test_repeated_template')
+
+    def test_queries_below_threshold_are_not_reported(self):
+        profile = RequestProfile(repeat_threshold=5)
+        with connection.execute_wrapper(profile):
+            for _ in range(4):
+                User.objects.count()
+        self.assertEqual(profile.count, 4)
+        self.assertEqual(profile.repeated_queries(), [])
+
+    def test_in_lists_of_any_length_share_a_template(self):
+        self.assertEqual(sql_template('SELECT 1 WHERE id IN (%s, %s)'), sql_template('SELECT 1 WHERE id IN (%s,\n %s, %s)'))
@@ -0,0 +1,20 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from offers_app.models import Offer
+
+
+class QueryPlanTests(TestCase):
+    """Tests for the check_query_plans management command."""
+
+    def test_endpoint_queries_use_indexes(self):
+        call_command('check_query_plans', stdout=StringIO())
+
+    def test_full_scan_is_reported(self):
+        queries = [('unindexed', Offer.objects.filter(description='x').order_by())]
+        with mock.patch('core.management.commands.check_query_plans.endpoint_queries', return_value=queries):
+            with self.assertRaises(CommandError):
+                call_command('check_query_plans', stdout=StringIO())
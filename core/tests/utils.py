@@ -0,0 +1,32 @@
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.core.management import call_command
+from django.db import connections
+
+
+@contextmanager
+def sqlite_file_database(alias='default'):
+    """Points an in-memory SQLite test database alias at a freshly migrated file for the block.
+
+    The test runner's in-memory database uses a shared cache, where a second concurrent writer
+    fails with "database table is locked" instead of waiting on busy_timeout, and WAL is not
+    available. Tests that need either enter this in setUp; other backends are left as they are.
+    """
+    connection = connections[alias]
+    if connection.vendor != 'sqlite' or not connection.is_in_memory_db():
+        yield
+        return
+    # Closing would drop the in-memory database, so its connection is set aside and restored.
+    memory_connection, connection.connection = connection.connection, None
+    old_name = connection.settings_dict['NAME']
+    with tempfile.TemporaryDirectory() as directory:
+        connection.settings_dict['NAME'] = str(Path(directory) / 'test.sqlite3')
+        try:
+            call_command('migrate', database=alias, verbosity=0, interactive=False)
+            yield
+        finally:
+            connection.close()
+            connection.settings_dict['NAME'] = old_name
+            connection.connection = memory_connection
@@ -5,7 +5,7 @@ from .models import Offer, OfferDetail
 
 @admin.register(Offer)
 class OfferAdmin(admin.ModelAdmin):
-    list_display = ['title', 'user', 'created_at', 'updated_at']
+    list_display = ['title', 'user', 'min_price', 'min_delivery_time', 'created_at', 'updated_at']
     search_fields = ['title', 'description']
 
 
@@ -13,3 +13,11 @@ class OfferAdmin(admin.ModelAdmin):
 class OfferDetailAdmin(admin.ModelAdmin):
     list_display = ['offer', 'offer_type', 'price', 'delivery_time_in_days']
     list_filter = ['offer_type']
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        obj.offer.refresh_min_values()
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        obj.offer.refresh_min_values()
@@ -1,15 +1,83 @@
 import django_filters
+from django.db import connections
+from django.db.models import BooleanField, Exists, FloatField, OuterRef
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+from rest_framework.settings import api_settings
 
-from offers_app.models import Offer
+from offers_app.models import Offer, OfferDetail
+from offers_app.search import SQLITE_FTS_TABLE
 
 
 class OfferFilter(django_filters.FilterSet):
-    """Filter for offers by creator, min price and max delivery time."""
+    """Filter for offers by creator, min price and max delivery time.
+
+    Detail filters are combined into a single EXISTS subquery, so each offer is
+    returned once and all conditions have to be met by the same tier.
+    """
 
     creator_id = django_filters.NumberFilter(field_name='user__id')
-    min_price = django_filters.NumberFilter(field_name='details__price', lookup_expr='gte')
-    max_delivery_time = django_filters.NumberFilter(field_name='details__delivery_time_in_days', lookup_expr='lte')
+    min_price = django_filters.NumberFilter(field_name='price', lookup_expr='gte', method='filter_by_details')
+    max_delivery_time = django_filters.NumberFilter(field_name='delivery_time_in_days', lookup_expr='lte', method='filter_by_details')
 
     class Meta:
         model = Offer
         fields = ['creator_id', 'min_price', 'max_delivery_time']
+
+    def filter_by_details(self, queryset, name, value):
+        # Applied together in filter_queryset.
+        return queryset
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        lookups = {
+            f'{field.field_name}__{field.lookup_expr}': self.form.cleaned_data[name]
+            for name, field in self.filters.items()
+            if field.method == 'filter_by_details' and self.form.cleaned_data.get(name) is not None
+        }
+        if lookups:
+            queryset = queryset.filter(Exists(OfferDetail.objects.filter(offer=OuterRef('pk'), **lookups)))
+        return queryset
+
+
+class OfferSearchFilter(filters.SearchFilter):
+    """Full-text search on title and description, ranked by relevance.
+
+    Uses the FTS5 table on SQLite and the search_vector column on PostgreSQL and
+    falls back to the icontains search of SearchFilter on other engines. Results are
+    ordered by rank unless the client asks for an explicit ordering, so this backend
+    has to run after OrderingFilter.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        vendor = connections[queryset.db].vendor
+        if vendor == 'sqlite':
+            queryset = self._filter_sqlite(queryset, terms)
+        elif vendor == 'postgresql':
+            queryset = self._filter_postgres(queryset, terms)
+        else:
+            return super().filter_queryset(request, queryset, view)
+        if request.query_params.get(api_settings.ORDERING_PARAM):
+            return queryset
+        return queryset.order_by('search_rank', '-updated_at', '-id')
+
+    def _filter_sqlite(self, queryset, terms):
+        # Every term becomes a quoted prefix query, so user input cannot inject FTS syntax.
+        match = ' '.join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+        table = SQLITE_FTS_TABLE
+        matches = RawSQL(f'SELECT rowid FROM {table} WHERE {table} MATCH %s', [match])
+        # bm25() is only available in a full-text query, so the rank is looked up per matching row.
+        rank = RawSQL(
+            f'SELECT bm25({table}, 2.0, 1.0) FROM {table} WHERE {table} MATCH %s AND {table}.rowid = offers_app_offer.id',
+            [match], output_field=FloatField(),
+        )
+        return queryset.filter(pk__in=matches).annotate(search_rank=rank)
+
+    def _filter_postgres(self, queryset, terms):
+        query = ' & '.join("'{}':*".format(term.replace("'", "''").replace('\\', '')) for term in terms)
+        matches = RawSQL("offers_app_offer.search_vector @@ to_tsquery('simple', %s)", [query], output_field=BooleanField())
+        rank = RawSQL("-ts_rank(offers_app_offer.search_vector, to_tsquery('simple', %s))", [query], output_field=FloatField())
+        return queryset.filter(matches).annotate(search_rank=rank)
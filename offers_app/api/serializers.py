@@ -1,6 +1,17 @@
+from django.db import transaction
+from django.db.models import prefetch_related_objects
 from rest_framework import serializers
 
+from offers_app.cache import invalidate_offer_list
 from offers_app.models import Offer, OfferDetail
+from reviews_app.api.serializers import RatingSummarySerializer
+
+
+def detail_min_values(details):
+    """Returns the min_price/min_delivery_time of an offer from its detail dicts or objects."""
+    def values(attr):
+        return [detail[attr] if isinstance(detail, dict) else getattr(detail, attr) for detail in details]
+    return {'min_price': min(values('price')), 'min_delivery_time': min(values('delivery_time_in_days'))}
 
 
 class OfferDetailSerializer(serializers.ModelSerializer):
@@ -28,21 +39,14 @@ class OfferListSerializer(serializers.ModelSerializer):
     """Serializer for the offer list endpoint."""
 
     details = OfferDetailUrlSerializer(many=True, read_only=True)
-    min_price = serializers.SerializerMethodField()
-    min_delivery_time = serializers.SerializerMethodField()
+    min_price = serializers.FloatField(read_only=True)
+    min_delivery_time = serializers.IntegerField(read_only=True)
     user_details = serializers.SerializerMethodField()
+    user_rating = RatingSummarySerializer(source='user.rating_summary', read_only=True, default=None)
 
     class Meta:
         model = Offer
-        fields = ['id', 'user', 'title', 'image', 'description', 'created_at', 'updated_at', 'details', 'min_price', 'min_delivery_time', 'user_details']
-
-    def get_min_price(self, obj):
-        prices = obj.details.values_list('price', flat=True)
-        return min(prices) if prices else None
-
-    def get_min_delivery_time(self, obj):
-        times = obj.details.values_list('delivery_time_in_days', flat=True)
-        return min(times) if times else None
+        fields = ['id', 'user', 'title', 'image', 'description', 'created_at', 'updated_at', 'details', 'min_price', 'min_delivery_time', 'user_details', 'user_rating']
 
     def get_user_details(self, obj):
         return {
@@ -56,20 +60,31 @@ class OfferRetrieveSerializer(serializers.ModelSerializer):
     """Serializer for the offer detail endpoint."""
 
     details = OfferDetailUrlSerializer(many=True, read_only=True)
-    min_price = serializers.SerializerMethodField()
-    min_delivery_time = serializers.SerializerMethodField()
+    min_price = serializers.FloatField(read_only=True)
+    min_delivery_time = serializers.IntegerField(read_only=True)
+    user_rating = RatingSummarySerializer(source='user.rating_summary', read_only=True, default=None)
 
     class Meta:
         model = Offer
-        fields = ['id', 'user', 'title', 'image', 'description', 'created_at', 'updated_at', 'details', 'min_price', 'min_delivery_time']
+        fields = ['id', 'user', 'title', 'image', 'description', 'created_at', 'updated_at', 'details', 'min_price', 'min_delivery_time', 'user_rating']
+
 
-    def get_min_price(self, obj):
-        prices = obj.details.values_list('price', flat=True)
-        return min(prices) if prices else None
+class OfferBulkCreateSerializer(serializers.ListSerializer):
+    """Creates many offers and all their details with one bulk insert each."""
 
-    def get_min_delivery_time(self, obj):
-        times = obj.details.values_list('delivery_time_in_days', flat=True)
-        return min(times) if times else None
+    def create(self, validated_data):
+        with transaction.atomic():
+            offers = Offer.objects.bulk_create([
+                Offer(**{attr: value for attr, value in item.items() if attr != 'details'}, **detail_min_values(item['details']))
+                for item in validated_data
+            ])
+            OfferDetail.objects.bulk_create([
+                OfferDetail(offer=offer, **detail)
+                for offer, item in zip(offers, validated_data) for detail in item['details']
+            ])
+            invalidate_offer_list()
+        prefetch_related_objects(offers, 'details')
+        return offers
 
 
 class OfferCreateSerializer(serializers.ModelSerializer):
@@ -80,6 +95,7 @@ class OfferCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Offer
         fields = ['id', 'title', 'image', 'description', 'details']
+        list_serializer_class = OfferBulkCreateSerializer
 
     def validate_details(self, value):
         if len(value) != 3:
@@ -91,9 +107,9 @@ class OfferCreateSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         details_data = validated_data.pop('details')
-        offer = Offer.objects.create(**validated_data)
-        for detail in details_data:
-            OfferDetail.objects.create(offer=offer, **detail)
+        with transaction.atomic():
+            offer = Offer.objects.create(**validated_data, **detail_min_values(details_data))
+            OfferDetail.objects.bulk_create([OfferDetail(offer=offer, **detail) for detail in details_data])
         return offer
 
 
@@ -116,8 +132,23 @@ class OfferUpdateSerializer(serializers.ModelSerializer):
         details_data = validated_data.pop('details', [])
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
-        instance.save()
-        for detail_data in details_data:
-            offer_type = detail_data.get('offer_type')
-            OfferDetail.objects.filter(offer=instance, offer_type=offer_type).update(**detail_data)
+        with transaction.atomic():
+            if details_data:
+                details = {detail.offer_type: detail for detail in instance.details.all()}
+                changed, fields = [], set()
+                for detail_data in details_data:
+                    detail = details.get(detail_data.get('offer_type'))
+                    if detail is None:
+                        continue
+                    for attr, value in detail_data.items():
+                        setattr(detail, attr, value)
+                    changed.append(detail)
+                    fields.update(detail_data)
+                fields.discard('offer_type')
+                if changed and fields:
+                    OfferDetail.objects.bulk_update(changed, fields)
+                if details:
+                    for attr, value in detail_min_values(details.values()).items():
+                        setattr(instance, attr, value)
+            instance.save()
         return instance
\ No newline at end of file
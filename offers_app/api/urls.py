@@ -1,9 +1,11 @@
 from django.urls import path
 
-from .views import OfferDetailRetrieveView, OfferListCreateView, OfferRetrieveUpdateDestroyView
+from .views import (OfferBulkCreateView, OfferDetailRetrieveView, OfferListCreateView,
+                    OfferRetrieveUpdateDestroyView)
 
 urlpatterns = [
     path('offers/', OfferListCreateView.as_view(), name='offer-list-create'),
+    path('offers/bulk/', OfferBulkCreateView.as_view(), name='offer-bulk-create'),
     path('offers/<int:pk>/', OfferRetrieveUpdateDestroyView.as_view(), name='offer-detail'),
     path('offerdetails/<int:pk>/', OfferDetailRetrieveView.as_view(), name='offerdetail-detail'),
 ]
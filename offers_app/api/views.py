@@ -1,40 +1,94 @@
+from django.db.models import Prefetch
+from django.utils.http import parse_http_date_safe
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, generics
-from rest_framework.pagination import PageNumberPagination
+from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
-
+from rest_framework.response import Response
+
+from core.api.async_views import AsyncAPIView
+from core.api.conditional import ConditionalListMixin, ConditionalRetrieveMixin
+from core.api.filters import StableOrderingFilter
+from core.api.pagination import CursorOptInPagination
+from core.db_router import primary_reads
+from offers_app.cache import aoffer_list_cache_key, offer_list_cache, offer_list_cache_key
 from offers_app.models import Offer, OfferDetail
-from .filters import OfferFilter
+from .filters import OfferFilter, OfferSearchFilter
 from .permissions import IsBusinessUser, IsOwnerOfOffer
 from .serializers import (OfferCreateSerializer, OfferDetailSerializer,
                           OfferListSerializer, OfferRetrieveSerializer,
                           OfferUpdateSerializer)
 
 
-class OfferPagination(PageNumberPagination):
-    """Pagination for the offer list endpoint."""
+def offer_read_queryset():
+    """Returns the offer queryset used for reads, loading user, profile, rating summary and detail ids in a fixed number of queries."""
+    return Offer.objects.select_related('user', 'user__profile', 'user__rating_summary').prefetch_related(
+        Prefetch('details', queryset=OfferDetail.objects.only('id', 'offer_id'))
+    )
+
+
+class OfferPagination(CursorOptInPagination):
+    """Pagination for the offer list endpoint (page numbers, or keyset with ?cursor=)."""
 
     page_size = 6
     page_size_query_param = 'page_size'
     max_page_size = 100
 
 
-class OfferListCreateView(generics.ListCreateAPIView):
+class OfferListCreateView(ConditionalListMixin, generics.ListCreateAPIView):
     """Lists all offers or creates a new one."""
 
     queryset = Offer.objects.all()
     pagination_class = OfferPagination
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, StableOrderingFilter, OfferSearchFilter]
     filterset_class = OfferFilter
     search_fields = ['title', 'description']
-    ordering_fields = ['updated_at']
-    ordering = ['-updated_at']
+    ordering_fields = ['updated_at', 'min_price', 'min_delivery_time']
+    ordering = ['-updated_at', '-id']
+    # The list embeds the owner's names (saved with the profile) and rating summary.
+    embedded_modified_fields = ['user__profile__updated_at', 'user__rating_summary__updated_at']
 
     def get_permissions(self):
         if self.request.method == 'POST':
             return [IsAuthenticated(), IsBusinessUser()]
         return [IsAuthenticatedOrReadOnly()]
 
+    def list(self, request, *args, **kwargs):
+        """Serves anonymous pages from the shared offer list cache, storing successful misses.
+
+        Misses read from the primary: a page from a lagging replica would be stored under the
+        generation that is meant to show the write and be served until the next one.
+        """
+        if request.user.is_authenticated:
+            return super().list(request, *args, **kwargs)
+        cache = offer_list_cache()
+        key = offer_list_cache_key(request)
+        entry = cache.get(key)
+        if entry is not None:
+            return self.cached_response(request, entry)
+        with primary_reads():
+            response = super().list(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, self.cache_entry(response))
+        return response
+
+    def cached_response(self, request, entry):
+        not_modified = self.not_modified_response(request, entry['etag'], entry['last_modified'])
+        if not_modified is not None:
+            return not_modified
+        return self.set_validators(Response(entry['data']), entry['etag'], entry['last_modified'])
+
+    def cache_entry(self, response):
+        return {
+            'data': response.data,
+            'etag': response['ETag'],
+            'last_modified': parse_http_date_safe(response.get('Last-Modified')),
+        }
+
+    def get_queryset(self):
+        if self.request.method == 'GET':
+            return offer_read_queryset()
+        return super().get_queryset()
+
     def get_serializer_class(self):
         if self.request.method == 'POST':
             return OfferCreateSerializer
@@ -44,11 +98,46 @@ class OfferListCreateView(generics.ListCreateAPIView):
         serializer.save(user=self.request.user)
 
 
-class OfferRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
+class AsyncOfferListCreateView(AsyncAPIView, OfferListCreateView):
+    """OfferListCreateView for ASGI: lists through the async cache API and ORM; POST stays sync."""
+
+    async def get(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return await self.alist(request, *args, **kwargs)
+        cache = offer_list_cache()
+        key = await aoffer_list_cache_key(request)
+        entry = await cache.aget(key)
+        if entry is not None:
+            return self.cached_response(request, entry)
+        with primary_reads():
+            response = await self.alist(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            await cache.aset(key, self.cache_entry(response))
+        return response
+
+
+class OfferBulkCreateView(generics.CreateAPIView):
+    """Creates up to MAX_BULK_OFFERS offers with their details in one request."""
+
+    MAX_BULK_OFFERS = 100
+
+    serializer_class = OfferCreateSerializer
+    permission_classes = [IsAuthenticated, IsBusinessUser]
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.update(many=True, max_length=self.MAX_BULK_OFFERS, allow_empty=False)
+        return super().get_serializer(*args, **kwargs)
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+
+class OfferRetrieveUpdateDestroyView(ConditionalRetrieveMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieves, updates or deletes a single offer."""
 
     queryset = Offer.objects.all()
     http_method_names = ['get', 'patch', 'delete']
+    validator_fields = ['updated_at', 'user__rating_summary__review_count', 'user__rating_summary__rating_sum']
 
     def get_permissions(self):
         if self.request.method in ('PATCH', 'DELETE'):
@@ -60,8 +149,13 @@ class OfferRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
             return OfferUpdateSerializer
         return OfferRetrieveSerializer
 
+    def get_queryset(self):
+        if self.request.method == 'GET':
+            return offer_read_queryset()
+        return super().get_queryset()
+
     def get_object(self):
-        obj = generics.get_object_or_404(Offer, pk=self.kwargs['pk'])
+        obj = generics.get_object_or_404(self.get_queryset(), pk=self.kwargs['pk'])
         self.check_object_permissions(self.request, obj)
         return obj
 
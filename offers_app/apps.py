@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class OffersAppConfig(AppConfig):
     name = 'offers_app'
     verbose_name = 'Offers'
+
+    def ready(self):
+        from . import signals  # noqa: F401
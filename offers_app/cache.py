@@ -0,0 +1,81 @@
+"""Shared response cache for anonymous pages of GET /api/offers/.
+
+Entries are keyed on a generation counter plus the normalized request, so
+invalidating every cached page is a single increment: pages stored under an
+older generation are never read again and age out of the cache by LRU
+eviction or their timeout. The counter lives in the same cache alias
+(``offer_list``), which makes it shared across workers whenever that alias
+points at Redis or Memcached.
+"""
+
+import hashlib
+import time
+
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.http import urlencode
+
+OFFER_LIST_CACHE_ALIAS = 'offer_list'
+GENERATION_KEY = 'offers:list:generation'
+
+
+def offer_list_cache():
+    return caches[OFFER_LIST_CACHE_ALIAS]
+
+
+def current_generation():
+    """Returns the generation, starting a fresh one if it is missing or was evicted."""
+    cache = offer_list_cache()
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, time.time_ns(), timeout=None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+async def acurrent_generation():
+    """Async current_generation()."""
+    cache = offer_list_cache()
+    generation = await cache.aget(GENERATION_KEY)
+    if generation is None:
+        await cache.aadd(GENERATION_KEY, time.time_ns(), timeout=None)
+        generation = await cache.aget(GENERATION_KEY)
+    return generation
+
+
+def bump_generation():
+    cache = offer_list_cache()
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        # A restarted counter must not land on a generation that still has pages cached.
+        cache.add(GENERATION_KEY, time.time_ns(), timeout=None)
+
+
+def invalidate_offer_list():
+    """Drops all cached offer list pages; call after any write that changes what the list shows.
+
+    The generation is bumped right away and again once the surrounding transaction commits,
+    so a page read from the old rows while the write was still uncommitted is not kept either.
+    """
+    bump_generation()
+    transaction.on_commit(bump_generation)
+
+
+def offer_list_cache_key(request):
+    """Keys a page on the generation, scheme and host, renderer and query string with parameters sorted.
+
+    Every parameter is kept since the pagination links in the body echo them back.
+    """
+    return f'offers:list:{current_generation()}:{request_digest(request)}'
+
+
+async def aoffer_list_cache_key(request):
+    """Async offer_list_cache_key()."""
+    return f'offers:list:{await acurrent_generation()}:{request_digest(request)}'
+
+
+def request_digest(request):
+    query = urlencode(sorted(request.query_params.lists()), doseq=True)
+    request_key = f'{request.scheme}://{request.get_host()}|{request.accepted_renderer.format}|{query}'
+    return hashlib.sha256(request_key.encode()).hexdigest()
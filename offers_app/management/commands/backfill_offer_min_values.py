@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Min, OuterRef, Subquery
+
+from offers_app.cache import invalidate_offer_list
+from offers_app.models import Offer, OfferDetail
+
+
+def min_detail_value(field):
+    """Returns a correlated subquery selecting the smallest detail value of the outer offer."""
+    return Subquery(
+        OfferDetail.objects.filter(offer=OuterRef('pk'))
+        .order_by()
+        .values('offer')
+        .annotate(value=Min(field))
+        .values('value')[:1]
+    )
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the denormalized min_price and min_delivery_time columns of all offers.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help='Number of offers updated per statement.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_pk = 0
+        updated = 0
+        while True:
+            pks = list(
+                Offer.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:batch_size]
+            )
+            if not pks:
+                break
+            updated += Offer.objects.filter(pk__in=pks).update(
+                min_price=min_detail_value('price'),
+                min_delivery_time=min_detail_value('delivery_time_in_days'),
+            )
+            last_pk = pks[-1]
+        invalidate_offer_list()
+        self.stdout.write(self.style.SUCCESS(f'{updated} offers updated.'))
@@ -0,0 +1,62 @@
+import random
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+
+from core.benchmark import benchmark_database, summarize, time_call
+from offers_app.api.filters import OfferFilter
+from offers_app.models import Offer, OfferDetail
+
+
+OFFER_TYPES = [OfferDetail.BASIC, OfferDetail.STANDARD, OfferDetail.PREMIUM]
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks the offer list filters (join-based vs EXISTS) on a throwaway database.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--offers', type=int, default=100_000, help='Number of offers to generate.')
+        parser.add_argument('--repeat', type=int, default=10, help='Timed runs per variant.')
+        parser.add_argument('--min-price', type=int, default=100)
+        parser.add_argument('--max-delivery-time', type=int, default=7)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            self._seed(options['offers'], options['seed'])
+            params = {'min_price': options['min_price'], 'max_delivery_time': options['max_delivery_time']}
+            variants = {
+                'join (before)': lambda: Offer.objects.filter(details__price__gte=params['min_price'])
+                .filter(details__delivery_time_in_days__lte=params['max_delivery_time']),
+                'exists (after)': lambda: OfferFilter(params, queryset=Offer.objects.all(),
+                                                      request=RequestFactory().get('/')).qs,
+            }
+            for label, build in variants.items():
+                count = build().count()
+                samples = time_call(lambda: self._list_page(build()), repeat=options['repeat'])
+                self.stdout.write(f'{label:<16} rows={count:<8} {summarize(samples)} ms')
+
+    def _list_page(self, queryset):
+        """Mirrors what PageNumberPagination runs for one page: a COUNT and a sliced fetch."""
+        queryset.count()
+        list(queryset.order_by('-updated_at')[:6])
+
+    def _seed(self, offer_count, seed):
+        rng = random.Random(seed)
+        user = User.objects.create_user(username='bench-business')
+        batch_size = 5000
+        for start in range(0, offer_count, batch_size):
+            size = min(batch_size, offer_count - start)
+            offers = Offer.objects.bulk_create(
+                [Offer(user=user, title=f'Offer {start + i}', description='Benchmark offer') for i in range(size)]
+            )
+            OfferDetail.objects.bulk_create([
+                OfferDetail(
+                    offer=offer, title=offer_type.title(), revisions=rng.randint(1, 5),
+                    delivery_time_in_days=rng.randint(1, 21), price=rng.randint(20, 400),
+                    features=[], offer_type=offer_type,
+                )
+                for offer in offers for offer_type in OFFER_TYPES
+            ])
+        self.stdout.write(f'Seeded {offer_count} offers with {offer_count * len(OFFER_TYPES)} details.')
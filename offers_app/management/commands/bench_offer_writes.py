@@ -0,0 +1,63 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from core.benchmark import benchmark_database
+from offers_app.api.serializers import OfferCreateSerializer
+from offers_app.models import Offer, OfferDetail
+
+
+DETAILS = [
+    {'title': 'Basic', 'revisions': 1, 'delivery_time_in_days': 3, 'price': '49.99', 'features': [], 'offer_type': 'basic'},
+    {'title': 'Standard', 'revisions': 3, 'delivery_time_in_days': 5, 'price': '99.99', 'features': [], 'offer_type': 'standard'},
+    {'title': 'Premium', 'revisions': 5, 'delivery_time_in_days': 7, 'price': '149.99', 'features': [], 'offer_type': 'premium'},
+]
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks offer creation throughput (per-row inserts vs bulk inserts) on a throwaway database.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--offers', type=int, default=2000, help='Offers created per variant.')
+        parser.add_argument('--batch', type=int, default=100, help='Offers per bulk request.')
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            user = User.objects.create_user(username='bench-business')
+            payloads = [{'title': f'Offer {i}', 'description': 'Benchmark offer', 'details': DETAILS}
+                        for i in range(options['offers'])]
+            variants = {
+                'per-row (before)': lambda: self._per_row(user, payloads),
+                'single create (after)': lambda: self._single(user, payloads),
+                f'bulk x{options["batch"]} (after)': lambda: self._bulk(user, payloads, options['batch']),
+            }
+            for label, run in variants.items():
+                start = time.perf_counter()
+                run()
+                elapsed = time.perf_counter() - start
+                self.stdout.write(f'{label:<22} {len(payloads) / elapsed:>8.0f} offers/s')
+                Offer.objects.all().delete()
+
+    def _per_row(self, user, payloads):
+        """The previous create path: one INSERT per offer and per detail, then a MIN aggregate."""
+        for payload in payloads:
+            data = OfferCreateSerializer(data=payload)
+            data.is_valid(raise_exception=True)
+            details = data.validated_data.pop('details')
+            offer = Offer.objects.create(user=user, **data.validated_data)
+            for detail in details:
+                OfferDetail.objects.create(offer=offer, **detail)
+            offer.refresh_min_values()
+
+    def _single(self, user, payloads):
+        for payload in payloads:
+            serializer = OfferCreateSerializer(data=payload)
+            serializer.is_valid(raise_exception=True)
+            serializer.save(user=user)
+
+    def _bulk(self, user, payloads, batch):
+        for start in range(0, len(payloads), batch):
+            serializer = OfferCreateSerializer(data=payloads[start:start + batch], many=True)
+            serializer.is_valid(raise_exception=True)
+            serializer.save(user=user)
@@ -0,0 +1,24 @@
+# Generated by Django 6.0.2 on 2026-10-18 11:05
+
+from django.db import migrations
+
+from offers_app.search import install_search_index, uninstall_search_index
+
+
+def install(apps, schema_editor):
+    install_search_index(schema_editor.connection)
+
+
+def uninstall(apps, schema_editor):
+    uninstall_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offers_app', '0002_offer_min_values'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
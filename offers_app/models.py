@@ -1,5 +1,9 @@
 from django.contrib.auth.models import User
 from django.db import models
+from django.db.models import Min
+from django.utils import timezone
+
+from offers_app.cache import invalidate_offer_list
 
 
 class Offer(models.Model):
@@ -9,6 +13,8 @@ class Offer(models.Model):
     title = models.CharField(max_length=200)
     image = models.FileField(upload_to='offer_images/', blank=True, null=True)
     description = models.TextField()
+    min_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, db_index=True, editable=False)
+    min_delivery_time = models.IntegerField(null=True, blank=True, db_index=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -16,10 +22,24 @@ class Offer(models.Model):
         verbose_name = 'Offer'
         verbose_name_plural = 'Offers'
         ordering = ['-updated_at']
+        indexes = [
+            models.Index(fields=['-updated_at', '-id'], name='offer_updated_idx'),
+            models.Index(fields=['user', '-updated_at'], name='offer_user_updated_idx'),
+        ]
 
     def __str__(self):
         return f'{self.title} (by {self.user.username})'
 
+    def refresh_min_values(self):
+        """Recomputes min_price and min_delivery_time from the offer's details and persists them with a new updated_at."""
+        values = self.details.aggregate(min_price=Min('price'), min_delivery_time=Min('delivery_time_in_days'))
+        values['updated_at'] = timezone.now()
+        self.min_price = values['min_price']
+        self.min_delivery_time = values['min_delivery_time']
+        self.updated_at = values['updated_at']
+        Offer.objects.filter(pk=self.pk).update(**values)
+        invalidate_offer_list()
+
 
 class OfferDetail(models.Model):
     """Represents one of the three pricing tiers of an offer (basic, standard, premium)."""
@@ -45,6 +65,9 @@ class OfferDetail(models.Model):
         verbose_name = 'Offer Detail'
         verbose_name_plural = 'Offer Details'
         ordering = ['offer', 'offer_type']
+        indexes = [
+            models.Index(fields=['offer', 'offer_type'], name='offerdetail_offer_type_idx'),
+        ]
 
     def __str__(self):
         return f'{self.offer.title} – {self.offer_type}'
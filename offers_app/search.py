@@ -0,0 +1,66 @@
+"""Database-side full-text index for offer titles and descriptions.
+
+SQLite uses an external-content FTS5 table kept in sync by triggers, PostgreSQL a
+generated ``tsvector`` column with a GIN index. Both are maintained by the
+database itself, so bulk_create() and queryset updates stay in sync as well.
+"""
+
+SQLITE_FTS_TABLE = 'offers_app_offer_fts'
+
+SQLITE_INSTALL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} USING fts5(
+        title, description,
+        content='offers_app_offer', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS offers_app_offer_fts_insert AFTER INSERT ON offers_app_offer BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS offers_app_offer_fts_delete AFTER DELETE ON offers_app_offer BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS offers_app_offer_fts_update AFTER UPDATE OF title, description ON offers_app_offer BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO {SQLITE_FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('rebuild')",
+]
+
+SQLITE_UNINSTALL = [
+    'DROP TRIGGER IF EXISTS offers_app_offer_fts_insert',
+    'DROP TRIGGER IF EXISTS offers_app_offer_fts_delete',
+    'DROP TRIGGER IF EXISTS offers_app_offer_fts_update',
+    f'DROP TABLE IF EXISTS {SQLITE_FTS_TABLE}',
+]
+
+POSTGRES_INSTALL = [
+    """ALTER TABLE offers_app_offer ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+        ) STORED""",
+    'CREATE INDEX IF NOT EXISTS offers_app_offer_search_idx ON offers_app_offer USING GIN (search_vector)',
+]
+
+POSTGRES_UNINSTALL = [
+    'DROP INDEX IF EXISTS offers_app_offer_search_idx',
+    'ALTER TABLE offers_app_offer DROP COLUMN IF EXISTS search_vector',
+]
+
+
+def install_search_index(connection):
+    """Creates (or repairs) the full-text index for the given connection's engine."""
+    _execute(connection, {'sqlite': SQLITE_INSTALL, 'postgresql': POSTGRES_INSTALL})
+
+
+def uninstall_search_index(connection):
+    """Drops the full-text index for the given connection's engine."""
+    _execute(connection, {'sqlite': SQLITE_UNINSTALL, 'postgresql': POSTGRES_UNINSTALL})
+
+
+def _execute(connection, statements_by_vendor):
+    with connection.cursor() as cursor:
+        for statement in statements_by_vendor.get(connection.vendor, []):
+            cursor.execute(statement)
@@ -0,0 +1,29 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from offers_app.models import Offer, OfferDetail
+from reviews_app.signals import rating_summary_changed
+from .cache import invalidate_offer_list
+
+
+@receiver(post_save, sender=Offer)
+@receiver(post_delete, sender=Offer)
+@receiver(post_save, sender=OfferDetail)
+@receiver(post_delete, sender=OfferDetail)
+def drop_cached_offer_pages(sender, **kwargs):
+    invalidate_offer_list()
+
+
+@receiver(post_save, sender=User)
+def drop_cached_pages_of_changed_user(sender, instance, created, update_fields=None, **kwargs):
+    """Offer list rows embed the owner's name fields."""
+    if created or update_fields == frozenset({'last_login'}):
+        return
+    invalidate_offer_list()
+
+
+@receiver(rating_summary_changed)
+def drop_cached_pages_of_rated_user(sender, **kwargs):
+    """Offer list rows embed the owner's rating summary."""
+    invalidate_offer_list()
@@ -0,0 +1,151 @@
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from offers_app.cache import GENERATION_KEY, bump_generation, current_generation, offer_list_cache
+from offers_app.models import Offer
+from reviews_app.models import RatingSummary
+from .test_offers import VALID_DETAILS, create_offer, create_offers_bulk, make_business_user
+
+
+class OfferListCacheTests(APITestCase):
+    """Tests for the anonymous response cache of GET /api/offers/"""
+
+    def setUp(self):
+        offer_list_cache().clear()
+        self.business_user, self.token = make_business_user('biz')
+        self.offers = create_offers_bulk(self.business_user, 8)
+        self.url = reverse('offer-list-create')
+
+    def test_repeated_anonymous_page_runs_no_queries(self):
+        first = self.client.get(self.url, {'page_size': 3})
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url, {'page_size': 3})
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_parameter_order_shares_an_entry(self):
+        self.client.get(self.url + '?page_size=3&ordering=min_price')
+        with self.assertNumQueries(0):
+            self.client.get(self.url + '?ordering=min_price&page_size=3')
+
+    def test_different_parameters_miss(self):
+        first_page = self.client.get(self.url, {'page_size': 3}).data['results']
+        second_page = self.client.get(self.url, {'page_size': 3, 'page': 2}).data['results']
+        self.assertFalse({offer['id'] for offer in first_page} & {offer['id'] for offer in second_page})
+
+    def test_cached_page_answers_conditional_request(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_refilled_page_has_new_validators_after_a_review(self):
+        etag = self.client.get(self.url)['ETag']
+        RatingSummary.record_rating_change(self.business_user.pk, new_rating=5)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_refilled_page_has_new_validators_after_a_rename(self):
+        etag = self.client.get(self.url)['ETag']
+        self.business_user.last_name = 'Lovelace'
+        self.business_user.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_authenticated_requests_bypass_the_cache(self):
+        self.client.get(self.url)
+        self.client.force_authenticate(self.business_user)
+        with self.assertNumQueries(3):
+            self.client.get(self.url)
+
+    def test_created_offer_invalidates_pages(self):
+        self.client.get(self.url)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+        self.client.post(self.url, {'title': 'New', 'description': 'Fresh', 'details': VALID_DETAILS}, format='json')
+        self.client.credentials()
+        self.assertEqual(self.client.get(self.url).data['count'], 9)
+
+    def test_bulk_created_offers_invalidate_pages(self):
+        self.client.get(self.url)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+        payload = [{'title': f'Bulk {i}', 'description': 'Bulk', 'details': VALID_DETAILS} for i in range(2)]
+        self.client.post(reverse('offer-bulk-create'), payload, format='json')
+        self.client.credentials()
+        self.assertEqual(self.client.get(self.url).data['count'], 10)
+
+    def test_detail_update_invalidates_pages(self):
+        offer = create_offer(self.business_user)
+        self.client.get(self.url)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+        self.client.patch(reverse('offer-detail', kwargs={'pk': offer.pk}),
+                          {'details': [{'offer_type': 'basic', 'price': '9.99'}]}, format='json')
+        self.client.credentials()
+        results = self.client.get(self.url).data['results']
+        self.assertEqual(next(result for result in results if result['id'] == offer.pk)['min_price'], 9.99)
+
+    def test_deleted_offer_invalidates_pages(self):
+        self.client.get(self.url)
+        self.offers[0].delete()
+        self.assertEqual(self.client.get(self.url).data['count'], 7)
+
+    def test_rating_change_invalidates_pages(self):
+        self.client.get(self.url)
+        RatingSummary.record_rating_change(self.business_user.pk, new_rating=5)
+        result = self.client.get(self.url).data['results'][0]
+        self.assertEqual(result['user_rating']['review_count'], 1)
+
+    def test_user_rename_invalidates_pages(self):
+        self.client.get(self.url)
+        self.business_user.first_name = 'Ada'
+        self.business_user.save()
+        self.assertEqual(self.client.get(self.url).data['results'][0]['user_details']['first_name'], 'Ada')
+
+    def test_write_bumps_generation_again_on_commit(self):
+        before = current_generation()
+        with self.captureOnCommitCallbacks(execute=True):
+            Offer.objects.filter(pk=self.offers[0].pk).first().save()
+        self.assertEqual(current_generation(), before + 2)
+
+    def test_evicted_generation_restarts_unused(self):
+        before = current_generation()
+        offer_list_cache().delete(GENERATION_KEY)
+        bump_generation()
+        self.assertNotIn(current_generation(), (before, before + 1))
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'lru-default'},
+    'throttle': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'lru-throttle'},
+    'offer_list': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'lru-offer-list',
+        'OPTIONS': {'MAX_ENTRIES': 4, 'CULL_FREQUENCY': 4},
+    },
+})
+class OfferListCacheEvictionTests(APITestCase):
+    """The offer list cache stays bounded and evicts the least recently used page first."""
+
+    def setUp(self):
+        offer_list_cache().clear()
+        business_user, _ = make_business_user('biz')
+        create_offers_bulk(business_user, 8)
+        self.url = reverse('offer-list-create')
+
+    def test_least_recently_used_page_is_evicted(self):
+        self.client.get(self.url, {'page_size': 1})
+        self.client.get(self.url, {'page_size': 2})
+        self.client.get(self.url, {'page_size': 3})
+        self.client.get(self.url, {'page_size': 1})
+        self.client.get(self.url, {'page_size': 4})
+        with self.assertNumQueries(0):
+            self.client.get(self.url, {'page_size': 1})
+        with self.assertNumQueries(3):
+            self.client.get(self.url, {'page_size': 2})
@@ -1,11 +1,22 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.conf import settings
+from django.contrib import admin
 from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import override_settings
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
-from rest_framework.authtoken.models import Token
-from rest_framework.test import APITestCase
+from rest_framework.test import APIClient, APITestCase
 
+from auth_app.models import AuthToken
+from offers_app.admin import OfferDetailAdmin
+from offers_app.cache import invalidate_offer_list
 from offers_app.models import Offer, OfferDetail
 from profiles_app.models import UserProfile
+from reviews_app.models import RatingSummary
 
 
 VALID_DETAILS = [
@@ -18,14 +29,14 @@ VALID_DETAILS = [
 def make_business_user(username, password='Test1234!'):
     user = User.objects.create_user(username=username, password=password)
     UserProfile.objects.create(user=user, type='business')
-    token, _ = Token.objects.get_or_create(user=user)
+    token = AuthToken.objects.create(user=user)
     return user, token.key
 
 
 def make_customer_user(username, password='Test1234!'):
     user = User.objects.create_user(username=username, password=password)
     UserProfile.objects.create(user=user, type='customer')
-    token, _ = Token.objects.get_or_create(user=user)
+    token = AuthToken.objects.create(user=user)
     return user, token.key
 
 
@@ -50,6 +61,11 @@ class OfferListTests(APITestCase):
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_list_includes_business_rating(self):
+        RatingSummary.record_rating_change(self.business_user.pk, new_rating=4)
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['results'][0]['user_rating']['average_rating'], 4.0)
+
     def test_filter_by_creator_id_returns_200(self):
         response = self.client.get(self.url, {'creator_id': self.business_user.pk})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -65,6 +81,15 @@ class OfferListTests(APITestCase):
         response = self.client.get(self.url, {'max_delivery_time': 5})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_detail_filters_return_each_offer_once(self):
+        response = self.client.get(self.url, {'min_price': 10, 'max_delivery_time': 30})
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_detail_filters_must_match_the_same_tier(self):
+        response = self.client.get(self.url, {'min_price': 100, 'max_delivery_time': 5})
+        self.assertEqual(response.data['count'], 0)
+
     def test_search_returns_200(self):
         response = self.client.get(self.url, {'search': 'Test'})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -73,6 +98,222 @@ class OfferListTests(APITestCase):
         response = self.client.get(self.url, {'ordering': '-updated_at'})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_equal_sort_keys_are_ordered_by_id(self):
+        for _ in range(3):
+            create_offer(self.business_user)
+        Offer.objects.update(updated_at=self.offer.updated_at)
+        for params in ({}, {'ordering': 'min_price'}):
+            ids = [result['id'] for page in (1, 2) for result in
+                   self.client.get(self.url, {**params, 'page_size': 2, 'page': page}).data['results']]
+            self.assertEqual(ids, sorted(Offer.objects.values_list('id', flat=True), reverse=True))
+
+
+def create_offers_bulk(user, count):
+    offers = Offer.objects.bulk_create(
+        [Offer(user=user, title=f'Offer {i}', description='Bulk offer') for i in range(count)]
+    )
+    OfferDetail.objects.bulk_create([
+        OfferDetail(offer=offer, title=detail['title'], revisions=detail['revisions'],
+                    delivery_time_in_days=detail['delivery_time_in_days'], price=detail['price'],
+                    features=detail['features'], offer_type=detail['offer_type'])
+        for offer in offers for detail in VALID_DETAILS
+    ])
+    invalidate_offer_list()
+    return offers
+
+
+class OfferListQueryCountTests(APITestCase):
+    """Query-count regression tests for GET /api/offers/ (count, offers with users, detail ids)."""
+
+    def setUp(self):
+        self.business_user, _ = make_business_user('biz')
+        create_offers_bulk(self.business_user, 120)
+        self.url = reverse('offer-list-create')
+
+    def test_default_page_uses_constant_queries(self):
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url, {'page_size': 6})
+        self.assertEqual(len(response.data['results']), 6)
+
+    def test_large_page_uses_constant_queries(self):
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url, {'page_size': 100})
+        self.assertEqual(len(response.data['results']), 100)
+        self.assertEqual(len(response.data['results'][0]['details']), 3)
+
+
+class OfferCursorPaginationTests(APITestCase):
+    """Tests for the keyset (?cursor=) mode of GET /api/offers/"""
+
+    def setUp(self):
+        self.business_user, _ = make_business_user('biz')
+        self.offers = create_offers_bulk(self.business_user, 15)
+        self.url = reverse('offer-list-create')
+
+    def test_cursor_pages_cover_every_offer_once(self):
+        seen = []
+        response = self.client.get(self.url, {'cursor': '', 'page_size': 4})
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            seen += [result['id'] for result in response.data['results']]
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+        self.assertEqual(sorted(seen), sorted(offer.pk for offer in self.offers))
+        self.assertEqual(len(seen), len(set(seen)))
+
+    def test_cursor_page_skips_count_query(self):
+        with self.assertNumQueries(2):
+            self.client.get(self.url, {'cursor': ''})
+
+    def test_invalid_cursor_returns_404(self):
+        response = self.client.get(self.url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_page_number_mode_stays_default(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['count'], 15)
+
+
+# Anonymous list requests go through the offer list cache; its revalidation is tested in test_offer_list_cache.
+@override_settings(CACHES={**settings.CACHES, 'offer_list': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}})
+class OfferConditionalGetTests(APITestCase):
+    """Tests for ETag/Last-Modified revalidation of GET /api/offers/ and /api/offers/<pk>/"""
+
+    def setUp(self):
+        self.business_user, self.token = make_business_user('biz')
+        self.offers = create_offers_bulk(self.business_user, 5)
+        self.url = reverse('offer-list-create')
+        self.detail_url = reverse('offer-detail', kwargs={'pk': self.offers[0].pk})
+
+    def test_list_sends_validators(self):
+        response = self.client.get(self.url)
+        self.assertTrue(response['ETag'].startswith('W/"'))
+        self.assertIn('Last-Modified', response)
+        self.assertIn('no-cache', response['Cache-Control'])
+
+    def test_matching_etag_returns_304_with_one_query(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_etag_changes_with_query_string_and_rows(self):
+        etag = self.client.get(self.url)['ETag']
+        self.assertNotEqual(self.client.get(self.url, {'page_size': 2})['ETag'], etag)
+        Offer.objects.filter(pk=self.offers[0].pk).update(title='Renamed', updated_at=timezone.now())
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_changes_when_an_offer_is_deleted(self):
+        etag = self.client.get(self.url)['ETag']
+        self.offers[-1].delete()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_etag_changes_when_the_owner_gets_a_review(self):
+        etag = self.client.get(self.url)['ETag']
+        customer, customer_token = make_customer_user('customer')
+        reviewer = APIClient()
+        reviewer.credentials(HTTP_AUTHORIZATION='Token ' + customer_token)
+        response = reviewer.post(reverse('review-list-create'), {'business_user': self.business_user.pk, 'rating': 4, 'description': 'Good'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['user_rating']['review_count'], 1)
+
+    def test_etag_changes_when_the_owner_renames(self):
+        etag = self.client.get(self.url)['ETag']
+        owner = APIClient()
+        owner.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+        response = owner.patch(reverse('profile-detail', kwargs={'pk': self.business_user.pk}), {'first_name': 'Renamed'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['user_details']['first_name'], 'Renamed')
+
+    def test_admin_price_edit_changes_validators(self):
+        before = self.client.get(self.url)
+        updated_at = self.offers[0].updated_at
+        detail = OfferDetail.objects.get(offer=self.offers[0], offer_type='basic')
+        detail.price = Decimal('1.00')
+        OfferDetailAdmin(OfferDetail, admin.site).save_model(None, detail, None, True)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=before['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertGreater(Offer.objects.get(pk=self.offers[0].pk).updated_at, updated_at)
+        self.assertEqual(response.data['results'][0]['min_price'], 1.0)
+
+    def test_cursor_page_etag_changes_with_rating_summary(self):
+        etag = self.client.get(self.url, {'cursor': ''})['ETag']
+        RatingSummary.record_rating_change(self.business_user.pk, new_rating=5)
+        response = self.client.get(self.url, {'cursor': ''}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_cursor_page_returns_304_without_count_query(self):
+        etag = self.client.get(self.url, {'cursor': ''})['ETag']
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, {'cursor': ''}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_detail_matching_etag_returns_304_with_one_query(self):
+        self.client.force_authenticate(self.business_user)
+        etag = self.client.get(self.detail_url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_detail_etag_changes_with_rating_summary(self):
+        self.client.force_authenticate(self.business_user)
+        etag = self.client.get(self.detail_url)['ETag']
+        RatingSummary.objects.update_or_create(
+            user=self.business_user, defaults={'review_count': 1, 'rating_sum': 5}
+        )
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_detail_if_modified_since_returns_304(self):
+        self.client.force_authenticate(self.business_user)
+        last_modified = self.client.get(self.detail_url)['Last-Modified']
+        response = self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+
+class OfferSearchTests(APITestCase):
+    """Tests for the full-text ?search= parameter of GET /api/offers/"""
+
+    def setUp(self):
+        self.business_user, _ = make_business_user('biz')
+        self.logo = Offer.objects.create(user=self.business_user, title='Logo design', description='Vector logo and logo variants')
+        self.website = Offer.objects.create(user=self.business_user, title='Website', description='Includes a small logo')
+        self.copywriting = Offer.objects.create(user=self.business_user, title='Copywriting', description='Texts for your website')
+        self.url = reverse('offer-list-create')
+
+    def search_ids(self, term, **params):
+        response = self.client.get(self.url, {'search': term, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [result['id'] for result in response.data['results']]
+
+    def test_search_ranks_by_relevance(self):
+        self.assertEqual(self.search_ids('logo'), [self.logo.pk, self.website.pk])
+
+    def test_search_matches_prefixes(self):
+        self.assertEqual(self.search_ids('webs'), [self.website.pk, self.copywriting.pk])
+
+    def test_search_respects_explicit_ordering(self):
+        self.assertEqual(self.search_ids('logo', ordering='-updated_at'), [self.website.pk, self.logo.pk])
+
+    def test_search_ignores_query_syntax(self):
+        self.assertEqual(self.search_ids('"logo" OR'), [])
+
+    def test_search_index_follows_updates_and_deletes(self):
+        Offer.objects.filter(pk=self.website.pk).update(title='Homepage', description='Landing page')
+        self.logo.delete()
+        self.assertEqual(self.search_ids('logo'), [])
+        self.assertEqual(self.search_ids('landing'), [self.website.pk])
+
 
 class OfferRetrieveTests(APITestCase):
     """Tests for GET /api/offers/<pk>/"""
@@ -87,6 +328,13 @@ class OfferRetrieveTests(APITestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_get_single_offer_uses_constant_queries(self):
+        self.client.force_authenticate(self.business_user)
+        url = reverse('offer-detail', kwargs={'pk': self.offer.pk})
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data['details']), 3)
+
     def test_get_nonexistent_offer_returns_404(self):
         url = reverse('offer-detail', kwargs={'pk': 9999})
         response = self.client.get(url)
@@ -107,6 +355,13 @@ class OfferCreateTests(APITestCase):
         response = self.client.post(self.url, self.valid_data, format='json')
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
+    def test_post_offer_stores_min_values(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.business_token)
+        response = self.client.post(self.url, self.valid_data, format='json')
+        offer = Offer.objects.get(pk=response.data['id'])
+        self.assertEqual(offer.min_price, Decimal('49.99'))
+        self.assertEqual(offer.min_delivery_time, 3)
+
     def test_post_offer_as_customer_returns_403(self):
         self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.customer_token)
         response = self.client.post(self.url, self.valid_data, format='json')
@@ -134,6 +389,52 @@ class OfferCreateTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
 
+class OfferBulkCreateTests(APITestCase):
+    """Tests for POST /api/offers/bulk/"""
+
+    def setUp(self):
+        self.business_user, self.business_token = make_business_user('biz')
+        self.customer_user, self.customer_token = make_customer_user('cust')
+        self.url = reverse('offer-bulk-create')
+        self.valid_data = [
+            {'title': f'Bulk Offer {i}', 'description': 'Great offer', 'details': VALID_DETAILS} for i in range(3)
+        ]
+
+    def test_post_bulk_creates_offers_with_details_and_min_values(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.business_token)
+        response = self.client.post(self.url, self.valid_data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 3)
+        self.assertEqual(len(response.data[0]['details']), 3)
+        offers = Offer.objects.filter(user=self.business_user)
+        self.assertEqual(offers.count(), 3)
+        self.assertEqual(OfferDetail.objects.filter(offer__in=offers).count(), 9)
+        self.assertEqual(set(offers.values_list('min_price', flat=True)), {Decimal('49.99')})
+        self.assertEqual(set(offers.values_list('min_delivery_time', flat=True)), {3})
+
+    def test_post_bulk_uses_constant_number_of_inserts(self):
+        self.client.force_authenticate(self.business_user)
+        with self.assertNumQueries(5):
+            self.client.post(self.url, self.valid_data * 5, format='json')
+
+    def test_post_bulk_with_invalid_item_creates_nothing(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.business_token)
+        data = [*self.valid_data, {'title': 'Broken', 'description': 'x', 'details': VALID_DETAILS[:2]}]
+        response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Offer.objects.exists())
+
+    def test_post_bulk_over_limit_returns_400(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.business_token)
+        response = self.client.post(self.url, self.valid_data * 34, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_post_bulk_as_customer_returns_403(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.customer_token)
+        response = self.client.post(self.url, self.valid_data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
 class OfferUpdateDeleteTests(APITestCase):
     """Tests for PATCH/DELETE /api/offers/<pk>/"""
 
@@ -148,6 +449,15 @@ class OfferUpdateDeleteTests(APITestCase):
         response = self.client.patch(self.url, {'title': 'Updated Title'}, format='json')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_patch_offer_details_updates_min_values(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.business_token)
+        details = [{'offer_type': 'basic', 'price': '199.99', 'delivery_time_in_days': 9}]
+        response = self.client.patch(self.url, {'details': details}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.offer.refresh_from_db()
+        self.assertEqual(self.offer.min_price, Decimal('99.99'))
+        self.assertEqual(self.offer.min_delivery_time, 5)
+
     def test_patch_other_offer_returns_403(self):
         self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.other_token)
         response = self.client.patch(self.url, {'title': 'Hacked'}, format='json')
@@ -186,3 +496,24 @@ class OfferDetailRetrieveTests(APITestCase):
         url = reverse('offerdetail-detail', kwargs={'pk': 9999})
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class BackfillOfferMinValuesTests(APITestCase):
+    """Tests for the backfill_offer_min_values management command."""
+
+    def setUp(self):
+        self.business_user, _ = make_business_user('biz')
+        self.offer = create_offer(self.business_user)
+        self.empty_offer = Offer.objects.create(user=self.business_user, title='Empty', description='No details')
+
+    def test_backfill_sets_min_values(self):
+        call_command('backfill_offer_min_values', stdout=StringIO())
+        self.offer.refresh_from_db()
+        self.assertEqual(self.offer.min_price, Decimal('49.99'))
+        self.assertEqual(self.offer.min_delivery_time, 3)
+
+    def test_backfill_leaves_offers_without_details_empty(self):
+        call_command('backfill_offer_min_values', stdout=StringIO())
+        self.empty_offer.refresh_from_db()
+        self.assertIsNone(self.empty_offer.min_price)
+        self.assertIsNone(self.empty_offer.min_delivery_time)
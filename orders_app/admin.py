@@ -1,6 +1,7 @@
 from django.contrib import admin
+from django.db import transaction
 
-from .models import Order
+from .models import Order, OrderStats
 
 
 @admin.register(Order)
@@ -8,3 +9,25 @@ class OrderAdmin(admin.ModelAdmin):
     list_display = ['id', 'customer_user', 'business_user', 'title', 'status', 'created_at']
     list_filter = ['status']
     search_fields = ['title', 'customer_user__username', 'business_user__username']
+
+    def save_model(self, request, obj, form, change):
+        """Saves the order and moves it between the order counters, like the API views."""
+        with transaction.atomic():
+            old_business_user_id, old_status = None, None
+            if change:
+                old_business_user_id, old_status = Order.objects.select_for_update().values_list(
+                    'business_user_id', 'status',
+                ).get(pk=obj.pk)
+            super().save_model(request, obj, form, change)
+            if obj.business_user_id == old_business_user_id:
+                OrderStats.record_status_change(obj.business_user_id, old_status, obj.status)
+            else:
+                if old_business_user_id:
+                    OrderStats.record_status_change(old_business_user_id, old_status=old_status)
+                OrderStats.record_status_change(obj.business_user_id, new_status=obj.status)
+
+
+@admin.register(OrderStats)
+class OrderStatsAdmin(admin.ModelAdmin):
+    list_display = ['user', 'in_progress_count', 'completed_count', 'cancelled_count']
+    search_fields = ['user__username']
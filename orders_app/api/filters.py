@@ -0,0 +1,15 @@
+import django_filters
+
+from orders_app.models import Order
+
+
+class OrderFilter(django_filters.FilterSet):
+    """Filter for orders by status and creation date range."""
+
+    status = django_filters.ChoiceFilter(choices=Order.STATUS_CHOICES)
+    created_after = django_filters.DateTimeFilter(field_name='created_at', lookup_expr='gte')
+    created_before = django_filters.DateTimeFilter(field_name='created_at', lookup_expr='lte')
+
+    class Meta:
+        model = Order
+        fields = ['status', 'created_after', 'created_before']
@@ -1,7 +1,8 @@
+from django.db import transaction
 from rest_framework import serializers
 
 from offers_app.models import OfferDetail
-from orders_app.models import Order
+from orders_app.models import Order, OrderStats
 
 
 class OrderSerializer(serializers.ModelSerializer):
@@ -30,13 +31,16 @@ class OrderCreateSerializer(serializers.Serializer):
         offer_detail = validated_data['offer_detail_id']
         customer_user = self.context['request'].user
         business_user = offer_detail.offer.user
-        return Order.objects.create(
-            customer_user=customer_user,
-            business_user=business_user,
-            title=offer_detail.title,
-            revisions=offer_detail.revisions,
-            delivery_time_in_days=offer_detail.delivery_time_in_days,
-            price=offer_detail.price,
-            features=offer_detail.features,
-            offer_type=offer_detail.offer_type,
-        )
+        with transaction.atomic():
+            order = Order.objects.create(
+                customer_user=customer_user,
+                business_user=business_user,
+                title=offer_detail.title,
+                revisions=offer_detail.revisions,
+                delivery_time_in_days=offer_detail.delivery_time_in_days,
+                price=offer_detail.price,
+                features=offer_detail.features,
+                offer_type=offer_detail.offer_type,
+            )
+            OrderStats.record_status_change(business_user.pk, new_status=order.status)
+        return order
@@ -1,11 +1,13 @@
 from django.urls import path
 
-from .views import CompletedOrderCountView, OrderCountView, OrderListCreateView, OrderRetrieveUpdateDestroyView
+from .views import (CompletedOrderCountView, OrderCountView, OrderListCreateView,
+                    OrderRetrieveUpdateDestroyView, OrderStatsView)
 
 urlpatterns = [
     path('orders/', OrderListCreateView.as_view(), name='order-list-create'),
     path('orders/<int:pk>/', OrderRetrieveUpdateDestroyView.as_view(), name='order-detail'),
     path('order-count/<int:business_user_id>/', OrderCountView.as_view(), name='order-count'),
     path('completed-order-count/<int:business_user_id>/', CompletedOrderCountView.as_view(), name='completed-order-count'),
+    path('order-stats/<int:business_user_id>/', OrderStatsView.as_view(), name='order-stats'),
 ]
 
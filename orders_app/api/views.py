@@ -1,18 +1,85 @@
+from django.db import transaction
+from django.core.paginator import Paginator as DjangoPaginator
+from django.db.models import F, Q
+from django.http import Http404
+from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from orders_app.models import Order
+from core.api.async_views import AsyncAPIView
+from core.api.pagination import CursorOptInPagination, KeysetPagination
+from orders_app.models import Order, OrderStats
 from profiles_app.models import UserProfile
+from .filters import OrderFilter
 from .permissions import IsAdminUser, IsBusinessUserOfOrder, IsCustomerUser
 from .serializers import OrderCreateSerializer, OrderSerializer
 
 
+ORDER_LIST_ORDERING = ('-created_at', '-id')
+
+
+def newest_participant_orders(orders, user, stop):
+    """Returns the newest stop orders of the user in each role from orders, merged and newest first.
+
+    Any slice within [:stop] of the result matches the same slice of orders. Each role
+    is limited on its own (user, -created_at, -id) index before the merge, so only up
+    to 2 * stop rows are sorted instead of every order of the user.
+    """
+    newest_as_customer = orders.filter(customer_user=user).order_by(*ORDER_LIST_ORDERING).values('id')[:stop]
+    newest_as_business = orders.filter(business_user=user).order_by(*ORDER_LIST_ORDERING).values('id')[:stop]
+    merged = Order.objects.filter(Q(pk__in=newest_as_customer) | Q(pk__in=newest_as_business))
+    return merged.order_by(*ORDER_LIST_ORDERING)
+
+
+class ParticipantPaginator(DjangoPaginator):
+    """Page-number paginator over the orders of one user that reads each page via newest_participant_orders."""
+
+    def __init__(self, object_list, per_page, user):
+        super().__init__(object_list, per_page)
+        self.user = user
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page
+        if top + self.orphans >= self.count:
+            top = self.count
+        return self._get_page(newest_participant_orders(self.object_list, self.user, top)[bottom:top], number, self)
+
+
+class ParticipantKeysetPagination(KeysetPagination):
+    """Keyset pagination over the orders of the requesting user, reading each role from its own index."""
+
+    def fetch(self, queryset, count):
+        return list(newest_participant_orders(queryset, self.request.user, count)[:count])
+
+
+class OrderPagination(CursorOptInPagination):
+    """Pagination for the order list (page numbers, or keyset with ?cursor=).
+
+    Both modes fetch a page through newest_participant_orders; the filtered queryset
+    from the view is only used as is for the COUNT.
+    """
+
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    keyset_pagination_class = ParticipantKeysetPagination
+    keyset_ordering_field = 'created_at'
+
+    def page_paginator_class(self, object_list, per_page):
+        return ParticipantPaginator(object_list, per_page, self.request.user)
+
+
 class OrderListCreateView(generics.ListCreateAPIView):
     """Lists orders for the current user or creates a new order."""
 
     permission_classes = [IsAuthenticated]
+    pagination_class = OrderPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = OrderFilter
 
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -20,8 +87,9 @@ class OrderListCreateView(generics.ListCreateAPIView):
         return OrderSerializer
 
     def get_queryset(self):
+        """Orders of the user in either role, newest first; OrderPagination reads each page per role."""
         user = self.request.user
-        return Order.objects.filter(customer_user=user) | Order.objects.filter(business_user=user)
+        return Order.objects.filter(Q(customer_user=user) | Q(business_user=user)).order_by(*ORDER_LIST_ORDERING)
 
     def get_permissions(self):
         if self.request.method == 'POST':
@@ -54,6 +122,45 @@ class OrderRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
         self.check_object_permissions(self.request, obj)
         return obj
 
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            old_status = self.lock_status(serializer.instance)
+            order = serializer.save()
+            OrderStats.record_status_change(order.business_user_id, old_status, order.status)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.status = self.lock_status(instance)
+            instance.delete()
+
+    def lock_status(self, instance):
+        """Re-reads the order's status under a row lock, so concurrent writes each move it from the status they replace."""
+        return Order.objects.select_for_update().values_list('status', flat=True).get(pk=instance.pk)
+
+
+def business_order_stats_queryset(business_user_id):
+    return UserProfile.objects.filter(user_id=business_user_id, type=UserProfile.BUSINESS).values(
+        in_progress=F('user__order_stats__in_progress_count'),
+        completed=F('user__order_stats__completed_count'),
+        cancelled=F('user__order_stats__cancelled_count'),
+    )
+
+
+def order_counters(stats):
+    if stats is None:
+        raise Http404
+    return {status: count or 0 for status, count in stats.items()}
+
+
+def business_order_stats(business_user_id):
+    """Returns the order counters of a business user in a single read, or raises Http404."""
+    return order_counters(business_order_stats_queryset(business_user_id).first())
+
+
+async def abusiness_order_stats(business_user_id):
+    """Async business_order_stats()."""
+    return order_counters(await business_order_stats_queryset(business_user_id).afirst())
+
 
 class OrderCountView(APIView):
     """Returns the count of in-progress orders for a business user."""
@@ -61,17 +168,44 @@ class OrderCountView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, business_user_id):
-        generics.get_object_or_404(UserProfile, user__id=business_user_id, type=UserProfile.BUSINESS)
-        count = Order.objects.filter(business_user__id=business_user_id, status=Order.IN_PROGRESS).count()
-        return Response({'order_count': count})
+        return self.counters_response(business_order_stats(business_user_id))
+
+    def counters_response(self, stats):
+        return Response({'order_count': stats['in_progress']})
 
 
-class CompletedOrderCountView(APIView):
+class CompletedOrderCountView(OrderCountView):
     """Returns the count of completed orders for a business user."""
 
-    permission_classes = [IsAuthenticated]
+    def counters_response(self, stats):
+        return Response({'completed_order_count': stats['completed']})
 
-    def get(self, request, business_user_id):
-        generics.get_object_or_404(UserProfile, user__id=business_user_id, type=UserProfile.BUSINESS)
-        count = Order.objects.filter(business_user__id=business_user_id, status=Order.COMPLETED).count()
-        return Response({'completed_order_count': count})
+
+class OrderStatsView(OrderCountView):
+    """Returns all order counters for a business user."""
+
+    def counters_response(self, stats):
+        return Response({
+            'order_count': stats['in_progress'],
+            'completed_order_count': stats['completed'],
+            'cancelled_order_count': stats['cancelled'],
+        })
+
+
+class AsyncCounterMixin:
+    """Async get() of the order counter views, reading the counters with the async ORM."""
+
+    async def get(self, request, business_user_id):
+        return self.counters_response(await abusiness_order_stats(business_user_id))
+
+
+class AsyncOrderCountView(AsyncCounterMixin, AsyncAPIView, OrderCountView):
+    """OrderCountView for ASGI."""
+
+
+class AsyncCompletedOrderCountView(AsyncCounterMixin, AsyncAPIView, CompletedOrderCountView):
+    """CompletedOrderCountView for ASGI."""
+
+
+class AsyncOrderStatsView(AsyncCounterMixin, AsyncAPIView, OrderStatsView):
+    """OrderStatsView for ASGI."""
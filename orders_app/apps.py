@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class OrdersAppConfig(AppConfig):
     name = 'orders_app'
     verbose_name = 'Orders'
+
+    def ready(self):
+        from . import signals  # noqa: F401
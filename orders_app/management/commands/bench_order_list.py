@@ -0,0 +1,64 @@
+import random
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from core.benchmark import benchmark_database, summarize, time_call
+from orders_app.api.views import ORDER_LIST_ORDERING, newest_participant_orders
+from orders_app.models import Order
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks one order list page (OR filter vs newest ids per role) on a throwaway database.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=1_000_000, help='Number of orders to generate.')
+        parser.add_argument('--businesses', type=int, default=2000)
+        parser.add_argument('--customers', type=int, default=20000)
+        parser.add_argument('--repeat', type=int, default=10, help='Timed runs per variant.')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            heavy_business, customer = self._seed(options)
+            for label, user in [('heavy business', heavy_business), ('customer', customer)]:
+                orders = Order.objects.filter(Q(customer_user=user) | Q(business_user=user)).order_by(*ORDER_LIST_ORDERING)
+                variants = {
+                    'OR (before)': lambda bottom, top: orders[bottom:top],
+                    'per role (after)': lambda bottom, top: newest_participant_orders(orders, user, top)[bottom:top],
+                }
+                for name, page_rows in variants.items():
+                    for page in (1, 50):
+                        samples = time_call(lambda: self._list_page(orders, page_rows, page), repeat=options['repeat'])
+                        self.stdout.write(f'{label:<15} {name:<17} page={page:<3} rows={orders.count():<8} {summarize(samples)} ms')
+
+    def _list_page(self, orders, page_rows, page, page_size=20):
+        """Mirrors one paginated order list request: a COUNT and one page of rows."""
+        orders.count()
+        list(page_rows((page - 1) * page_size, page * page_size))
+
+    def _seed(self, options):
+        rng = random.Random(options['seed'])
+        businesses = User.objects.bulk_create(
+            [User(username=f'business{i}', password='!') for i in range(options['businesses'])], batch_size=5000
+        )
+        customers = User.objects.bulk_create(
+            [User(username=f'customer{i}', password='!') for i in range(options['customers'])], batch_size=5000
+        )
+        heavy_business = businesses[0]
+        statuses = [Order.IN_PROGRESS, Order.COMPLETED, Order.CANCELLED]
+        batch_size = 10000
+        for start in range(0, options['orders'], batch_size):
+            Order.objects.bulk_create([
+                Order(
+                    customer_user=rng.choice(customers),
+                    # A fifth of all orders go to one business to reproduce heavy accounts.
+                    business_user=heavy_business if rng.random() < 0.2 else rng.choice(businesses),
+                    title='Benchmark order', revisions=1, delivery_time_in_days=rng.randint(1, 21),
+                    price=rng.randint(20, 400), features=[], offer_type='basic', status=rng.choice(statuses),
+                )
+                for _ in range(min(batch_size, options['orders'] - start))
+            ])
+        self.stdout.write(f'Seeded {options["orders"]} orders.')
+        return heavy_business, customers[0]
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from orders_app.models import OrderStats
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the per-business order counters from the orders table.'
+
+    def handle(self, *args, **options):
+        count = OrderStats.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Order stats rebuilt for {count} business users.'))
@@ -0,0 +1,49 @@
+# Generated by Django 6.0.2 on 2026-10-18 13:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+# The order statuses and their counter fields as of this migration.
+STATUS_FIELDS = {
+    'in_progress': 'in_progress_count',
+    'completed': 'completed_count',
+    'cancelled': 'cancelled_count',
+}
+
+
+def populate_order_stats(apps, schema_editor):
+    Order = apps.get_model('orders_app', 'Order')
+    OrderStats = apps.get_model('orders_app', 'OrderStats')
+    stats = {}
+    rows = Order.objects.order_by().values('business_user_id', 'status').annotate(total=Count('id'))
+    for row in rows:
+        entry = stats.setdefault(row['business_user_id'], OrderStats(user_id=row['business_user_id']))
+        setattr(entry, STATUS_FIELDS[row['status']], row['total'])
+    OrderStats.objects.bulk_create(stats.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders_app', '0002_query_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='order_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('in_progress_count', models.IntegerField(default=0)),
+                ('completed_count', models.IntegerField(default=0)),
+                ('cancelled_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Order Stats',
+                'verbose_name_plural': 'Order Stats',
+            },
+        ),
+        migrations.RunPython(populate_order_stats, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,8 @@
 from django.contrib.auth.models import User
 from django.db import models
+from django.db.models import Count, F
+
+from core.counters import replace_counter_rows, update_counters
 
 
 class Order(models.Model):
@@ -30,6 +33,68 @@ class Order(models.Model):
         verbose_name = 'Order'
         verbose_name_plural = 'Orders'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['business_user', 'status'], name='order_business_status_idx'),
+            models.Index(fields=['customer_user', '-created_at', '-id'], name='order_customer_created_idx'),
+            models.Index(fields=['business_user', '-created_at', '-id'], name='order_business_created_idx'),
+        ]
 
     def __str__(self):
         return f'Order #{self.pk} – {self.title} ({self.status})'
+
+
+class OrderStats(models.Model):
+    """Order counters per business user, kept in step with every order write."""
+
+    STATUS_FIELDS = {
+        Order.IN_PROGRESS: 'in_progress_count',
+        Order.COMPLETED: 'completed_count',
+        Order.CANCELLED: 'cancelled_count',
+    }
+
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='order_stats')
+    in_progress_count = models.IntegerField(default=0)
+    completed_count = models.IntegerField(default=0)
+    cancelled_count = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Order Stats'
+        verbose_name_plural = 'Order Stats'
+
+    def __str__(self):
+        return f'Order stats of {self.user_id}'
+
+    @classmethod
+    def record_status_change(cls, business_user_id, old_status=None, new_status=None):
+        """Moves one order between counters; call inside the transaction that writes the order.
+
+        Deletes are counted by the post_delete receiver in orders_app.signals, cascades included.
+        """
+        if old_status == new_status:
+            return
+        update_counters(cls, business_user_id, cls.status_updates(old_status, new_status))
+
+    @classmethod
+    def status_updates(cls, old_status=None, new_status=None):
+        """Returns the F() updates that move one order from old_status to new_status."""
+        updates = {}
+        if old_status:
+            updates[cls.STATUS_FIELDS[old_status]] = F(cls.STATUS_FIELDS[old_status]) - 1
+        if new_status:
+            updates[cls.STATUS_FIELDS[new_status]] = F(cls.STATUS_FIELDS[new_status]) + 1
+        return updates
+
+    @classmethod
+    def rebuild(cls):
+        """Recomputes all counters from the orders table."""
+        return replace_counter_rows(cls, order_stats_rows())
+
+
+def order_stats_rows():
+    """Returns unsaved OrderStats rows counting the orders per business user and status."""
+    stats = {}
+    rows = Order.objects.order_by().values('business_user_id', 'status').annotate(total=Count('id'))
+    for row in rows:
+        entry = stats.setdefault(row['business_user_id'], OrderStats(user_id=row['business_user_id']))
+        setattr(entry, OrderStats.STATUS_FIELDS[row['status']], row['total'])
+    return stats.values()
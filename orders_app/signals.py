@@ -0,0 +1,14 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from orders_app.models import Order, OrderStats
+
+
+@receiver(post_delete, sender=Order)
+def uncount_deleted_order(sender, instance, **kwargs):
+    """Counts every order delete, including cascades from a deleted customer or business user.
+
+    Only an existing row is updated: when the business user itself is deleted, its stats row
+    may already be gone and must not be recreated.
+    """
+    OrderStats.objects.filter(pk=instance.business_user_id).update(**OrderStats.status_updates(old_status=instance.status))
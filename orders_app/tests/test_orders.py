@@ -1,18 +1,28 @@
+from importlib import import_module
+from io import StringIO
+from unittest import mock
+
+from django.contrib import admin
 from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
 from django.urls import reverse
 from rest_framework import status
-from rest_framework.authtoken.models import Token
 from rest_framework.test import APITestCase
 
+from auth_app.models import AuthToken
 from offers_app.models import Offer, OfferDetail
-from orders_app.models import Order
+from orders_app.admin import OrderAdmin
+from orders_app.api.views import OrderRetrieveUpdateDestroyView
+from orders_app.models import Order, OrderStats
 from profiles_app.models import UserProfile
 
 
 def make_user(username, user_type, password='Test1234!', is_staff=False):
     user = User.objects.create_user(username=username, password=password, is_staff=is_staff)
     UserProfile.objects.create(user=user, type=user_type)
-    token, _ = Token.objects.get_or_create(user=user)
+    token = AuthToken.objects.create(user=user)
     return user, token.key
 
 
@@ -58,6 +68,85 @@ class OrderListTests(APITestCase):
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
+    def test_get_orders_lists_both_roles_once(self):
+        other_business, _ = make_user('biz2', 'business')
+        create_order(self.business, other_business)
+        create_order(self.customer, other_business)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.business_token)
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['count'], 2)
+
+    def test_filter_by_status(self):
+        completed = create_order(self.customer, self.business)
+        Order.objects.filter(pk=completed.pk).update(status=Order.COMPLETED)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.customer_token)
+        response = self.client.get(self.url, {'status': Order.COMPLETED})
+        self.assertEqual([order['id'] for order in response.data['results']], [completed.pk])
+
+    def test_filter_by_date_range(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.customer_token)
+        response = self.client.get(self.url, {'created_after': '2000-01-01', 'created_before': '2000-12-31'})
+        self.assertEqual(response.data['results'], [])
+
+    def test_list_is_paginated_by_default(self):
+        for _ in range(24):
+            create_order(self.customer, self.business)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.customer_token)
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['count'], 25)
+        self.assertEqual(len(response.data['results']), 20)
+
+    def test_page_size_limits_page(self):
+        create_order(self.customer, self.business)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.customer_token)
+        response = self.client.get(self.url, {'page_size': 1})
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_pages_break_creation_date_ties_by_id(self):
+        for _ in range(3):
+            create_order(self.customer, self.business)
+        Order.objects.update(created_at=Order.objects.first().created_at)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.customer_token)
+        ids = [order['id'] for page in (1, 2) for order in self.client.get(self.url, {'page_size': 2, 'page': page}).data['results']]
+        self.assertEqual(ids, sorted(Order.objects.values_list('id', flat=True), reverse=True))
+
+    def test_pages_merge_both_roles_by_creation_date(self):
+        other, _ = make_user('biz2', 'business')
+        for customer, business in [(self.business, other), (self.customer, self.business), (self.business, other)] * 2:
+            create_order(customer, business)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.business_token)
+        ids = [order['id'] for page in (1, 2, 3) for order in self.client.get(self.url, {'page_size': 3, 'page': page}).data['results']]
+        expected = Order.objects.filter(customer_user=self.business) | Order.objects.filter(business_user=self.business)
+        self.assertEqual(ids, list(expected.order_by('-created_at', '-id').values_list('id', flat=True)))
+
+    def test_cursor_pages_merge_both_roles(self):
+        other, _ = make_user('biz2', 'business')
+        for customer, business in [(self.business, other), (self.customer, self.business)] * 2:
+            create_order(customer, business)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.business_token)
+        ids, url, params = [], self.url, {'cursor': '', 'page_size': 2}
+        while url:
+            response = self.client.get(url, params)
+            ids += [order['id'] for order in response.data['results']]
+            url, params = response.data['next'], None
+        self.assertEqual(ids, sorted(Order.objects.values_list('id', flat=True), reverse=True))
+
+    def test_empty_list_has_no_results(self):
+        _, token = make_user('newbiz', 'business')
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token)
+        response = self.client.get(self.url)
+        self.assertEqual((response.data['count'], response.data['results']), (0, []))
+
+    def test_cursor_pages_by_creation_date(self):
+        newer = create_order(self.customer, self.business)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.customer_token)
+        response = self.client.get(self.url, {'cursor': '', 'page_size': 1})
+        self.assertEqual(response.data['results'][0]['id'], newer.pk)
+        response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertIsNone(response.data['next'])
+
 
 class OrderCreateTests(APITestCase):
     """Tests for POST /api/orders/"""
@@ -161,3 +250,109 @@ class OrderCountTests(APITestCase):
         url = reverse('order-count', kwargs={'business_user_id': 9999})
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class OrderStatsTests(APITestCase):
+    """Tests for the maintained order counters and GET /api/order-stats/<business_user_id>/"""
+
+    def setUp(self):
+        self.customer, self.customer_token = make_user('cust', 'customer')
+        self.business, self.business_token = make_user('biz', 'business')
+        self.admin, self.admin_token = make_user('admin', 'customer', is_staff=True)
+        _, self.offer_detail = create_offer_with_details(self.business)
+        self.url = reverse('order-stats', kwargs={'business_user_id': self.business.pk})
+
+    def place_order(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.customer_token)
+        response = self.client.post(reverse('order-list-create'), {'offer_detail_id': self.offer_detail.pk}, format='json')
+        return response.data['id']
+
+    def get_stats(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.customer_token)
+        return self.client.get(self.url).data
+
+    def test_create_increments_in_progress_count(self):
+        self.place_order()
+        self.assertEqual(self.get_stats(), {'order_count': 1, 'completed_order_count': 0, 'cancelled_order_count': 0})
+
+    def test_status_change_moves_counter(self):
+        order_id = self.place_order()
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.business_token)
+        self.client.patch(reverse('order-detail', kwargs={'pk': order_id}), {'status': Order.COMPLETED}, format='json')
+        self.assertEqual(self.get_stats(), {'order_count': 0, 'completed_order_count': 1, 'cancelled_order_count': 0})
+
+    def test_delete_decrements_counter(self):
+        order_id = self.place_order()
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.admin_token)
+        self.client.delete(reverse('order-detail', kwargs={'pk': order_id}))
+        self.assertEqual(self.get_stats()['order_count'], 0)
+
+    def test_status_change_counts_from_the_locked_row(self):
+        order_id = self.place_order()
+        stale = Order.objects.get(pk=order_id)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.business_token)
+        self.client.patch(reverse('order-detail', kwargs={'pk': order_id}), {'status': Order.COMPLETED}, format='json')
+        with mock.patch.object(OrderRetrieveUpdateDestroyView, 'get_object', return_value=stale):
+            self.client.patch(reverse('order-detail', kwargs={'pk': order_id}), {'status': Order.CANCELLED}, format='json')
+        self.assertEqual(self.get_stats(), {'order_count': 0, 'completed_order_count': 0, 'cancelled_order_count': 1})
+
+    def test_admin_status_edit_moves_counter(self):
+        order = Order.objects.get(pk=self.place_order())
+        order.status = Order.CANCELLED
+        OrderAdmin(Order, admin.site).save_model(None, order, None, True)
+        self.assertEqual(self.get_stats(), {'order_count': 0, 'completed_order_count': 0, 'cancelled_order_count': 1})
+
+    def test_admin_add_and_reassign_update_counters(self):
+        other_business, _ = make_user('biz2', 'business')
+        order_admin = OrderAdmin(Order, admin.site)
+        order = Order(
+            customer_user=self.customer, business_user=self.business, title='Admin order', revisions=1,
+            delivery_time_in_days=3, price='49.99', features=[], offer_type='basic', status=Order.COMPLETED,
+        )
+        order_admin.save_model(None, order, None, False)
+        self.assertEqual(self.get_stats()['completed_order_count'], 1)
+        order.business_user = other_business
+        order_admin.save_model(None, order, None, True)
+        self.assertEqual(self.get_stats()['completed_order_count'], 0)
+        self.assertEqual(OrderStats.objects.get(pk=other_business.pk).completed_count, 1)
+
+    def test_cascade_delete_decrements_counter(self):
+        self.place_order()
+        self.customer.delete()
+        self.assertEqual(OrderStats.objects.get(pk=self.business.pk).in_progress_count, 0)
+
+    def test_deleting_business_user_drops_its_counters(self):
+        self.place_order()
+        self.business.delete()
+        self.assertFalse(OrderStats.objects.exists())
+
+    def test_count_endpoints_use_a_single_query(self):
+        self.place_order()
+        self.client.force_authenticate(self.customer)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('order-count', kwargs={'business_user_id': self.business.pk}))
+        self.assertEqual(response.data['order_count'], 1)
+
+    def test_stats_for_customer_returns_404(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.customer_token)
+        response = self.client.get(reverse('order-stats', kwargs={'business_user_id': self.customer.pk}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_data_migration_counts_existing_orders(self):
+        create_order(self.customer, self.business)
+        completed = create_order(self.customer, self.business)
+        Order.objects.filter(pk=completed.pk).update(status=Order.COMPLETED)
+        OrderStats.objects.all().delete()
+        migration = import_module('orders_app.migrations.0003_orderstats')
+        apps = MigrationExecutor(connection).loader.project_state(('orders_app', '0003_orderstats')).apps
+        migration.populate_order_stats(apps, None)
+        stats = OrderStats.objects.get(pk=self.business.pk)
+        self.assertEqual((stats.in_progress_count, stats.completed_count), (1, 1))
+
+    def test_rebuild_recomputes_counters(self):
+        create_order(self.customer, self.business)
+        completed = create_order(self.customer, self.business)
+        Order.objects.filter(pk=completed.pk).update(status=Order.COMPLETED)
+        call_command('rebuild_order_stats', stdout=StringIO())
+        stats = OrderStats.objects.get(pk=self.business.pk)
+        self.assertEqual((stats.in_progress_count, stats.completed_count), (1, 1))
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 
 from profiles_app.models import UserProfile
+from reviews_app.api.serializers import RatingSummarySerializer
 
 
 class UserProfileSerializer(serializers.ModelSerializer):
@@ -10,13 +11,14 @@ class UserProfileSerializer(serializers.ModelSerializer):
     first_name = serializers.CharField(source='user.first_name', default='')
     last_name = serializers.CharField(source='user.last_name', default='')
     email = serializers.EmailField(source='user.email')
+    rating = RatingSummarySerializer(source='user.rating_summary', read_only=True, default=None)
 
     class Meta:
         model = UserProfile
         fields = [
             'user', 'username', 'first_name', 'last_name',
             'file', 'location', 'tel', 'description',
-            'working_hours', 'type', 'email', 'created_at',
+            'working_hours', 'type', 'email', 'created_at', 'rating',
         ]
         read_only_fields = ['user', 'created_at']
 
@@ -34,12 +36,13 @@ class BusinessProfileSerializer(serializers.ModelSerializer):
     username = serializers.CharField(source='user.username', read_only=True)
     first_name = serializers.CharField(source='user.first_name', default='')
     last_name = serializers.CharField(source='user.last_name', default='')
+    rating = RatingSummarySerializer(source='user.rating_summary', read_only=True, default=None)
 
     class Meta:
         model = UserProfile
         fields = [
             'user', 'username', 'first_name', 'last_name',
-            'file', 'location', 'tel', 'description', 'working_hours', 'type',
+            'file', 'location', 'tel', 'description', 'working_hours', 'type', 'rating',
         ]
 
 
@@ -1,36 +1,71 @@
+from django.db.models import Value
+from django.db.models.functions import Coalesce
+from django.http import Http404
 from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
 
+from core.api.async_views import AsyncAPIView
+from core.api.conditional import ConditionalRetrieveMixin
+from core.api.filters import StableOrderingFilter
 from profiles_app.models import UserProfile
 from .permissions import IsOwner
 from .serializers import BusinessProfileSerializer, CustomerProfileSerializer, UserProfileSerializer
 
 
-class ProfileDetailView(generics.RetrieveUpdateAPIView):
+class ProfileDetailView(ConditionalRetrieveMixin, generics.RetrieveUpdateAPIView):
     """Retrieves or partially updates a user profile by user pk."""
 
     serializer_class = UserProfileSerializer
     http_method_names = ['get', 'patch']
+    validator_fields = ['updated_at', 'user__rating_summary__review_count', 'user__rating_summary__rating_sum']
 
     def get_permissions(self):
         if self.request.method == 'PATCH':
             return [IsAuthenticated(), IsOwner()]
         return [IsAuthenticated()]
 
+    def get_validator_queryset(self):
+        return UserProfile.objects.filter(user__pk=self.kwargs['pk'])
+
     def get_object(self):
-        obj = generics.get_object_or_404(UserProfile, user__pk=self.kwargs['pk'])
+        obj = generics.get_object_or_404(self.get_object_queryset(), user__pk=self.kwargs['pk'])
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+    def get_object_queryset(self):
+        return UserProfile.objects.select_related('user', 'user__rating_summary')
+
+
+class AsyncProfileDetailView(AsyncAPIView, ProfileDetailView):
+    """ProfileDetailView for ASGI: GET reads through the async ORM; PATCH stays sync."""
+
+    async def get(self, request, *args, **kwargs):
+        return await self.aretrieve(request, *args, **kwargs)
+
+    async def aget_object(self):
+        try:
+            obj = await self.get_object_queryset().aget(user__pk=self.kwargs['pk'])
+        except UserProfile.DoesNotExist:
+            raise Http404
         self.check_object_permissions(self.request, obj)
         return obj
 
 
 class BusinessProfileListView(generics.ListAPIView):
-    """Returns a list of all business user profiles."""
+    """Returns a list of all business user profiles, optionally ordered by rating."""
 
     serializer_class = BusinessProfileSerializer
     permission_classes = [IsAuthenticated]
+    filter_backends = [StableOrderingFilter]
+    ordering_fields = ['rating', 'review_count']
 
     def get_queryset(self):
-        return UserProfile.objects.filter(type=UserProfile.BUSINESS)
+        return UserProfile.objects.filter(type=UserProfile.BUSINESS).select_related(
+            'user', 'user__rating_summary'
+        ).alias(
+            rating=Coalesce('user__rating_summary__average_rating', Value(0.0)),
+            review_count=Coalesce('user__rating_summary__review_count', Value(0)),
+        )
 
 
 class CustomerProfileListView(generics.ListAPIView):
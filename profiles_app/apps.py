@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ProfilesAppConfig(AppConfig):
     name = 'profiles_app'
     verbose_name = 'Profiles'
+
+    def ready(self):
+        from . import signals  # noqa: F401
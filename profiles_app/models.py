@@ -20,11 +20,15 @@ class UserProfile(models.Model):
     working_hours = models.CharField(max_length=100, blank=True, default='')
     type = models.CharField(max_length=10, choices=USER_TYPE_CHOICES, default=CUSTOMER)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = 'User Profile'
         verbose_name_plural = 'User Profiles'
         ordering = ['user__username']
+        indexes = [
+            models.Index(fields=['type', 'user'], name='profile_type_user_idx'),
+        ]
 
     def __str__(self):
         return f'{self.user.username} ({self.type})'
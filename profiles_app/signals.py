@@ -0,0 +1,14 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from profiles_app.models import UserProfile
+
+
+@receiver(post_save, sender=User)
+def touch_profile_of_changed_user(sender, instance, created, update_fields=None, **kwargs):
+    """Profiles and offer list rows show the user's name fields, and use the profile's updated_at as their validator."""
+    if created or update_fields == frozenset({'last_login'}):
+        return
+    UserProfile.objects.filter(user=instance).update(updated_at=timezone.now())
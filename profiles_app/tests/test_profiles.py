@@ -1,10 +1,11 @@
 from django.contrib.auth.models import User
 from django.urls import reverse
 from rest_framework import status
-from rest_framework.authtoken.models import Token
 from rest_framework.test import APITestCase
 
+from auth_app.models import AuthToken
 from profiles_app.models import UserProfile
+from reviews_app.models import RatingSummary
 
 
 class ProfileDetailTests(APITestCase):
@@ -21,7 +22,7 @@ class ProfileDetailTests(APITestCase):
         )
         self.other_profile = UserProfile.objects.create(user=self.other_user, type='business')
 
-        token, _ = Token.objects.get_or_create(user=self.user)
+        token = AuthToken.objects.create(user=self.user)
         self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
 
     def test_get_own_profile_returns_200(self):
@@ -61,6 +62,28 @@ class ProfileDetailTests(APITestCase):
         response = self.client.patch(url, {'location': 'Berlin'}, format='json')
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
+    def test_matching_etag_returns_304_with_one_query(self):
+        self.client.force_authenticate(self.user)
+        url = reverse('profile-detail', kwargs={'pk': self.other_user.pk})
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_patch_changes_etag(self):
+        url = reverse('profile-detail', kwargs={'pk': self.user.pk})
+        etag = self.client.get(url)['ETag']
+        self.client.patch(url, {'location': 'Berlin'}, format='json')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['location'], 'Berlin')
+
+    def test_rating_summary_changes_business_profile_etag(self):
+        url = reverse('profile-detail', kwargs={'pk': self.other_user.pk})
+        etag = self.client.get(url)['ETag']
+        RatingSummary.objects.update_or_create(user=self.other_user, defaults={'review_count': 1, 'rating_sum': 4})
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
 
 class BusinessProfileListTests(APITestCase):
     """Tests for GET /api/profiles/business/"""
@@ -68,7 +91,7 @@ class BusinessProfileListTests(APITestCase):
     def setUp(self):
         self.user = User.objects.create_user(username='biz', password='Test1234!')
         UserProfile.objects.create(user=self.user, type='business')
-        token, _ = Token.objects.get_or_create(user=self.user)
+        token = AuthToken.objects.create(user=self.user)
         self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
 
     def test_get_business_profiles_returns_200(self):
@@ -77,6 +100,26 @@ class BusinessProfileListTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIsInstance(response.data, list)
 
+    def test_get_business_profiles_ordered_by_rating(self):
+        top = User.objects.create_user(username='top')
+        UserProfile.objects.create(user=top, type='business')
+        RatingSummary.record_rating_change(top.pk, new_rating=5)
+        RatingSummary.record_rating_change(self.user.pk, new_rating=3)
+        response = self.client.get(reverse('business-profiles'), {'ordering': '-rating'})
+        self.assertEqual([profile['user'] for profile in response.data], [top.pk, self.user.pk])
+        self.assertEqual(response.data[0]['rating']['average_rating'], 5.0)
+
+    def test_get_business_profiles_with_equal_ratings_are_ordered_by_id(self):
+        for username in ['b', 'c']:
+            UserProfile.objects.create(user=User.objects.create_user(username=username), type='business')
+        response = self.client.get(reverse('business-profiles'), {'ordering': 'rating'})
+        self.assertEqual([profile['user'] for profile in response.data],
+                         list(UserProfile.objects.filter(type='business').order_by('-id').values_list('user', flat=True)))
+
+    def test_get_business_profiles_without_reviews_has_no_rating(self):
+        response = self.client.get(reverse('business-profiles'))
+        self.assertIsNone(response.data[0]['rating'])
+
     def test_get_business_profiles_without_token_returns_401(self):
         self.client.credentials()
         url = reverse('business-profiles')
@@ -90,7 +133,7 @@ class CustomerProfileListTests(APITestCase):
     def setUp(self):
         self.user = User.objects.create_user(username='cust', password='Test1234!')
         UserProfile.objects.create(user=self.user, type='customer')
-        token, _ = Token.objects.get_or_create(user=self.user)
+        token = AuthToken.objects.create(user=self.user)
         self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
 
     def test_get_customer_profiles_returns_200(self):
@@ -1,6 +1,7 @@
 from django.contrib import admin
+from django.db import transaction
 
-from .models import Review
+from .models import RatingSummary, Review
 
 
 @admin.register(Review)
@@ -8,3 +9,20 @@ class ReviewAdmin(admin.ModelAdmin):
     list_display = ['reviewer', 'business_user', 'rating', 'created_at']
     list_filter = ['rating']
     search_fields = ['reviewer__username', 'business_user__username']
+
+    def save_model(self, request, obj, form, change):
+        """Saves the review and applies the rating change to the rating summaries, like the API views."""
+        with transaction.atomic():
+            old_business_user_id, old_rating = None, None
+            if change:
+                old_business_user_id, old_rating = Review.objects.select_for_update().values_list(
+                    'business_user_id', 'rating',
+                ).get(pk=obj.pk)
+            super().save_model(request, obj, form, change)
+            RatingSummary.record_review_save(obj, old_business_user_id, old_rating)
+
+
+@admin.register(RatingSummary)
+class RatingSummaryAdmin(admin.ModelAdmin):
+    list_display = ['user', 'average_rating', 'review_count']
+    search_fields = ['user__username']
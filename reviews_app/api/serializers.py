@@ -1,19 +1,48 @@
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 
-from reviews_app.models import Review
+from reviews_app.models import RatingSummary, Review
 
 
 class ReviewSerializer(serializers.ModelSerializer):
-    """Serializer for reading and writing review data."""
+    """Serializer for reading and writing review data.
+
+    Duplicates are not checked up front: the row is written first and a violation of
+    unique_review_per_business is turned into a 400, which also holds under concurrent requests.
+    """
+
+    duplicate_message = 'You have already reviewed this business user.'
 
     class Meta:
         model = Review
         fields = ['id', 'business_user', 'reviewer', 'rating', 'description', 'created_at', 'updated_at']
         read_only_fields = ['id', 'reviewer', 'created_at', 'updated_at']
 
-    def validate(self, attrs):
-        request = self.context.get('request')
-        business_user = attrs.get('business_user')
-        if Review.objects.filter(reviewer=request.user, business_user=business_user).exists():
-            raise serializers.ValidationError('You have already reviewed this business user.')
-        return attrs
+    def create(self, validated_data):
+        return self._save_unique(super().create, validated_data)
+
+    def update(self, instance, validated_data):
+        return self._save_unique(lambda data: super(ReviewSerializer, self).update(instance, data), validated_data)
+
+    def _save_unique(self, save, validated_data):
+        try:
+            with transaction.atomic():
+                return save(validated_data)
+        except IntegrityError:
+            reviewer = validated_data.get('reviewer', getattr(self.instance, 'reviewer', None))
+            business_user = validated_data.get('business_user', getattr(self.instance, 'business_user', None))
+            duplicates = Review.objects.filter(reviewer=reviewer, business_user=business_user)
+            if duplicates.exclude(pk=getattr(self.instance, 'pk', None)).exists():
+                raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [self.duplicate_message]})
+            raise
+
+
+class RatingSummarySerializer(serializers.ModelSerializer):
+    """Serializer for the maintained rating aggregate of a business user."""
+
+    histogram = serializers.DictField(child=serializers.IntegerField(), read_only=True)
+
+    class Meta:
+        model = RatingSummary
+        fields = ['average_rating', 'review_count', 'histogram']
@@ -1,34 +1,42 @@
+from django.db import transaction
 from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
 
-from reviews_app.models import Review
+from core.api.conditional import ConditionalListMixin
+from core.api.pagination import CursorOptInPagination
+from reviews_app.models import RatingSummary, Review
+from .filters import ReviewFilter
 from .permissions import IsCustomerUser, IsOwnerOfReview
 from .serializers import ReviewSerializer
 
 
-class ReviewListCreateView(generics.ListCreateAPIView):
+class ReviewPagination(CursorOptInPagination):
+    """Pagination for the review list (page numbers, or keyset with ?cursor=)."""
+
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class ReviewListCreateView(ConditionalListMixin, generics.ListCreateAPIView):
     """Lists all reviews or creates a new one."""
 
+    queryset = Review.objects.all()
     serializer_class = ReviewSerializer
+    pagination_class = ReviewPagination
+    filterset_class = ReviewFilter
+    ordering_fields = ['updated_at', 'rating']
+    ordering = ['-updated_at']
 
     def get_permissions(self):
         if self.request.method == 'POST':
             return [IsAuthenticated(), IsCustomerUser()]
         return [IsAuthenticated()]
 
-    def get_queryset(self):
-        queryset = Review.objects.all()
-        business_user_id = self.request.query_params.get('business_user_id')
-        reviewer_id = self.request.query_params.get('reviewer_id')
-        ordering = self.request.query_params.get('ordering', '-updated_at')
-        if business_user_id:
-            queryset = queryset.filter(business_user__id=business_user_id)
-        if reviewer_id:
-            queryset = queryset.filter(reviewer__id=reviewer_id)
-        return queryset.order_by(ordering)
-
     def perform_create(self, serializer):
-        serializer.save(reviewer=self.request.user)
+        with transaction.atomic():
+            review = serializer.save(reviewer=self.request.user)
+            RatingSummary.record_review_save(review)
 
 
 class ReviewRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
@@ -46,3 +54,19 @@ class ReviewRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
         obj = generics.get_object_or_404(Review, pk=self.kwargs['pk'])
         self.check_object_permissions(self.request, obj)
         return obj
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            old_business_user_id, old_rating = self.lock_rating(serializer.instance)
+            review = serializer.save()
+            RatingSummary.record_review_save(review, old_business_user_id, old_rating)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            # The post_delete receiver uncounts the rating; it must see the locked one.
+            instance.business_user_id, instance.rating = self.lock_rating(instance)
+            instance.delete()
+
+    def lock_rating(self, instance):
+        """Re-reads (business_user_id, rating) under a row lock, so concurrent writes each replace the rating they saw."""
+        return Review.objects.select_for_update().values_list('business_user_id', 'rating').get(pk=instance.pk)
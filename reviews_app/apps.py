@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ReviewsAppConfig(AppConfig):
     name = 'reviews_app'
     verbose_name = 'Reviews'
+
+    def ready(self):
+        from . import receivers  # noqa: F401
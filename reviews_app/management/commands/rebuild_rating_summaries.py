@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from reviews_app.models import RatingSummary
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the per-business rating summaries from the reviews table.'
+
+    def handle(self, *args, **options):
+        count = RatingSummary.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rating summaries rebuilt for {count} business users.'))
@@ -0,0 +1,49 @@
+# Generated by Django 6.0.2 on 2026-10-18 14:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def populate_rating_summaries(apps, schema_editor):
+    Review = apps.get_model('reviews_app', 'Review')
+    RatingSummary = apps.get_model('reviews_app', 'RatingSummary')
+    histogram = {f'rating_{rating}_count': Count('id', filter=Q(rating=rating)) for rating in range(1, 6)}
+    rows = Review.objects.order_by().values('business_user_id').annotate(
+        review_count=Count('id'), rating_sum=Sum('rating'), **histogram,
+    )
+    RatingSummary.objects.bulk_create([
+        RatingSummary(user_id=row.pop('business_user_id'), average_rating=row['rating_sum'] / row['review_count'], **row)
+        for row in rows
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews_app', '0002_query_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RatingSummary',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rating_summary', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('review_count', models.IntegerField(default=0)),
+                ('rating_sum', models.IntegerField(default=0)),
+                ('average_rating', models.FloatField(blank=True, null=True)),
+                ('rating_1_count', models.IntegerField(default=0)),
+                ('rating_2_count', models.IntegerField(default=0)),
+                ('rating_3_count', models.IntegerField(default=0)),
+                ('rating_4_count', models.IntegerField(default=0)),
+                ('rating_5_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Rating Summary',
+                'verbose_name_plural': 'Rating Summaries',
+            },
+        ),
+        migrations.RunPython(populate_rating_summaries, migrations.RunPython.noop),
+    ]
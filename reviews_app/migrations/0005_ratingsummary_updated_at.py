@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-18 17:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews_app', '0004_rating_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ratingsummary',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -1,6 +1,12 @@
 from django.contrib.auth.models import User
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models import Case, Count, F, FloatField, Sum, When
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from core.counters import replace_counter_rows, update_counters
+from reviews_app.signals import rating_summary_changed
 
 
 class Review(models.Model):
@@ -17,9 +23,103 @@ class Review(models.Model):
         verbose_name = 'Review'
         verbose_name_plural = 'Reviews'
         ordering = ['-updated_at']
+        indexes = [
+            models.Index(fields=['business_user', '-updated_at'], name='review_business_updated_idx'),
+            models.Index(fields=['reviewer', '-updated_at'], name='review_reviewer_updated_idx'),
+            models.Index(fields=['-updated_at', '-id'], name='review_updated_idx'),
+            models.Index(fields=['business_user', '-rating'], name='review_business_rating_idx'),
+            models.Index(fields=['reviewer', '-rating'], name='review_reviewer_rating_idx'),
+            models.Index(fields=['-rating'], name='review_rating_idx'),
+        ]
         constraints = [
             models.UniqueConstraint(fields=['business_user', 'reviewer'], name='unique_review_per_business')
         ]
 
     def __str__(self):
         return f'Review by {self.reviewer.username} for {self.business_user.username} ({self.rating}*)'
+
+
+class RatingSummary(models.Model):
+    """Rating aggregate of a business user (count, sum and 1–5 histogram), kept in step with every review write."""
+
+    RATING_FIELDS = {rating: f'rating_{rating}_count' for rating in range(1, 6)}
+
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='rating_summary')
+    review_count = models.IntegerField(default=0)
+    rating_sum = models.IntegerField(default=0)
+    average_rating = models.FloatField(null=True, blank=True)
+    rating_1_count = models.IntegerField(default=0)
+    rating_2_count = models.IntegerField(default=0)
+    rating_3_count = models.IntegerField(default=0)
+    rating_4_count = models.IntegerField(default=0)
+    rating_5_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Rating Summary'
+        verbose_name_plural = 'Rating Summaries'
+
+    def __str__(self):
+        return f'Rating summary of {self.user_id} ({self.average_rating})'
+
+    @property
+    def histogram(self):
+        return {str(rating): getattr(self, field) for rating, field in self.RATING_FIELDS.items()}
+
+    @classmethod
+    def record_rating_change(cls, business_user_id, old_rating=None, new_rating=None):
+        """Applies one added, removed or changed rating; call inside the transaction that writes the review.
+
+        Review deletes are counted by the post_delete receiver in reviews_app.receivers, cascades included.
+        """
+        if old_rating == new_rating:
+            return
+        update_counters(cls, business_user_id, cls.rating_updates(old_rating, new_rating))
+        rating_summary_changed.send(sender=cls, user_id=business_user_id)
+
+    @classmethod
+    def record_review_save(cls, review, old_business_user_id=None, old_rating=None):
+        """Applies a created or edited review, including a move to another business user."""
+        if review.business_user_id == old_business_user_id:
+            cls.record_rating_change(review.business_user_id, old_rating, review.rating)
+            return
+        if old_business_user_id:
+            cls.record_rating_change(old_business_user_id, old_rating=old_rating)
+        cls.record_rating_change(review.business_user_id, new_rating=review.rating)
+
+    @classmethod
+    def rating_updates(cls, old_rating=None, new_rating=None):
+        """Returns the F() updates that replace old_rating with new_rating in one summary row."""
+        count_delta, sum_delta, updates = 0, 0, {}
+        if old_rating:
+            count_delta, sum_delta = count_delta - 1, sum_delta - old_rating
+            updates[cls.RATING_FIELDS[old_rating]] = F(cls.RATING_FIELDS[old_rating]) - 1
+        if new_rating:
+            count_delta, sum_delta = count_delta + 1, sum_delta + new_rating
+            updates[cls.RATING_FIELDS[new_rating]] = F(cls.RATING_FIELDS[new_rating]) + 1
+        review_count, rating_sum = F('review_count') + count_delta, F('rating_sum') + sum_delta
+        # One UPDATE: every right-hand side reads the row as it was, so the average uses the new totals.
+        updates.update(review_count=review_count, rating_sum=rating_sum, average_rating=Case(
+            When(review_count=-count_delta, then=None),
+            default=Cast(rating_sum, FloatField()) / review_count,
+        ), updated_at=timezone.now())
+        return updates
+
+    @classmethod
+    def rebuild(cls):
+        """Recomputes all summaries from the reviews table."""
+        count = replace_counter_rows(cls, rating_summary_rows())
+        rating_summary_changed.send(sender=cls, user_id=None)
+        return count
+
+
+def rating_summary_rows():
+    """Returns unsaved RatingSummary rows aggregating the reviews' ratings per business user."""
+    histogram = {field: Count('id', filter=models.Q(rating=rating)) for rating, field in RatingSummary.RATING_FIELDS.items()}
+    rows = Review.objects.order_by().values('business_user_id').annotate(
+        review_count=Count('id'), rating_sum=Sum('rating'), **histogram,
+    )
+    return [
+        RatingSummary(user_id=row.pop('business_user_id'), average_rating=row['rating_sum'] / row['review_count'], **row)
+        for row in rows
+    ]
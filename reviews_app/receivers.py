@@ -0,0 +1,17 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from reviews_app.models import RatingSummary, Review
+from reviews_app.signals import rating_summary_changed
+
+
+@receiver(post_delete, sender=Review)
+def uncount_deleted_review(sender, instance, **kwargs):
+    """Removes every deleted review's rating, including cascades from a deleted reviewer or business user.
+
+    Only an existing row is updated: when the business user itself is deleted, its summary
+    may already be gone and must not be recreated.
+    """
+    updates = RatingSummary.rating_updates(old_rating=instance.rating)
+    if RatingSummary.objects.filter(pk=instance.business_user_id).update(**updates):
+        rating_summary_changed.send(sender=RatingSummary, user_id=instance.business_user_id)
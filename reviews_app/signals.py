@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Sent by RatingSummary with the business user's user_id after their summary changed,
+# and with user_id=None after RatingSummary.rebuild() replaced every summary.
+rating_summary_changed = Signal()
@@ -1,17 +1,28 @@
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from unittest import mock
+
+from django.contrib import admin
 from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
-from rest_framework.authtoken.models import Token
-from rest_framework.test import APITestCase
+from rest_framework.test import APIClient, APITestCase, APITransactionTestCase
 
+from auth_app.models import AuthToken
+from core.tests.utils import sqlite_file_database
 from profiles_app.models import UserProfile
-from reviews_app.models import Review
+from reviews_app.admin import ReviewAdmin
+from reviews_app.api.views import ReviewRetrieveUpdateDestroyView
+from reviews_app.models import RatingSummary, Review
 
 
 def make_user(username, user_type, password='Test1234!'):
     user = User.objects.create_user(username=username, password=password)
     UserProfile.objects.create(user=user, type=user_type)
-    token, _ = Token.objects.get_or_create(user=user)
+    token = AuthToken.objects.create(user=user)
     return user, token.key
 
 
@@ -46,14 +57,14 @@ class ReviewListTests(APITestCase):
         self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.customer_token)
         response = self.client.get(self.url, {'business_user_id': self.business.pk})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        for result in response.data:
+        for result in response.data['results']:
             self.assertEqual(result['business_user'], self.business.pk)
 
     def test_filter_by_reviewer_id_returns_200(self):
         self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.customer_token)
         response = self.client.get(self.url, {'reviewer_id': self.customer.pk})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        for result in response.data:
+        for result in response.data['results']:
             self.assertEqual(result['reviewer'], self.customer.pk)
 
     def test_ordering_returns_200(self):
@@ -61,6 +72,81 @@ class ReviewListTests(APITestCase):
         response = self.client.get(self.url, {'ordering': '-updated_at'})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_ordering_by_rating(self):
+        other, _ = make_user('cust2', 'customer')
+        create_review(other, self.business, rating=2)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.customer_token)
+        response = self.client.get(self.url, {'ordering': 'rating'})
+        self.assertEqual([result['rating'] for result in response.data['results']], [2, 4])
+        response = self.client.get(self.url, {'ordering': '-rating'})
+        self.assertEqual([result['rating'] for result in response.data['results']], [4, 2])
+
+    def test_equal_ratings_are_ordered_by_id(self):
+        for index in range(3):
+            create_review(make_user(f'cust{index}', 'customer')[0], self.business, rating=4)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.customer_token)
+        ids = [result['id'] for page in (1, 2) for result in
+               self.client.get(self.url, {'ordering': '-rating', 'page_size': 2, 'page': page}).data['results']]
+        self.assertEqual(ids, sorted(Review.objects.values_list('id', flat=True), reverse=True))
+
+    def test_ordering_outside_whitelist_is_ignored(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.customer_token)
+        response = self.client.get(self.url, {'ordering': 'description'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 1)
+
+    def test_filter_with_invalid_id_returns_400(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.customer_token)
+        response = self.client.get(self.url, {'business_user_id': 'abc'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_page_number_pagination_with_page_size(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.customer_token)
+        response = self.client.get(self.url, {'page_size': 1, 'business_user_id': self.business.pk})
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_matching_etag_returns_304_with_one_query(self):
+        self.client.force_authenticate(self.customer)
+        etag = self.client.get(self.url, {'business_user_id': self.business.pk})['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, {'business_user_id': self.business.pk}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_new_review_changes_etag(self):
+        self.client.force_authenticate(self.customer)
+        etag = self.client.get(self.url)['ETag']
+        other, _ = make_user('cust2', 'customer')
+        create_review(other, self.business, rating=2)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 2)
+
+
+class ReviewCursorPaginationTests(APITestCase):
+    """Tests for the keyset (?cursor=) mode of GET /api/reviews/"""
+
+    def setUp(self):
+        self.business, _ = make_user('biz', 'business')
+        self.customer, self.customer_token = make_user('cust', 'customer')
+        for index in range(5):
+            reviewer = User.objects.create_user(username=f'reviewer{index}')
+            create_review(reviewer, self.business)
+        self.url = reverse('review-list-create')
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.customer_token)
+
+    def test_list_is_paginated_without_cursor(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['count'], 5)
+        self.assertEqual(len(response.data['results']), 5)
+
+    def test_cursor_returns_pages_with_next_link(self):
+        response = self.client.get(self.url, {'cursor': '', 'page_size': 3})
+        self.assertEqual(len(response.data['results']), 3)
+        response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNone(response.data['next'])
+
 
 class ReviewCreateTests(APITestCase):
     """Tests for POST /api/reviews/"""
@@ -94,6 +180,16 @@ class ReviewCreateTests(APITestCase):
         self.client.post(self.url, self.valid_data, format='json')
         response = self.client.post(self.url, self.valid_data, format='json')
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['non_field_errors'], ['You have already reviewed this business user.'])
+        self.assertEqual(RatingSummary.objects.get(pk=self.business.pk).review_count, 1)
+
+    def test_post_review_runs_no_duplicate_lookup(self):
+        self.client.force_authenticate(self.customer)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, self.valid_data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        review_reads = [query['sql'] for query in queries if query['sql'].startswith('SELECT') and '"reviews_app_review"' in query['sql']]
+        self.assertEqual(review_reads, [])
 
     def test_post_review_with_invalid_rating_returns_400(self):
         self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.customer_token)
@@ -102,6 +198,34 @@ class ReviewCreateTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
 
+class ConcurrentReviewCreateTests(APITransactionTestCase):
+    """Stress test: parallel duplicate POSTs to /api/reviews/ must yield one 201 and only 400s otherwise."""
+
+    workers = 8
+
+    def setUp(self):
+        self.enterContext(sqlite_file_database())
+        self.customer, self.customer_token = make_user('cust', 'customer')
+        self.business, _ = make_user('biz', 'business')
+        self.url = reverse('review-list-create')
+
+    def post_review(self, _):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION='Token ' + self.customer_token)
+        try:
+            return client.post(self.url, {'business_user': self.business.pk, 'rating': 5}, format='json').status_code
+        finally:
+            connection.close()
+
+    def test_parallel_duplicate_posts_never_return_500(self):
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            status_codes = list(pool.map(self.post_review, range(self.workers * 4)))
+        self.assertEqual(status_codes.count(status.HTTP_201_CREATED), 1)
+        self.assertEqual(status_codes.count(status.HTTP_400_BAD_REQUEST), len(status_codes) - 1)
+        self.assertEqual(Review.objects.count(), 1)
+        self.assertEqual(RatingSummary.objects.get(pk=self.business.pk).review_count, 1)
+
+
 class ReviewUpdateTests(APITestCase):
     """Tests for PATCH /api/reviews/<pk>/"""
 
@@ -117,6 +241,14 @@ class ReviewUpdateTests(APITestCase):
         response = self.client.patch(self.url, {'rating': 3}, format='json')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_patch_business_user_to_already_reviewed_returns_400(self):
+        other_business, _ = make_user('biz2', 'business')
+        create_review(self.customer, other_business)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.customer_token)
+        response = self.client.patch(self.url, {'business_user': other_business.pk}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['non_field_errors'], ['You have already reviewed this business user.'])
+
     def test_patch_other_review_returns_403(self):
         self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.other_token)
         response = self.client.patch(self.url, {'rating': 1}, format='json')
@@ -150,3 +282,106 @@ class ReviewDeleteTests(APITestCase):
     def test_delete_review_without_token_returns_401(self):
         response = self.client.delete(self.url)
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class RatingSummaryTests(APITestCase):
+    """Tests for the maintained per-business rating summary."""
+
+    def setUp(self):
+        self.business, _ = make_user('biz', 'business')
+        self.customer, self.customer_token = make_user('cust', 'customer')
+        self.other_customer, self.other_token = make_user('cust2', 'customer')
+        self.url = reverse('review-list-create')
+
+    def post_review(self, token, rating):
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token)
+        return self.client.post(self.url, {'business_user': self.business.pk, 'rating': rating}, format='json')
+
+    def summary(self):
+        return RatingSummary.objects.get(pk=self.business.pk)
+
+    def test_create_updates_summary(self):
+        self.post_review(self.customer_token, 5)
+        self.post_review(self.other_token, 2)
+        summary = self.summary()
+        self.assertEqual((summary.review_count, summary.rating_sum, summary.average_rating), (2, 7, 3.5))
+        self.assertEqual(summary.histogram, {'1': 0, '2': 1, '3': 0, '4': 0, '5': 1})
+
+    def test_patch_moves_rating_in_histogram(self):
+        review_id = self.post_review(self.customer_token, 5).data['id']
+        self.client.patch(reverse('review-detail', kwargs={'pk': review_id}), {'rating': 1}, format='json')
+        summary = self.summary()
+        self.assertEqual((summary.review_count, summary.average_rating), (1, 1.0))
+        self.assertEqual((summary.rating_1_count, summary.rating_5_count), (1, 0))
+
+    def test_delete_removes_rating(self):
+        review_id = self.post_review(self.customer_token, 4).data['id']
+        self.client.delete(reverse('review-detail', kwargs={'pk': review_id}))
+        summary = self.summary()
+        self.assertEqual(summary.review_count, 0)
+        self.assertIsNone(summary.average_rating)
+
+    def test_rating_change_is_a_single_update(self):
+        RatingSummary.record_rating_change(self.business.pk, new_rating=5)
+        with self.assertNumQueries(2):
+            RatingSummary.record_rating_change(self.business.pk, old_rating=5, new_rating=2)
+        summary = self.summary()
+        self.assertEqual((summary.review_count, summary.rating_sum, summary.average_rating), (1, 2, 2.0))
+
+    def test_patch_replaces_the_locked_rating(self):
+        review_id = self.post_review(self.customer_token, 5).data['id']
+        stale = Review.objects.get(pk=review_id)
+        url = reverse('review-detail', kwargs={'pk': review_id})
+        self.client.patch(url, {'rating': 3}, format='json')
+        with mock.patch.object(ReviewRetrieveUpdateDestroyView, 'get_object', return_value=stale):
+            self.client.patch(url, {'rating': 1}, format='json')
+        summary = self.summary()
+        self.assertEqual((summary.review_count, summary.rating_sum), (1, 1))
+        self.assertEqual(summary.histogram, {'1': 1, '2': 0, '3': 0, '4': 0, '5': 0})
+
+    def test_delete_removes_the_locked_rating(self):
+        review_id = self.post_review(self.customer_token, 5).data['id']
+        stale = Review.objects.get(pk=review_id)
+        url = reverse('review-detail', kwargs={'pk': review_id})
+        self.client.patch(url, {'rating': 3}, format='json')
+        with mock.patch.object(ReviewRetrieveUpdateDestroyView, 'get_object', return_value=stale):
+            self.client.delete(url)
+        summary = self.summary()
+        self.assertEqual((summary.review_count, summary.rating_sum), (0, 0))
+        self.assertEqual(summary.histogram, {'1': 0, '2': 0, '3': 0, '4': 0, '5': 0})
+
+    def test_deleting_the_reviewer_removes_their_rating(self):
+        self.post_review(self.customer_token, 5)
+        self.post_review(self.other_token, 2)
+        self.customer.delete()
+        summary = self.summary()
+        self.assertEqual((summary.review_count, summary.rating_sum, summary.average_rating), (1, 2, 2.0))
+        self.assertEqual(summary.rating_5_count, 0)
+
+    def test_deleting_the_business_user_does_not_recreate_the_summary(self):
+        self.post_review(self.customer_token, 5)
+        self.business.delete()
+        self.assertFalse(RatingSummary.objects.exists())
+
+    def test_admin_edit_updates_summary(self):
+        other_business, _ = make_user('biz2', 'business')
+        review = Review.objects.get(pk=self.post_review(self.customer_token, 5).data['id'])
+        review.rating, review.business_user = 2, other_business
+        ReviewAdmin(Review, admin.site).save_model(None, review, None, True)
+        self.assertEqual(self.summary().review_count, 0)
+        summary = RatingSummary.objects.get(pk=other_business.pk)
+        self.assertEqual((summary.review_count, summary.rating_2_count), (1, 1))
+
+    def test_admin_add_and_delete_update_summary(self):
+        review_admin = ReviewAdmin(Review, admin.site)
+        review = Review(reviewer=self.customer, business_user=self.business, rating=4)
+        review_admin.save_model(None, review, None, False)
+        self.assertEqual(self.summary().rating_4_count, 1)
+        review_admin.delete_queryset(None, Review.objects.filter(pk=review.pk))
+        self.assertEqual(self.summary().review_count, 0)
+
+    def test_rebuild_recomputes_summaries(self):
+        create_review(self.customer, self.business, rating=4)
+        create_review(self.other_customer, self.business, rating=5)
+        call_command('rebuild_rating_summaries', stdout=StringIO())
+        self.assertEqual(self.summary().average_rating, 4.5)